@@ -0,0 +1,294 @@
+"""
+Almacén columnar de sorteos completos en un archivo binario de sólo-agregado.
+
+Un sorteo ocupa 56 bytes: 48 códigos uint8 (uno por equipo, `grupo * 4 + slot - 1`, el índice
+de A1..L4) y su índice uint64 dentro del lote. Con la semilla maestra de la cabecera, el índice
+regenera el sorteo (`simulacion_montecarlo.regenerar_sorteo`). 10 millones de sorteos ocupan
+~560 MB, frente a cientos de bytes por equipo en los dicts de `asignaciones_sorteo`.
+
+Formato:
+- Cabecera de 256 bytes (`_CABECERA`): versión, semilla maestra, motor y códigos de los equipos
+  en el orden de las columnas.
+- Chunks consecutivos, cada uno con su número de filas n (uint64), las 48 columnas de n bytes
+  una detrás de otra y los n índices. Agregar es escribir un chunk al final; un chunk truncado
+  (escritura interrumpida) se ignora al leer.
+
+`AlmacenSorteos` abre el archivo con `numpy.memmap`: leer una columna es copiar n bytes
+contiguos por chunk, sin cargar el resto. `a_arrow()` lo expone como tabla de pyarrow
+(opcional) sin copiar los datos.
+
+Uso:
+    python 02_scripts/almacen_sorteos.py 03_resultados/sorteos.bin --escribir 10000000 --semilla 2026
+    python 02_scripts/almacen_sorteos.py 03_resultados/sorteos.bin --equipo ARG
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulacion_montecarlo import (EQUIPOS, GRUPOS, SLOTS, TAMANO_BLOQUE_KERNEL, _bloque_kernel,
+                                   regenerar_sorteo)
+from semillas import nueva_semilla
+
+VERSION = 1
+MAGIA = b'SORTEO26'
+
+#Filas por chunk al escribir (~3,5 MB por chunk)
+TAMANO_CHUNK = 1 << 16
+
+_CABECERA = np.dtype([
+    ('magia', 'S8'),
+    ('version', '<u4'),
+    ('n_equipos', '<u4'),
+    ('semilla', '<u8', (2,)),
+    ('motor', 'S16'),
+    ('equipos', 'S4', (len(EQUIPOS),)),
+    ('reservado', 'V16'),
+])
+_BYTES_N = 8
+
+
+def codificar(grupo_de, slot_de):
+    """Códigos uint8 `grupo * 4 + slot - 1` a partir de los arrays (K x 48) de los kernels."""
+    return (grupo_de.astype(np.uint8) * 4 + slot_de.astype(np.uint8) - 1).astype(np.uint8)
+
+
+def decodificar(codigos):
+    """Arrays (grupo 0-11, slot 1-4) a partir de códigos uint8."""
+    return codigos >> 2, (codigos & 3) + 1
+
+
+def _cabecera(semilla, motor, equipos):
+    if not 0 <= semilla < 1 << 128:
+        raise ValueError(f"La semilla maestra debe estar en [0, 2**128): {semilla}")
+    cabecera = np.zeros((), dtype=_CABECERA)
+    cabecera['magia'] = MAGIA
+    cabecera['version'] = VERSION
+    cabecera['n_equipos'] = len(equipos)
+    cabecera['semilla'] = [semilla & (2**64 - 1), semilla >> 64]
+    cabecera['motor'] = motor.encode()
+    cabecera['equipos'] = [e.encode() for e in equipos]
+    return cabecera
+
+
+def _leer_cabecera(datos):
+    if len(datos) < _CABECERA.itemsize:
+        raise ValueError("Archivo demasiado corto para un almacén de sorteos")
+    cabecera = np.frombuffer(datos[:_CABECERA.itemsize], dtype=_CABECERA)[0]
+    if cabecera['magia'] != MAGIA or cabecera['version'] != VERSION:
+        raise ValueError(f"No es un almacén de sorteos v{VERSION}: {cabecera['magia']!r}")
+    return cabecera
+
+
+class EscritorSorteos:
+    """
+    Escribe sorteos en un almacén nuevo o agrega al final de uno existente (misma semilla,
+    motor y equipos). Acumula filas en memoria hasta `TAMANO_CHUNK` y las escribe como un chunk.
+    """
+
+    def __init__(self, ruta, semilla, motor='vectorizado', equipos=EQUIPOS):
+        self.ruta = ruta
+        cabecera = _cabecera(semilla, motor, equipos)
+        if os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+            with open(ruta, 'rb') as f:
+                existente = _leer_cabecera(f.read(_CABECERA.itemsize))
+            if existente.tobytes() != cabecera.tobytes():
+                raise ValueError(f"{ruta} tiene otra semilla, motor o tabla de equipos")
+            almacen = AlmacenSorteos(ruta)
+            self.n_filas = len(almacen)
+            self._archivo = open(ruta, 'r+b')
+            #Descarta un chunk truncado al final antes de agregar
+            self._archivo.truncate(almacen._fin)
+            self._archivo.seek(0, os.SEEK_END)
+        else:
+            self.n_filas = 0
+            self._archivo = open(ruta, 'wb')
+            self._archivo.write(cabecera.tobytes())
+        self._codigos, self._indices, self._pendientes = [], [], 0
+
+    def agregar(self, codigos, indices):
+        """Agrega filas: `codigos` (K x 48, uint8) e `indices` (K) de los sorteos en el lote."""
+        self._codigos.append(np.asarray(codigos, dtype=np.uint8))
+        self._indices.append(np.asarray(indices, dtype=np.uint64))
+        self._pendientes += len(indices)
+        if self._pendientes >= TAMANO_CHUNK:
+            self.vaciar()
+
+    def vaciar(self):
+        """Escribe las filas pendientes como un chunk."""
+        if not self._pendientes:
+            return
+        codigos = np.concatenate(self._codigos)
+        indices = np.concatenate(self._indices)
+        self._archivo.write(np.uint64(len(indices)).tobytes())
+        self._archivo.write(np.ascontiguousarray(codigos.T).tobytes())
+        self._archivo.write(indices.astype('<u8').tobytes())
+        self._archivo.flush()
+        self.n_filas += len(indices)
+        self._codigos, self._indices, self._pendientes = [], [], 0
+
+    def cerrar(self):
+        self.vaciar()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class AlmacenSorteos:
+    """
+    Lectura de un almacén por `numpy.memmap`. `chunks` es la lista de (inicio, n, columnas,
+    indices), donde `columnas` es una vista 48 x n del archivo e `indices` una vista de n.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        if os.path.getsize(ruta) <= _CABECERA.itemsize:
+            datos = np.fromfile(ruta, dtype=np.uint8)
+        else:
+            datos = np.memmap(ruta, dtype=np.uint8, mode='r')
+        cabecera = _leer_cabecera(datos)
+        self.semilla = int(cabecera['semilla'][0]) | int(cabecera['semilla'][1]) << 64
+        self.motor = cabecera['motor'].decode()
+        self.equipos = [e.decode() for e in cabecera['equipos']]
+        self.idx = {e: i for i, e in enumerate(self.equipos)}
+        n_equipos = len(self.equipos)
+
+        self.chunks = []
+        inicio, posicion = 0, _CABECERA.itemsize
+        while posicion + _BYTES_N <= len(datos):
+            n = int(datos[posicion:posicion + _BYTES_N].view('<u8')[0])
+            fin = posicion + _BYTES_N + n * (n_equipos + 8)
+            if n == 0 or fin > len(datos):
+                break
+            columnas = datos[posicion + _BYTES_N:posicion + _BYTES_N + n * n_equipos].reshape(n_equipos, n)
+            indices = datos[posicion + _BYTES_N + n * n_equipos:fin].view('<u8')
+            self.chunks.append((inicio, n, columnas, indices))
+            inicio, posicion = inicio + n, fin
+        self.n_filas = inicio
+        self._fin = posicion
+
+    def __len__(self):
+        return self.n_filas
+
+    def columna(self, equipo):
+        """Códigos (uint8, una fila por sorteo) del equipo `equipo` (código o id de columna)."""
+        i = self.idx[equipo] if isinstance(equipo, str) else equipo
+        return np.concatenate([columnas[i] for _, _, columnas, _ in self.chunks] or [np.empty(0, np.uint8)])
+
+    def indices(self):
+        """Índice de cada sorteo en el lote de la semilla maestra."""
+        return np.concatenate([indices for _, _, _, indices in self.chunks] or [np.empty(0, np.uint64)])
+
+    def bloques(self):
+        """Itera (codigos n x 48, indices) por chunk, como vistas sobre el archivo."""
+        for _, _, columnas, indices in self.chunks:
+            yield columnas.T, indices
+
+    def filas(self, inicio, fin):
+        """Códigos (fin - inicio) x 48 de las filas `inicio` .. `fin` - 1."""
+        partes = []
+        for base, n, columnas, _ in self.chunks:
+            if base < fin and inicio < base + n:
+                partes.append(columnas[:, max(inicio, base) - base:min(fin, base + n) - base].T)
+        return np.concatenate(partes) if partes else np.empty((0, len(self.equipos)), np.uint8)
+
+    def sorteo(self, fila):
+        """Sorteo de la fila `fila` como `{codigo: {'grupo': 'A', 'slot': 'A3'}}`."""
+        codigos = self.filas(fila, fila + 1)[0]
+        return {eq: {'grupo': GRUPOS[c >> 2], 'slot': SLOTS[c]} for eq, c in zip(self.equipos, codigos)}
+
+    def a_arrow(self):
+        """
+        `pyarrow.Table` con una columna uint8 por equipo más `indice`, un record batch por chunk
+        sobre los mismos buffers del memmap (requiere pyarrow).
+        """
+        import pyarrow as pa
+
+        nombres = self.equipos + ['indice']
+        esquema = pa.schema([(e, pa.uint8()) for e in self.equipos] + [('indice', pa.uint64())])
+        batches = []
+        for _, n, columnas, indices in self.chunks:
+            arrays = [pa.Array.from_buffers(pa.uint8(), n, [None, pa.py_buffer(c)]) for c in columnas]
+            arrays.append(pa.Array.from_buffers(pa.uint64(), n, [None, pa.py_buffer(indices)]))
+            batches.append(pa.RecordBatch.from_arrays(arrays, names=nombres))
+        return pa.Table.from_batches(batches, schema=esquema)
+
+
+def _bloque_codigos(semilla, bloque, motor):
+    return codificar(*_bloque_kernel(semilla, bloque, motor))
+
+
+def escribir(ruta, n_sorteos, semilla=None, motor='vectorizado', n_procesos=None):
+    """
+    Agrega `n_sorteos` sorteos de `simulacion_montecarlo` al almacén `ruta`, continuando el
+    lote desde el último índice guardado. Devuelve el número total de filas.
+    """
+    if motor == 'secuencial':
+        raise ValueError("El almacén se llena con los motores por bloques ('vectorizado' o 'uniforme')")
+    if semilla is None:
+        if os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+            semilla = AlmacenSorteos(ruta).semilla
+        else:
+            semilla = nueva_semilla()
+
+    with EscritorSorteos(ruta, semilla, motor) as escritor:
+        inicio = escritor.n_filas
+        fin = inicio + n_sorteos
+        bloques = range(inicio // TAMANO_BLOQUE_KERNEL, -(-fin // TAMANO_BLOQUE_KERNEL))
+        with ProcessPoolExecutor(max_workers=n_procesos or os.cpu_count() or 1) as pool:
+            #`map` devuelve los bloques en orden: el archivo queda ordenado por índice
+            for bloque, codigos in zip(bloques, pool.map(_bloque_codigos, [semilla] * len(bloques), bloques,
+                                                         [motor] * len(bloques))):
+                base = bloque * TAMANO_BLOQUE_KERNEL
+                desde, hasta = max(inicio, base), min(fin, base + TAMANO_BLOQUE_KERNEL)
+                escritor.agregar(codigos[desde - base:hasta - base], np.arange(desde, hasta, dtype=np.uint64))
+    return escritor.n_filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Almacén columnar de sorteos")
+    parser.add_argument('ruta', help="Archivo del almacén")
+    parser.add_argument('--escribir', type=int, default=None, metavar='N', help="Agrega N sorteos al almacén")
+    parser.add_argument('--semilla', type=int, default=None, help="Semilla maestra (sólo al crear)")
+    parser.add_argument('--motor', choices=('vectorizado', 'uniforme'), default='vectorizado')
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--equipo', default=None, help="Distribución por grupo de un equipo (lee una columna)")
+    args = parser.parse_args()
+
+    if args.escribir:
+        inicio = time.perf_counter()
+        total = escribir(args.ruta, args.escribir, args.semilla, args.motor, args.procesos)
+        duracion = time.perf_counter() - inicio
+        print(f"{args.escribir} sorteos agregados en {duracion:.1f} s ({args.escribir / duracion:.0f} sorteos/s); "
+              f"{total} en el almacén")
+
+    almacen = AlmacenSorteos(args.ruta)
+    tamano = os.path.getsize(args.ruta)
+    print(f"{args.ruta}: {len(almacen)} sorteos en {len(almacen.chunks)} chunks, {tamano / 1e6:.1f} MB "
+          f"({tamano / max(len(almacen), 1):.1f} bytes/sorteo), motor {almacen.motor}, semilla {almacen.semilla}")
+    if not len(almacen):
+        return
+
+    #Chequeo: la última fila coincide con el sorteo regenerado desde la semilla
+    fila = len(almacen) - 1
+    regenerado = regenerar_sorteo(int(almacen.indices()[fila]), almacen.semilla, almacen.motor)
+    print(f"Fila {fila}: {'coincide' if almacen.sorteo(fila) == regenerado else 'NO coincide'} con regenerar_sorteo")
+
+    if args.equipo:
+        inicio = time.perf_counter()
+        grupo, _ = decodificar(almacen.columna(args.equipo))
+        conteo = np.bincount(grupo, minlength=len(GRUPOS))
+        duracion = time.perf_counter() - inicio
+        print(f"\n{args.equipo}: columna leída en {duracion * 1e3:.0f} ms")
+        for g, c in zip(GRUPOS, conteo):
+            print(f"  Grupo {g}: {c / len(almacen):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Banderas de los equipos como un único recurso local.
+
+`python 02_scripts/banderas.py` empaqueta las banderas de todos los equipos que pueden
+entrar al sorteo (clasificados y candidatos de repechaje) en una hoja CSS con una clase
+por país (`.bandera-mx`) cuya imagen va embebida como data URI. La app sirve ese archivo
+con caché larga, así que cada cliente descarga un solo recurso y no hace ninguna petición
+a FlagCDN.
+
+Las imágenes se toman de FlagCDN al construir, o de una carpeta local con `--desde DIR`
+(archivos `<iso>.png`) para entornos sin red.
+"""
+import argparse
+import base64
+import hashlib
+import os
+import sys
+import urllib.error
+import urllib.request
+
+from cargar_datos import cargar_datos
+
+DIR_ASSETS = '04_assets'
+RUTA_CSS = os.path.join(DIR_ASSETS, 'banderas.css')
+URL_FLAGCDN = "https://flagcdn.com/h24/{iso}.png"
+
+# Diccionario para mapear códigos FIFA (3 letras) a códigos ISO (2 letras) para obtener las banderas.
+# Esto es necesario porque FlagCDN utiliza códigos ISO.
+FIFA_TO_ISO = {
+    'AFG': 'af', 'ALB': 'al', 'ALG': 'dz', 'ASA': 'as', 'AND': 'ad', 'ANG': 'ao', 'AIA': 'ai', 'ATG': 'ag',
+    'ARG': 'ar', 'ARM': 'am', 'ARU': 'aw', 'AUS': 'au', 'AUT': 'at', 'AZE': 'az', 'BAH': 'bs', 'BHR': 'bh',
+    'BAN': 'bd', 'BRB': 'bb', 'BLR': 'by', 'BEL': 'be', 'BLZ': 'bz', 'BEN': 'bj', 'BER': 'bm', 'BHU': 'bt',
+    'BOL': 'bo', 'BIH': 'ba', 'BOT': 'bw', 'BRA': 'br', 'VGB': 'vg', 'BRU': 'bn', 'BUL': 'bg', 'BFA': 'bf',
+    'BDI': 'bi', 'CAM': 'kh', 'CMR': 'cm', 'CAN': 'ca', 'CPV': 'cv', 'CAY': 'ky', 'CTA': 'cf', 'CHA': 'td',
+    'CHI': 'cl', 'CHN': 'cn', 'TPE': 'tw', 'COL': 'co', 'COM': 'km', 'CGO': 'cg', 'COK': 'ck', 'CRC': 'cr',
+    'CRO': 'hr', 'CUB': 'cu', 'CUW': 'cw', 'CYP': 'cy', 'CZE': 'cz', 'DEN': 'dk', 'DJI': 'dj', 'DMA': 'dm',
+    'DOM': 'do', 'COD': 'cd', 'ECU': 'ec', 'EGY': 'eg', 'SLV': 'sv', 'ENG': 'gb-eng', 'EQG': 'gq', 'ERI': 'er',
+    'EST': 'ee', 'ETH': 'et', 'FRO': 'fo', 'FIJ': 'fj', 'FIN': 'fi', 'FRA': 'fr', 'GAB': 'ga', 'GAM': 'gm',
+    'GEO': 'ge', 'GER': 'de', 'GHA': 'gh', 'GIB': 'gi', 'GRE': 'gr', 'GRN': 'gd', 'GUM': 'gu', 'GUA': 'gt',
+    'GUI': 'gn', 'GNB': 'gw', 'GUY': 'gy', 'HAI': 'ht', 'HON': 'hn', 'HKG': 'hk', 'HUN': 'hu', 'ISL': 'is',
+    'IND': 'in', 'IDN': 'id', 'IRN': 'ir', 'IRQ': 'iq', 'ISR': 'il', 'ITA': 'it', 'CIV': 'ci', 'JAM': 'jm',
+    'JPN': 'jp', 'JOR': 'jo', 'KAZ': 'kz', 'KEN': 'ke', 'PRK': 'kp', 'KOR': 'kr', 'KUW': 'kw', 'KGZ': 'kg',
+    'LAO': 'la', 'LVA': 'lv', 'LBN': 'lb', 'LES': 'ls', 'LBR': 'lr', 'LBY': 'ly', 'LIE': 'li', 'LTU': 'lt',
+    'LUX': 'lu', 'MAC': 'mo', 'MKD': 'mk', 'MAD': 'mg', 'MWI': 'mw', 'MAS': 'my', 'MDV': 'mv', 'MLI': 'ml',
+    'MLT': 'mt', 'MTN': 'mr', 'MRI': 'mu', 'MEX': 'mx', 'MDA': 'md', 'MNG': 'mn', 'MNE': 'me', 'MSR': 'ms',
+    'MAR': 'ma', 'MOZ': 'mz', 'MYA': 'mm', 'NAM': 'na', 'NEP': 'np', 'NED': 'nl', 'NCL': 'nc', 'NZL': 'nz',
+    'NCA': 'ni', 'NIG': 'ne', 'NGA': 'ng', 'NIR': 'gb-nir', 'NOR': 'no', 'OMA': 'om', 'PAK': 'pk', 'PLE': 'ps',
+    'PAN': 'pa', 'PNG': 'pg', 'PAR': 'py', 'PER': 'pe', 'PHI': 'ph', 'POL': 'pl', 'POR': 'pt', 'PUR': 'pr',
+    'QAT': 'qa', 'IRL': 'ie', 'ROU': 'ro', 'RUS': 'ru', 'RWA': 'rw', 'SKN': 'kn', 'LCA': 'lc', 'VIN': 'vc',
+    'SAM': 'ws', 'SMR': 'sm', 'STP': 'st', 'KSA': 'sa', 'SCO': 'gb-sct', 'SEN': 'sn', 'SRB': 'rs', 'SEY': 'sc',
+    'SLE': 'sl', 'SIN': 'sg', 'SVK': 'sk', 'SVN': 'si', 'SOL': 'sb', 'SOM': 'so', 'RSA': 'za', 'ESP': 'es',
+    'SRI': 'lk', 'SDN': 'sd', 'SUR': 'sr', 'SWE': 'se', 'SUI': 'ch', 'SYR': 'sy', 'TAH': 'pf', 'TJK': 'tj',
+    'TAN': 'tz', 'THA': 'th', 'TLS': 'tl', 'TOG': 'tg', 'TGA': 'to', 'TRI': 'tt', 'TUN': 'tn', 'TUR': 'tr',
+    'TKM': 'tm', 'TCA': 'tc', 'UGA': 'ug', 'UKR': 'ua', 'UAE': 'ae', 'USA': 'us', 'URU': 'uy', 'VIR': 'vi',
+    'UZB': 'uz', 'VAN': 'vu', 'VEN': 've', 'VIE': 'vn', 'WAL': 'gb-wls', 'YEM': 'ye', 'ZAM': 'zm', 'ZIM': 'zw',
+    #Códigos que aparecen en los datos del sorteo con otra forma
+    'HTI': 'ht', 'KOS': 'xk', 'SAU': 'sa', 'ZAF': 'za'
+}
+
+#Estilo común de todas las banderas; cada clase .bandera-<iso> sólo aporta la imagen
+CSS_BASE = (
+    ".bandera { display: inline-block; width: 24px; height: 16px; margin-right: 8px; "
+    "border-radius: 2px; box-shadow: 0 1px 2px rgba(0,0,0,0.2); "
+    "background-size: cover; background-position: center; background-repeat: no-repeat; }"
+)
+
+
+def clase_bandera(codigo):
+    """Clase CSS de la bandera del equipo `codigo` (FIFA), o '' si no tiene código ISO."""
+    iso = FIFA_TO_ISO.get(codigo, '').lower()
+    return f"bandera-{iso}" if iso else ''
+
+
+def codigos_sorteo():
+    """Códigos FIFA de todos los equipos que pueden llegar a los bombos."""
+    datos = cargar_datos()
+    codigos = set()
+    for hoja in ('clasificados', 'repechaje_uefa', 'repechaje_fifa'):
+        codigos.update(datos[hoja]['codigo'].dropna())
+    return sorted(codigos)
+
+
+def _leer_png(iso, desde=None):
+    if desde is not None:
+        with open(os.path.join(desde, f"{iso}.png"), 'rb') as f:
+            return f.read()
+    with urllib.request.urlopen(URL_FLAGCDN.format(iso=iso), timeout=10) as r:
+        return r.read()
+
+
+def construir_css(codigos, desde=None):
+    """
+    Devuelve `(css, faltantes)`: la hoja de estilos con una clase por bandera y la lista de
+    códigos cuya imagen no se pudo obtener (en la UI quedan con el icono de reemplazo).
+    """
+    reglas = [CSS_BASE]
+    faltantes = []
+    for iso in sorted({FIFA_TO_ISO[c].lower() for c in codigos if c in FIFA_TO_ISO}):
+        try:
+            png = _leer_png(iso, desde)
+        except (OSError, urllib.error.URLError):
+            faltantes.append(iso)
+            continue
+        datos = base64.b64encode(png).decode('ascii')
+        reglas.append(f".bandera-{iso} {{ background-image: url(data:image/png;base64,{datos}); }}")
+    faltantes += [c for c in codigos if c not in FIFA_TO_ISO]
+    return "\n".join(reglas) + "\n", faltantes
+
+
+def guardar_css(css, ruta=RUTA_CSS):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'w', encoding='ascii') as f:
+        f.write(css)
+    os.replace(temporal, ruta)
+
+
+def version_css(ruta=RUTA_CSS):
+    """Hash corto del contenido del bundle, para versionar su URL (caché inmutable)."""
+    with open(ruta, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Empaqueta las banderas del sorteo en una hoja CSS local")
+    parser.add_argument('--desde', metavar='DIR',
+                        help="Carpeta con las imágenes <iso>.png (sin red); por defecto se descargan de FlagCDN")
+    parser.add_argument('--salida', default=RUTA_CSS, help=f"Ruta del bundle (por defecto {RUTA_CSS})")
+    args = parser.parse_args()
+
+    codigos = codigos_sorteo()
+    css, faltantes = construir_css(codigos, args.desde)
+    guardar_css(css, args.salida)
+
+    print(f"{css.count('background-image')} banderas en {args.salida} ({len(css) / 1024:.1f} KB)")
+    if faltantes:
+        print(f"Sin imagen: {', '.join(faltantes)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+Suite de benchmarks del camino crítico del sorteo.
+
+Cubre la construcción de bombos (`asignar_bombos` y `ConstructorBombos`), la validación de confederación
+(`checker_validez_grupo` y las reglas compiladas de `restricciones`), el lookahead sobre estados fáciles y adversariales (con y sin
+caché de firmas), el sorteo completo (`sortear_bombo_1` + `sortear_bombo_n`), el kernel
+vectorizado y el refresco de la UI (`update_groups_ui` completo y `update_slot_ui` por bola)
+sobre un cliente NiceGUI sin navegador.
+
+Cada benchmark reporta operaciones por segundo, latencia p50/p99 por operación y memoria
+pico (tracemalloc, en una pasada aparte para no contaminar los tiempos). Los resultados
+se guardan en `03_resultados/benchmarks/` como JSON con el commit actual, y `--comparar`
+marca las regresiones respecto a una ejecución anterior:
+
+    python 02_scripts/benchmarks.py
+    python 02_scripts/benchmarks.py --comparar 03_resultados/benchmarks/<anterior>.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from estado_sorteo import EstadoSorteo, GRUPOS
+from factibilidad import CACHE
+from semillas import random_sorteo
+from simular_bombos import asignar_bombos, df_clasificados
+from simular_sorteo_func import (TABLA, checker_validez_grupo, df_bombos, lookahead,
+                                 lookahead_estado, sortear_bombo_1, sortear_bombo_n)
+
+DIR_RESULTADOS = '03_resultados/benchmarks'
+
+#Semilla fija: los estados de cada benchmark son los mismos en todas las ejecuciones
+SEMILLA = 2026
+
+
+def _medir(fn, repeticiones, calentamiento=3):
+    """Latencias (s) de `repeticiones` llamadas a `fn()`, tras `calentamiento` llamadas."""
+    for _ in range(calentamiento):
+        fn()
+    latencias = np.empty(repeticiones)
+    reloj = time.perf_counter
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(repeticiones):
+            t0 = reloj()
+            fn()
+            latencias[i] = reloj() - t0
+    finally:
+        if gc_activo:
+            gc.enable()
+    return latencias
+
+
+def _memoria_pico(fn, repeticiones):
+    """Memoria pico (bytes) asignada durante `repeticiones` llamadas a `fn()`."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for _ in range(repeticiones):
+            fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _resumen(latencias, pico, ops_por_llamada=1):
+    total = latencias.sum()
+    return {
+        'n': int(len(latencias) * ops_por_llamada),
+        'ops_s': len(latencias) * ops_por_llamada / total if total else float('inf'),
+        'p50_us': float(np.percentile(latencias, 50) / ops_por_llamada * 1e6),
+        'p99_us': float(np.percentile(latencias, 99) / ops_por_llamada * 1e6),
+        'memoria_pico_kb': pico / 1024,
+    }
+
+
+def _ciclico(casos, operacion):
+    """Función sin argumentos que recorre `casos` en orden aplicando `operacion`."""
+    i = 0
+
+    def fn():
+        nonlocal i
+        operacion(*casos[i % len(casos)])
+        i += 1
+    return fn
+
+
+# --- Estados de prueba ---
+
+def _sorteo_completo(indice):
+    rng = random_sorteo(SEMILLA, indice)
+    grupos_dict, asignaciones, slots = sortear_bombo_1(df_bombos, verbose=False, rng=rng)
+    for n_bombo in range(2, 5):
+        grupos_dict, asignaciones, slots = sortear_bombo_n(
+            n_bombo, df_bombos, slots, grupos_dict, asignaciones, verbose=False, rng=rng
+        )
+    return grupos_dict, asignaciones, slots
+
+
+def _casos_checker(n_casos):
+    """(grupo, equipo, grupos_dict) a mitad del bombo 3 de sorteos reales."""
+    casos = []
+    for k in range(n_casos):
+        grupos_dict, _, _ = _sorteo_completo(k)
+        parcial = {g: [e for e in equipos if TABLA.bombo[TABLA.idx[e['codigo']]] <= 2]
+                   for g, equipos in grupos_dict.items()}
+        for eq in (TABLA.codigos[e] for e in TABLA.ids_bombo(3)):
+            casos.append((GRUPOS[k % len(GRUPOS)], eq, parcial))
+    return casos
+
+
+def _casos_lookahead(n_sorteos):
+    """
+    Estados de lookahead al inicio del bombo 2 (fáciles: todo abierto, mucha holgura) y a
+    mitad del bombo 4 donde el lookahead rechaza algún grupo válido (adversariales).
+    Cada caso es (estado, grupo, equipo, restantes, n_bombo).
+    """
+    faciles, adversariales = [], []
+    for k in range(n_sorteos):
+        grupos_dict, _, _ = _sorteo_completo(k)
+        rng = random_sorteo(SEMILLA + 1, k)
+
+        #Fácil: tras el bombo 1, primera bola del bombo 2 en su primer grupo válido
+        cabezas = {g: [e for e in equipos if e['slot'].endswith('1')] for g, equipos in grupos_dict.items()}
+        estado = EstadoSorteo.desde_grupos_dict(TABLA, cabezas)
+        bombo = TABLA.ids_bombo(2)
+        rng.shuffle(bombo)
+        eq = bombo.pop()
+        g = next(g for g in range(len(GRUPOS)) if estado.valido(g, eq))
+        faciles.append((estado, g, eq, bombo, 2))
+
+        #Adversarial: bombos 1-3 colocados y un prefijo aleatorio del bombo 4 en sus grupos finales
+        previos = {g: [e for e in equipos if TABLA.bombo[TABLA.idx[e['codigo']]] <= 3]
+                   for g, equipos in grupos_dict.items()}
+        destino = {TABLA.idx[e['codigo']]: GRUPOS.index(g)
+                   for g, equipos in grupos_dict.items() for e in equipos}
+        bombo = TABLA.ids_bombo(4)
+        rng.shuffle(bombo)
+        for m in range(len(bombo) - 1):
+            estado = EstadoSorteo.desde_grupos_dict(TABLA, previos)
+            for e in bombo[:m]:
+                estado.colocar(e, destino[e])
+            eq, restantes = bombo[m], bombo[m + 1:]
+            for g in range(len(GRUPOS)):
+                if estado.tamano[g] < 4 and estado.valido(g, eq) \
+                        and not lookahead_estado(estado, g, eq, restantes, 4, cache=None):
+                    adversariales.append((estado, g, eq, restantes, 4))
+                    break
+    return faciles, adversariales
+
+
+# --- Benchmarks ---
+
+def bench_asignar_bombos(rapido):
+    from constructor_bombos import ConstructorBombos
+    resultados = {}
+    fn = lambda: asignar_bombos(df_clasificados, random_state=SEMILLA)
+    reps = 20 if rapido else 100
+    resultados['asignar_bombos'] = _resumen(_medir(fn, reps), _memoria_pico(fn, 5))
+
+    #Constructor precompilado: una asignación por llamada y lotes de 10.000
+    constructor = ConstructorBombos()
+    rng = np.random.default_rng(SEMILLA)
+    fn = lambda: constructor.ids_por_llave(rng.integers(0, constructor.tamanos))
+    resultados['constructor_bombos'] = _resumen(_medir(fn, reps * 100), _memoria_pico(fn, 500))
+    tamano = 10_000
+    fn = lambda: constructor.sortear(rng, tamano)
+    resultados['constructor_bombos_lote'] = _resumen(_medir(fn, reps), _memoria_pico(fn, 5), ops_por_llamada=tamano)
+    return resultados
+
+
+def bench_checker(rapido):
+    casos = _casos_checker(5 if rapido else 20)
+    fn = _ciclico(casos, lambda g, eq, gd: checker_validez_grupo(g, eq, gd, verbose=False))
+    reps = 5_000 if rapido else 50_000
+    return _resumen(_medir(fn, reps), _memoria_pico(fn, 1_000))
+
+
+def bench_lookahead(rapido):
+    faciles, adversariales = _casos_lookahead(10 if rapido else 40)
+    reps = 2_000 if rapido else 20_000
+    resultados = {}
+    for nombre, casos in (('facil', faciles), ('adversarial', adversariales)):
+        for sufijo, cache in (('', CACHE), ('_sin_cache', None)):
+            fn = _ciclico(casos, lambda est, g, eq, rest, n, c=cache: lookahead_estado(est, g, eq, rest, n, cache=c))
+            resultados[f'lookahead_{nombre}{sufijo}'] = _resumen(_medir(fn, reps), _memoria_pico(fn, 500))
+        resultados[f'lookahead_{nombre}']['casos'] = len(casos)
+
+    #Envoltorio original sobre grupos_dict (incluye la conversión a EstadoSorteo)
+    grupos_dict, _, _ = _sorteo_completo(0)
+    cabezas = {g: [e for e in equipos if e['slot'].endswith('1')] for g, equipos in grupos_dict.items()}
+    bombo = [TABLA.codigos[e] for e in TABLA.ids_bombo(2)]
+    fn = lambda: lookahead('A', bombo[0], bombo[1:], cabezas, None, 2)
+    resultados['lookahead_grupos_dict'] = _resumen(_medir(fn, reps // 10), _memoria_pico(fn, 100))
+    return resultados
+
+
+def bench_restricciones(rapido):
+    """
+    Validación con reglas compiladas (`REGLAS_FIFA` frente a `EstadoSorteo.valido`) y sorteo
+    completo con las reglas 2026 (mínimo UEFA por grupo y mitades del cuadro).
+    """
+    from restricciones import REGLAS_FIFA, compilar, reglas_2026
+    from simular_sorteo_func import sortear_completo
+    resultados = {}
+    fifa = compilar(REGLAS_FIFA, TABLA)
+    casos = [(estado, g, eq) for estado, g, eq, _, _ in _casos_lookahead(5 if rapido else 20)[0]]
+    reps = 5_000 if rapido else 50_000
+    fn = _ciclico(casos, lambda estado, g, eq: estado.valido(g, eq))
+    resultados['valido_estado'] = _resumen(_medir(fn, reps), _memoria_pico(fn, 1_000))
+    fn = _ciclico(casos, lambda estado, g, eq: fifa.valido(estado, g, eq))
+    resultados['valido_reglas'] = _resumen(_medir(fn, reps), _memoria_pico(fn, 1_000))
+
+    reglas = compilar(reglas_2026(df_bombos), TABLA)
+    indices = iter(range(10**9))
+    fn = lambda: sortear_completo(df_bombos, verbose=False, rng=random_sorteo(SEMILLA, next(indices)),
+                                  reglas=reglas)
+    resultados['sorteo_reglas_2026'] = _resumen(_medir(fn, 100 if rapido else 1_000), _memoria_pico(fn, 10))
+    return resultados
+
+
+def bench_sorteo_completo(rapido):
+    indices = iter(range(10**9))
+    fn = lambda: _sorteo_completo(next(indices))
+    reps = 200 if rapido else 2_000
+    return _resumen(_medir(fn, reps), _memoria_pico(fn, 20))
+
+
+def bench_kernel(rapido):
+    from kernel_vectorizado import sortear_bloque
+    from semillas import generador_sorteo
+    tamano = 10_000
+    rng = generador_sorteo(SEMILLA, 0)
+    fn = lambda: sortear_bloque(tamano, rng)
+    reps = 5 if rapido else 30
+    return _resumen(_medir(fn, reps, calentamiento=1), _memoria_pico(fn, 1), ops_por_llamada=tamano)
+
+
+def bench_torneo(rapido):
+    """Torneos completos (grupos, terceros y eliminatorias) sobre un bloque de sorteos del kernel."""
+    from kernel_vectorizado import sortear_bloque
+    from semillas import FLUJO_TORNEO, generador_sorteo
+    from simulacion_torneo import contar_rondas, matrices_grupos
+    grupos = matrices_grupos(*sortear_bloque(10_000, generador_sorteo(SEMILLA, 0)))
+    rng = generador_sorteo(SEMILLA, 0, FLUJO_TORNEO)
+    fn = lambda: contar_rondas(grupos, rng)
+    reps = 5 if rapido else 30
+    return _resumen(_medir(fn, reps, calentamiento=1), _memoria_pico(fn, 1), ops_por_llamada=len(grupos))
+
+
+def bench_ui_refresh(rapido):
+    """
+    Refresco de la UI sobre un cliente NiceGUI sin navegador: `update_groups_ui` completo
+    (48 slots) y la actualización por bola de la app (`update_slot_ui` + línea de `ui.log`).
+    `elementos` es el número de elementos que cada operación encola para el websocket.
+    """
+    try:
+        from nicegui import Client, ui
+        import sorteo_fifa
+    except ImportError:
+        return None
+
+    reps = 100 if rapido else 1_000
+    resultados = {}
+    cliente = Client(ui.page('/benchmark'))
+    with cliente:
+        estado = sorteo_fifa.SorteoManager()
+        _, ui_refs = sorteo_fifa.build_groups_grid(estado)
+        registro = ui.log(max_lines=sorteo_fifa.MAX_LOG_LINES)
+
+        #Elementos distintos que se encolan para el websocket
+        pendientes = set()
+        encolar = cliente.outbox.enqueue_update
+
+        def contar_update(elemento):
+            pendientes.add(elemento.id)
+            encolar(elemento)
+        cliente.outbox.enqueue_update = contar_update
+        vacio = {g: [] for g in estado.grupos}
+        completo, asignaciones, _ = _sorteo_completo(0)
+
+        #Refresco completo: alternamos tablero vacío y lleno para que cambien los 48 slots
+        tableros = [vacio, completo]
+        i = 0
+
+        def completo_fn():
+            nonlocal i
+            estado.grupos_dict = tableros[i % 2]
+            sorteo_fifa.update_groups_ui(estado, ui_refs)
+            i += 1
+
+        completo_fn()
+        pendientes.clear()
+        completo_fn()
+        elementos = len(pendientes)
+        resultados['ui_refresh'] = _resumen(_medir(completo_fn, reps), _memoria_pico(completo_fn, 20))
+        resultados['ui_refresh']['elementos'] = elementos
+
+        #Por bola: sólo el slot asignado y una línea nueva del registro
+        bolas = [(eq, info) for eq, info in asignaciones.items()]
+        j = 0
+
+        def bola_fn():
+            nonlocal j
+            eq, info = bolas[j % len(bolas)]
+            sorteo_fifa.update_slot_ui(ui_refs[info['grupo']][int(info['slot'][1:])],
+                                       {'codigo': eq, 'conf': info['conf']})
+            registro.push(f"SORTEADO: {eq} -> Grupo {info['grupo']} ({info['slot']})")
+            j += 1
+
+        pendientes.clear()
+        bola_fn()
+        elementos = len(pendientes)
+        resultados['ui_por_bola'] = _resumen(_medir(bola_fn, reps * 10), _memoria_pico(bola_fn, 200))
+        resultados['ui_por_bola']['elementos'] = elementos
+    cliente.delete()
+    return resultados
+
+
+BENCHMARKS = {
+    'asignar_bombos': bench_asignar_bombos,
+    'checker_validez_grupo': bench_checker,
+    'lookahead': bench_lookahead,
+    'sorteo_completo': bench_sorteo_completo,
+    'restricciones': bench_restricciones,
+    'kernel_vectorizado': bench_kernel,
+    'torneo': bench_torneo,
+    'ui': bench_ui_refresh,
+}
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconocido'
+
+
+def ejecutar(nombres=None, rapido=False):
+    """Ejecuta los benchmarks pedidos (todos por defecto) y devuelve el registro completo."""
+    resultados = {}
+    for nombre in nombres or BENCHMARKS:
+        r = BENCHMARKS[nombre](rapido)
+        if r is None:
+            continue
+        #Algunos benchmarks devuelven varias variantes
+        if 'ops_s' in r:
+            resultados[nombre] = r
+        else:
+            resultados.update(r)
+    return {
+        'commit': _commit_actual(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'rapido': rapido,
+        'resultados': resultados,
+    }
+
+
+def comparar(actual, anterior, umbral=0.10):
+    """Lista de (nombre, p50 anterior, p50 actual, cambio) con p50 peor que `umbral`."""
+    regresiones = []
+    for nombre, r in actual['resultados'].items():
+        previo = anterior['resultados'].get(nombre)
+        if not previo:
+            continue
+        cambio = r['p50_us'] / previo['p50_us'] - 1 if previo['p50_us'] else 0.0
+        if cambio > umbral:
+            regresiones.append((nombre, previo['p50_us'], r['p50_us'], cambio))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del sorteo FIFA World Cup 2026")
+    parser.add_argument('benchmarks', nargs='*', metavar='BENCHMARK',
+                        help=f"Benchmarks a ejecutar (por defecto todos): {', '.join(BENCHMARKS)}")
+    parser.add_argument('--rapido', action='store_true', help="Menos repeticiones (humo)")
+    parser.add_argument('--comparar', default=None, metavar='JSON',
+                        help="Resultado anterior contra el que buscar regresiones")
+    parser.add_argument('--umbral', type=float, default=0.10,
+                        help="Empeoramiento relativo de p50 que cuenta como regresión")
+    parser.add_argument('--no-guardar', action='store_true')
+    args = parser.parse_args()
+    desconocidos = set(args.benchmarks) - set(BENCHMARKS)
+    if desconocidos:
+        parser.error(f"benchmarks desconocidos: {', '.join(sorted(desconocidos))}")
+
+    registro = ejecutar(args.benchmarks, rapido=args.rapido)
+
+    print(f"{'benchmark':<34}{'ops/s':>12}{'p50 µs':>12}{'p99 µs':>12}{'pico KB':>10}{'elementos':>11}")
+    for nombre, r in registro['resultados'].items():
+        print(f"{nombre:<34}{r['ops_s']:>12.0f}{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}"
+              f"{r['memoria_pico_kb']:>10.0f}{r.get('elementos', ''):>11}")
+
+    if not args.no_guardar:
+        os.makedirs(DIR_RESULTADOS, exist_ok=True)
+        fecha = registro['fecha'].replace(':', '').replace('-', '')
+        ruta = os.path.join(DIR_RESULTADOS, f"{fecha}_{registro['commit']}.json")
+        with open(ruta, 'w') as f:
+            json.dump(registro, f, indent=2)
+        print(f"\nGuardado en {ruta}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            anterior = json.load(f)
+        regresiones = comparar(registro, anterior, args.umbral)
+        print(f"\nComparación contra {anterior['commit']} ({anterior['fecha']}):")
+        for nombre, antes, ahora, cambio in regresiones:
+            print(f"  REGRESIÓN {nombre}: p50 {antes:.1f} → {ahora:.1f} µs (+{cambio:.0%})")
+        if regresiones:
+            sys.exit(1)
+        print("  sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
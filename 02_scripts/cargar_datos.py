@@ -0,0 +1,104 @@
+"""
+Carga de los datos brutos con snapshot binario.
+
+La primera carga lee el libro Excel una sola vez (las tres hojas en una llamada) y el
+CSV del Power Ranking, y guarda un snapshot pickle junto a los archivos de entrada.
+Las cargas siguientes (CLI, app y cada worker del Monte Carlo) leen el snapshot en vez
+de volver a parsear el Excel con openpyxl.
+
+El snapshot se invalida cuando cambia algún archivo fuente: se guarda el mtime, el
+tamaño y el sha256 de cada uno; si el mtime o el tamaño difieren se recalcula el hash y
+sólo se reconstruye si el contenido cambió de verdad.
+"""
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+
+DIR_DATOS = '01_datos_brutos'
+RUTA_LIBRO = os.path.join(DIR_DATOS, 'Clasificados_WC_26.xlsx')
+RUTA_RANKING = os.path.join(DIR_DATOS, 'FIFA_PR_19_11_2025.csv')
+RUTA_SNAPSHOT = os.path.join(DIR_DATOS, '.snapshot_datos.pkl')
+
+HOJAS = ('Clasificados', 'Repechaje_UEFA', 'Repechaje_FIFA')
+
+#Cambiar si cambia el formato del snapshot
+VERSION_SNAPSHOT = 1
+
+
+def _sha256(ruta):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _huella(ruta, anterior=None):
+    """(mtime_ns, tamaño, sha256) de un archivo; reutiliza el hash si mtime y tamaño no cambiaron."""
+    st = os.stat(ruta)
+    if anterior is not None and anterior[:2] == (st.st_mtime_ns, st.st_size):
+        return anterior
+    return (st.st_mtime_ns, st.st_size, _sha256(ruta))
+
+
+def _leer_fuentes():
+    #Una sola apertura del libro para las tres hojas
+    hojas = pd.read_excel(RUTA_LIBRO, sheet_name=list(HOJAS))
+    ranking = pd.read_csv(RUTA_RANKING).drop(columns=['Unnamed: 7'])
+    return {
+        'clasificados': hojas['Clasificados'],
+        'repechaje_uefa': hojas['Repechaje_UEFA'],
+        'repechaje_fifa': hojas['Repechaje_FIFA'],
+        'power_ranking': ranking,
+    }
+
+
+def _leer_snapshot(ruta):
+    try:
+        with open(ruta, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _guardar_snapshot(ruta, snapshot):
+    #Escritura atómica: varios procesos pueden reconstruir el snapshot a la vez
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+    except OSError:
+        #Sin permisos de escritura: se sigue con los datos en memoria
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def cargar_datos(ruta_snapshot=RUTA_SNAPSHOT, usar_snapshot=True):
+    """
+    Devuelve un diccionario de DataFrames: 'clasificados', 'repechaje_uefa',
+    'repechaje_fifa' y 'power_ranking'. Usa el snapshot si sigue vigente.
+    """
+    fuentes = (RUTA_LIBRO, RUTA_RANKING)
+    snapshot = _leer_snapshot(ruta_snapshot) if usar_snapshot else None
+
+    if snapshot is not None and snapshot.get('version') == VERSION_SNAPSHOT:
+        anteriores = snapshot['huellas']
+        huellas = {r: _huella(r, anteriores.get(r)) for r in fuentes}
+        if all(huellas[r][2] == anteriores.get(r, (None,) * 3)[2] for r in fuentes):
+            if huellas != anteriores:
+                #Contenido igual con mtime nuevo: actualizamos las huellas para no re-hashear
+                snapshot['huellas'] = huellas
+                _guardar_snapshot(ruta_snapshot, snapshot)
+            return snapshot['datos']
+
+    datos = _leer_fuentes()
+    if usar_snapshot:
+        _guardar_snapshot(ruta_snapshot, {
+            'version': VERSION_SNAPSHOT,
+            'huellas': {r: _huella(r) for r in fuentes},
+            'datos': datos,
+        })
+    return datos
@@ -0,0 +1,127 @@
+"""
+Constructor de bombos precompilado para bucles sobre resultados de repechaje.
+
+`asignar_bombos` hace dos merges, un sort, varios filtros `isin`, cadenas `head`/`drop` y
+cuatro `concat` en cada llamada (~10 ms). Pero los bombos 1-3 y la parte fija del bombo 4 sólo
+dependen del ranking de los clasificados, no de quién gana el repechaje: `ConstructorBombos` los
+calcula una vez y un sorteo de bombos pasa a ser aritmética de índices sobre arrays.
+
+Cada asignación es un vector de 48 ids enteros sobre un "universo" fijo de equipos (clasificados +
+todos los candidatos de repechaje); la fila i del resultado va al bombo `bombo[i]`.
+`tabla(ids)` lo materializa como el DataFrame que devolvería `asignar_bombos`.
+
+Uso (verifica los 2304 escenarios contra `asignar_bombos` y mide ambos):
+    python 02_scripts/constructor_bombos.py
+"""
+import time
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from estado_sorteo import IDX_CONF
+from simular_bombos import (asignar_bombos, df_clasificados, df_power_ranking,
+                            df_repechaje_fifa, df_repechaje_uefa)
+
+
+class ConstructorBombos:
+    """
+    Bombos por índices. `universo` tiene una fila por equipo posible con las columnas de
+    `asignar_bombos`; `conf` y `codigos` son sus arrays por id.
+    """
+
+    def __init__(self, df_clasificados=df_clasificados, df_repechaje_uefa=df_repechaje_uefa,
+                 df_repechaje_fifa=df_repechaje_fifa):
+        #Única pasada por pandas: bombos sin ganadores de repechaje (ranking ordenado una vez)
+        base = asignar_bombos(df_clasificados, clasificados_uefa=[], clasificados_fifa=[])
+
+        candidatos = []
+        for df in (df_repechaje_uefa, df_repechaje_fifa):
+            c = pd.merge(df, df_power_ranking[['codigo', 'puntos_totales']], on='codigo', how='left')
+            c['anfitrion'] = 0
+            c['bombo'] = 4
+            c['repechaje'] = 1
+            candidatos.append(c[base.columns])
+        self.universo = pd.concat([base] + candidatos, ignore_index=True)
+        self.universo['anfitrion'] = self.universo['anfitrion'].astype(base['anfitrion'].dtype)
+
+        self.n_base = len(base)
+        self.codigos = self.universo['codigo'].to_numpy()
+        self.idx = {c: i for i, c in enumerate(self.codigos)}
+        self.conf = np.array([IDX_CONF[c] for c in self.universo['confederacion']], dtype=np.int8)
+        self._base = np.arange(self.n_base, dtype=np.int16)
+
+        #Llaves: ids de sus candidatos, en el orden en que `asignar_bombos` los concatena
+        self.llaves = []
+        inicio = self.n_base
+        for df in (df_repechaje_uefa, df_repechaje_fifa):
+            llave = df['llave'].to_numpy()
+            for k in np.unique(llave):
+                self.llaves.append(inicio + np.flatnonzero(llave == k))
+            inicio += len(df)
+        self.tamanos = np.array([len(ll) for ll in self.llaves])
+        self._tabla_llaves = np.full((len(self.llaves), self.tamanos.max()), -1, dtype=np.int16)
+        for k, ll in enumerate(self.llaves):
+            self._tabla_llaves[k, :len(ll)] = ll
+
+        self.bombo = np.concatenate([base['bombo'].to_numpy(), np.full(len(self.llaves), 4)]).astype(np.int8)
+
+    def ids(self, ganadores_uefa, ganadores_fifa):
+        """Vector de ids de los bombos con esos ganadores (como `asignar_bombos(..., uefa, fifa)`)."""
+        #`asignar_bombos` toma los ganadores en el orden de su hoja, que es el orden de ids
+        uefa = sorted(self.idx[c] for c in ganadores_uefa)
+        fifa = sorted(self.idx[c] for c in ganadores_fifa)
+        return np.concatenate([self._base, np.array(uefa + fifa, dtype=np.int16)])
+
+    def ids_por_llave(self, elecciones):
+        """Ids de los bombos eligiendo el candidato `elecciones[k]` (posición) en cada llave k."""
+        ganadores = self._tabla_llaves[np.arange(len(self.llaves)), elecciones]
+        return np.concatenate([self._base, ganadores])
+
+    def sortear(self, rng, n):
+        """
+        `n` asignaciones de bombos con un ganador uniforme por llave, como matriz n x 48 de ids.
+        `rng` es un `numpy.random.Generator`.
+        """
+        elecciones = (rng.random((n, len(self.llaves))) * self.tamanos).astype(np.int64)
+        ganadores = self._tabla_llaves[np.arange(len(self.llaves)), elecciones]
+        return np.concatenate([np.broadcast_to(self._base, (n, self.n_base)), ganadores], axis=1)
+
+    def tabla(self, ids):
+        """DataFrame de bombos de un vector de ids, idéntico al de `asignar_bombos`."""
+        return self.universo.iloc[ids].reset_index(drop=True)
+
+
+def main():
+    constructor = ConstructorBombos()
+    llaves_uefa = [list(g['codigo']) for _, g in df_repechaje_uefa.groupby('llave', sort=True)]
+    llaves_fifa = [list(g['codigo']) for _, g in df_repechaje_fifa.groupby('llave', sort=True)]
+    escenarios = [(u, f) for u in product(*llaves_uefa) for f in product(*llaves_fifa)]
+
+    inicio = time.perf_counter()
+    referencias = [asignar_bombos(df_clasificados, clasificados_uefa=list(u), clasificados_fifa=list(f))
+                   for u, f in escenarios]
+    t_pandas = (time.perf_counter() - inicio) / len(escenarios)
+
+    inicio = time.perf_counter()
+    vectores = [constructor.ids(u, f) for u, f in escenarios]
+    t_ids = (time.perf_counter() - inicio) / len(escenarios)
+
+    distintos = sum(not constructor.tabla(v).equals(r) for v, r in zip(vectores, referencias))
+    print(f"{len(escenarios)} escenarios, {distintos} distintos de asignar_bombos")
+
+    rng = np.random.default_rng(0)
+    n = 100_000
+    inicio = time.perf_counter()
+    constructor.sortear(rng, n)
+    t_lote = (time.perf_counter() - inicio) / n
+
+    print(f"asignar_bombos:          {t_pandas * 1e6:10.1f} µs por asignación")
+    print(f"ConstructorBombos.ids:   {t_ids * 1e6:10.1f} µs por asignación")
+    print(f"ConstructorBombos.sortear: {t_lote * 1e6:8.3f} µs por asignación (lote de {n})")
+    if distintos:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Agregador en línea de co-ocurrencias: probabilidad de que dos equipos compartan grupo.
+
+`AgregadorCoocurrencia` recibe los sorteos directamente del motor (bloques K x 48 de grupos de
+los kernels, o `asignaciones_sorteo` del motor secuencial) y sólo guarda conteos:
+
+- `pares`: matriz 48 x 48 de sorteos en que los equipos i y j caen en el mismo grupo
+  (la diagonal es el número de sorteos).
+- `rivales_conf`: 48 x 6 x 4, sorteos en que el equipo i tiene 0, 1, 2 o 3 rivales de
+  cada confederación en su grupo.
+
+La memoria es constante (~90 KB) sin importar cuántos sorteos se agreguen. Dos agregadores se
+combinan sumando (`fusionar` o `+=`), así que cada worker lleva el suyo y el proceso principal
+los junta. `guardar`/`cargar` persisten los conteos en `.npz` para seguir acumulando entre
+corridas; `prob_mismo_grupo` y `dist_rivales_conf` los exponen como probabilidades.
+
+Uso:
+    python 02_scripts/coocurrencia.py -n 1000000 --semilla 2026 --salida 03_resultados
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from estado_sorteo import CONFEDERACIONES, GRUPOS, IDX_GRUPO
+from simular_sorteo_func import TABLA
+
+#Máximo de rivales de una confederación en un grupo de 4
+MAX_RIVALES = 3
+
+
+class AgregadorCoocurrencia:
+    """Conteos de co-ocurrencia por grupo sobre los equipos de `tabla`."""
+
+    def __init__(self, tabla=TABLA):
+        self.codigos = list(tabla.codigos)
+        self.conf = tabla.conf.astype(np.int64)
+        n_equipos = len(self.codigos)
+        self.n_sorteos = 0
+        self.pares = np.zeros((n_equipos, n_equipos), dtype=np.int64)
+        self.rivales_conf = np.zeros((n_equipos, len(CONFEDERACIONES), MAX_RIVALES + 1), dtype=np.int64)
+
+    def agregar(self, grupo_de):
+        """Acumula un bloque de sorteos: `grupo_de` (K x 48, grupo 0-11 de cada equipo)."""
+        grupo_de = np.asarray(grupo_de, dtype=np.int64).reshape(-1, len(self.codigos))
+        k, n_equipos = grupo_de.shape
+        if not k:
+            return
+
+        #Equipos de cada grupo (ordenar la fila por grupo deja 12 cuartetos) y sus 16 pares ordenados
+        cuartetos = np.argsort(grupo_de, axis=1, kind='stable').reshape(k, len(GRUPOS), 4)
+        self.pares += np.bincount((cuartetos[:, :, :, None] * n_equipos + cuartetos[:, :, None, :]).ravel(),
+                                  minlength=self.pares.size).reshape(self.pares.shape)
+
+        #Conteo de confederaciones por (sorteo, grupo); los rivales son ese conteo menos el propio equipo
+        celda = np.arange(k)[:, None] * len(GRUPOS) + grupo_de
+        conf_grupo = np.bincount((celda * len(CONFEDERACIONES) + self.conf).ravel(),
+                                 minlength=k * len(GRUPOS) * len(CONFEDERACIONES))
+        rivales = conf_grupo.reshape(-1, len(CONFEDERACIONES)).astype(np.int8)[celda]
+        rivales[:, np.arange(n_equipos), self.conf] -= 1
+        for v in range(MAX_RIVALES + 1):
+            self.rivales_conf[:, :, v] += (rivales == v).sum(axis=0)
+        self.n_sorteos += k
+
+    def agregar_asignaciones(self, asignaciones):
+        """Acumula un sorteo del motor secuencial (`asignaciones_sorteo` o `{codigo: {'grupo': ...}}`)."""
+        self.agregar([IDX_GRUPO[asignaciones[eq]['grupo']] for eq in self.codigos])
+
+    def fusionar(self, otro):
+        """Suma los conteos de `otro` (p. ej. el agregador de otro worker)."""
+        if otro.codigos != self.codigos:
+            raise ValueError("Los agregadores tienen tablas de equipos distintas")
+        self.n_sorteos += otro.n_sorteos
+        self.pares += otro.pares
+        self.rivales_conf += otro.rivales_conf
+        return self
+
+    __iadd__ = fusionar
+
+    def prob_mismo_grupo(self):
+        """DataFrame 48 x 48 con la probabilidad de que cada par de equipos comparta grupo."""
+        return pd.DataFrame(self.pares / max(self.n_sorteos, 1), index=self.codigos, columns=self.codigos)
+
+    def dist_rivales_conf(self):
+        """
+        DataFrame con la probabilidad de que cada equipo tenga 0-3 rivales de cada confederación
+        (índice equipo, confederación; columnas 0..3).
+        """
+        n_equipos = len(self.codigos)
+        indice = pd.MultiIndex.from_product([self.codigos, CONFEDERACIONES], names=['equipo', 'confederacion'])
+        return pd.DataFrame(self.rivales_conf.reshape(n_equipos * len(CONFEDERACIONES), -1) / max(self.n_sorteos, 1),
+                            index=indice, columns=range(MAX_RIVALES + 1))
+
+    def guardar(self, ruta):
+        """Guarda los conteos (no las probabilidades) para fusionarlos más tarde."""
+        np.savez_compressed(ruta, codigos=np.array(self.codigos), n_sorteos=self.n_sorteos,
+                            pares=self.pares, rivales_conf=self.rivales_conf)
+
+    @classmethod
+    def cargar(cls, ruta, tabla=TABLA):
+        agregador = cls(tabla)
+        with np.load(ruta) as datos:
+            if list(datos['codigos']) != agregador.codigos:
+                raise ValueError(f"{ruta} tiene otra tabla de equipos")
+            agregador.n_sorteos = int(datos['n_sorteos'])
+            agregador.pares += datos['pares']
+            agregador.rivales_conf += datos['rivales_conf']
+        return agregador
+
+
+def main():
+    from simulacion_montecarlo import simular_lote
+
+    parser = argparse.ArgumentParser(description="Probabilidad de compartir grupo entre equipos")
+    parser.add_argument('-n', '--sorteos', type=int, default=100_000, help="Número de sorteos completos")
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--equipo', default='ARG', help="Equipo del que se muestran los rivales más probables")
+    parser.add_argument('--salida', default=None,
+                        help="Directorio donde guardar coocurrencia.npz, prob_mismo_grupo.csv y rivales_conf.csv")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultado = simular_lote(args.sorteos, n_procesos=args.procesos, semilla=args.semilla, coocurrencia=True)
+    duracion = time.perf_counter() - inicio
+    agregador = resultado['coocurrencia']
+    print(f"{agregador.n_sorteos} sorteos en {duracion:.1f} s, semilla {resultado['semilla']}")
+
+    prob = agregador.prob_mismo_grupo()
+    print(f"\n--- Rivales más probables de {args.equipo} ---")
+    print(prob[args.equipo].drop(args.equipo).sort_values(ascending=False).head(10).round(4).to_string())
+    print(f"\n--- Rivales de {args.equipo} por confederación ---")
+    print(agregador.dist_rivales_conf().loc[args.equipo].round(4).to_string())
+
+    if args.salida:
+        os.makedirs(args.salida, exist_ok=True)
+        agregador.guardar(os.path.join(args.salida, 'coocurrencia.npz'))
+        prob.to_csv(os.path.join(args.salida, 'prob_mismo_grupo.csv'))
+        agregador.dist_rivales_conf().to_csv(os.path.join(args.salida, 'rivales_conf.csv'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Enumeración exhaustiva de los escenarios de repechaje con bombos y probabilidades precalculados.
+
+Un escenario es una combinación de ganadores: uno por llave del repechaje UEFA (4^4 = 256) y
+uno por llave del repechaje FIFA (3^2 = 9), 2304 en total. Para cada uno se guarda su tabla de
+bombos (la de `asignar_bombos` con esos ganadores, vía `ConstructorBombos`) y su tabla de
+probabilidades equipo x grupo / slot. Las probabilidades son las de `probabilidades_hibridas`:
+exactas para los bombos 1 y 2, estimadas con `--muestras` recorridos para los bombos 3 y 4.
+
+Los ganadores de repechaje van siempre al bombo 4, así que las probabilidades del sorteo sólo
+dependen de la composición por confederación del bombo 4 (su "perfil"): los equipos de la misma
+confederación y bombo son intercambiables. Los 2304 escenarios comparten unos pocos perfiles, y
+`probabilidades_hibridas` se corre una vez por perfil.
+
+Todo se guarda en un único almacén en disco (`03_resultados/escenarios_repechaje.pkl`) con un
+índice ganadores -> escenario, así que "¿y si clasifican Italia y Bolivia?" es una consulta:
+
+    python 02_scripts/escenarios_repechaje.py --construir
+    python 02_scripts/escenarios_repechaje.py --consultar ITA BOL
+"""
+import argparse
+import os
+import pickle
+import time
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from cargar_datos import RUTA_LIBRO, RUTA_RANKING, _huella
+from constructor_bombos import ConstructorBombos
+from estado_sorteo import CONFEDERACIONES, GRUPOS
+from probabilidades_hibridas import SLOTS, estimar_probabilidades_hibridas
+from simular_bombos import df_clasificados, df_repechaje_fifa, df_repechaje_uefa
+
+RUTA_ALMACEN = os.path.join('03_resultados', 'escenarios_repechaje.pkl')
+
+#Cambiar si cambia el formato del almacén
+VERSION_ALMACEN = 1
+
+
+def _llaves(df):
+    return [list(g['codigo']) for _, g in df.groupby('llave', sort=True)]
+
+
+def enumerar_escenarios():
+    """Lista de `(ganadores_uefa, ganadores_fifa)`, una tupla de códigos por llave, en orden fijo."""
+    uefa = list(product(*_llaves(df_repechaje_uefa)))
+    fifa = list(product(*_llaves(df_repechaje_fifa)))
+    return [(u, f) for u in uefa for f in fifa]
+
+
+def _fuentes():
+    return {r: _huella(r)[2] for r in (RUTA_LIBRO, RUTA_RANKING)}
+
+
+def construir_almacen(ruta=RUTA_ALMACEN, n_muestras=20_000, semilla=2026, verbose=True):
+    """Enumera todos los escenarios, calcula bombos y probabilidades y guarda el almacén en `ruta`."""
+    inicio = time.perf_counter()
+    escenarios = enumerar_escenarios()
+    candidatos = pd.concat([df_repechaje_uefa, df_repechaje_fifa])
+    codigos = list(df_clasificados['codigo']) + list(candidatos['codigo'])
+    fila_de = {c: i for i, c in enumerate(codigos)}
+
+    #Bombos de cada escenario como vector de ids del constructor (idénticos a `asignar_bombos`)
+    constructor = ConstructorBombos()
+    ids = np.stack([constructor.ids(uefa, fifa) for uefa, fifa in escenarios])
+    perfil_de = np.empty(len(escenarios), dtype=np.int16)
+    presentes = np.zeros((len(escenarios), len(codigos)), dtype=bool)
+    perfiles = {}  # perfil -> (id, bombos del primer escenario con ese perfil)
+    for i, fila in enumerate(ids):
+        perfil = tuple(sorted(CONFEDERACIONES[c] for c in constructor.conf[fila[constructor.bombo == 4]]))
+        if perfil not in perfiles:
+            perfiles[perfil] = (len(perfiles), constructor.tabla(fila))
+        perfil_de[i] = perfiles[perfil][0]
+        presentes[i, [fila_de[c] for c in constructor.codigos[fila]]] = True
+    if verbose:
+        print(f"{len(escenarios)} escenarios, {len(perfiles)} perfiles de bombo 4 ({time.perf_counter() - inicio:.1f} s)")
+
+    conf_de = candidatos.set_index('codigo')['confederacion']
+    prob_grupo = np.zeros((len(perfiles), len(codigos), len(GRUPOS)))
+    prob_slot = np.zeros((len(perfiles), len(codigos), len(SLOTS)))
+    for perfil, (p, bombos) in perfiles.items():
+        resultado = estimar_probabilidades_hibridas(bombos, n_muestras=n_muestras, semilla=semilla)
+        #Candidatos que no están en el escenario representativo: misma fila que un equipo
+        #del bombo 4 de su confederación (son intercambiables)
+        representante = {}
+        for codigo, conf in bombos.loc[bombos['bombo'] == 4, ['codigo', 'confederacion']].itertuples(index=False):
+            representante.setdefault(conf, codigo)
+        for codigo, fila in fila_de.items():
+            origen = codigo if codigo in resultado['prob_grupo'].index else representante.get(conf_de.get(codigo))
+            if origen is not None:
+                prob_grupo[p, fila] = resultado['prob_grupo'].loc[origen].to_numpy()
+                prob_slot[p, fila] = resultado['prob_slot'].loc[origen].to_numpy()
+        if verbose:
+            print(f"  perfil {p}: {'/'.join(c for c in perfil if c != 'UEFA')} ({time.perf_counter() - inicio:.1f} s)")
+
+    bombos = constructor.tabla(ids.ravel())
+    bombos.insert(0, 'escenario', np.repeat(np.arange(len(escenarios)), ids.shape[1]))
+    contenido = {
+        'version': VERSION_ALMACEN,
+        'fuentes': _fuentes(),
+        'n_muestras': n_muestras,
+        'semilla': semilla,
+        'escenarios': escenarios,
+        'indice': {frozenset(u + f): i for i, (u, f) in enumerate(escenarios)},
+        'codigos': codigos,
+        'bombos': bombos,
+        'perfil_de': perfil_de,
+        'presentes': presentes,
+        'prob_grupo': prob_grupo,
+        'prob_slot': prob_slot,
+    }
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as f:
+        pickle.dump(contenido, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporal, ruta)
+    return AlmacenEscenarios(contenido)
+
+
+class AlmacenEscenarios:
+    """Consultas sobre el almacén de escenarios (todo en memoria, sin recalcular)."""
+
+    def __init__(self, contenido):
+        self._c = contenido
+        self.escenarios = contenido['escenarios']
+        self.codigos = contenido['codigos']
+        self._fila = {c: i for i, c in enumerate(self.codigos)}
+
+    def __len__(self):
+        return len(self.escenarios)
+
+    def escenario(self, ganadores):
+        """Id del escenario con exactamente esos 6 ganadores (uno por llave)."""
+        clave = frozenset(ganadores)
+        if clave not in self._c['indice']:
+            raise KeyError(f"No hay un escenario con ganadores {sorted(clave)}: hace falta uno por llave")
+        return self._c['indice'][clave]
+
+    def buscar(self, codigos=()):
+        """Ids de los escenarios en los que clasifican todos los `codigos` (todos si está vacío)."""
+        desconocidos = [c for c in codigos if c not in self._fila]
+        if desconocidos:
+            raise KeyError(f"Códigos fuera del repechaje: {desconocidos}")
+        mascara = np.ones(len(self), dtype=bool)
+        for c in codigos:
+            mascara &= self._c['presentes'][:, self._fila[c]]
+        return np.flatnonzero(mascara)
+
+    def bombos(self, id_escenario):
+        """Tabla de bombos del escenario (48 filas, mismas columnas que `asignar_bombos`)."""
+        inicio = int(id_escenario) * 48
+        return self._c['bombos'].iloc[inicio:inicio + 48].drop(columns='escenario').reset_index(drop=True)
+
+    def probabilidades(self, codigos=()):
+        """
+        Probabilidades condicionadas a que clasifiquen los `codigos`, promediando los escenarios
+        compatibles (ganadores equiprobables en cada llave, como `generar_repechaje_*`).
+
+        Devuelve 'prob_grupo' / 'prob_slot' (probabilidad de clasificar y caer en cada grupo / slot),
+        'clasifica' (probabilidad de estar en el sorteo) y 'escenarios' (cuántos se promediaron).
+        Con una combinación completa de ganadores es la tabla de ese escenario (bombos 1 y 2
+        exactos, bombos 3 y 4 estimados, ver `probabilidades_hibridas`).
+        """
+        ids = self.buscar(codigos)
+        if len(ids) == 0:
+            raise KeyError(f"Ningún escenario con {list(codigos)}: ¿dos ganadores de la misma llave?")
+        presentes = self._c['presentes'][ids]
+        perfiles = self._c['perfil_de'][ids]
+        #Suma por perfil de las máscaras de presencia: sólo unos pocos productos de tablas
+        grupo = np.zeros(self._c['prob_grupo'].shape[1:])
+        slot = np.zeros(self._c['prob_slot'].shape[1:])
+        for p in np.unique(perfiles):
+            peso = presentes[perfiles == p].sum(axis=0)[:, None] / len(ids)
+            grupo += peso * self._c['prob_grupo'][p]
+            slot += peso * self._c['prob_slot'][p]
+        return {
+            'prob_grupo': pd.DataFrame(grupo, index=self.codigos, columns=GRUPOS),
+            'prob_slot': pd.DataFrame(slot, index=self.codigos, columns=SLOTS),
+            'clasifica': pd.Series(presentes.mean(axis=0), index=self.codigos),
+            'escenarios': len(ids),
+        }
+
+
+def cargar_almacen(ruta=RUTA_ALMACEN):
+    """Carga el almacén; falla si no existe o si los datos fuente cambiaron desde que se construyó."""
+    with open(ruta, 'rb') as f:
+        contenido = pickle.load(f)
+    if contenido.get('version') != VERSION_ALMACEN:
+        raise ValueError(f"{ruta}: versión de almacén incompatible, reconstruir con --construir")
+    if contenido['fuentes'] != _fuentes():
+        raise ValueError(f"{ruta}: los datos fuente cambiaron, reconstruir con --construir")
+    return AlmacenEscenarios(contenido)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escenarios de repechaje: bombos y probabilidades precalculados")
+    parser.add_argument('--construir', action='store_true', help="Enumera los escenarios y guarda el almacén")
+    parser.add_argument('--muestras', type=int, default=20_000,
+                        help="Recorridos de `probabilidades_hibridas` para los bombos 3 y 4 (por perfil)")
+    parser.add_argument('--semilla', type=int, default=2026)
+    parser.add_argument('--consultar', nargs='*', metavar='CODIGO',
+                        help="Probabilidades por grupo si clasifican esos equipos de repechaje")
+    parser.add_argument('--almacen', default=RUTA_ALMACEN)
+    args = parser.parse_args()
+
+    if args.construir:
+        almacen = construir_almacen(args.almacen, args.muestras, args.semilla)
+    else:
+        almacen = cargar_almacen(args.almacen)
+
+    if args.consultar is not None:
+        inicio = time.perf_counter()
+        try:
+            resultado = almacen.probabilidades(args.consultar)
+        except KeyError as error:
+            print(error.args[0])
+            raise SystemExit(1)
+        tiempo = (time.perf_counter() - inicio) * 1000
+        en_sorteo = resultado['clasifica'] > 0
+        print(f"{resultado['escenarios']} escenarios compatibles con {args.consultar or 'cualquier resultado'} ({tiempo:.1f} ms)")
+        tabla = resultado['prob_grupo'][en_sorteo].copy()
+        tabla['clasifica'] = resultado['clasifica'][en_sorteo]
+        print(tabla.round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Representación compacta del sorteo para el camino crítico (hot path).
+
+- `TablaEquipos`: ids enteros por equipo, confederación y bombo como arrays de NumPy.
+- `EstadoSorteo`: matriz 12x6 de conteos de confederación por grupo, tamaño de cada grupo
+  y grupo/slot de cada equipo. La validez de una asignación es una lectura O(1) del array.
+
+Ninguna de estas estructuras usa pandas una vez construidas.
+"""
+import string
+
+import numpy as np
+
+GRUPOS = list(string.ascii_uppercase[:12])  # A-L
+IDX_GRUPO = {g: i for i, g in enumerate(GRUPOS)}
+
+CONFEDERACIONES = ('AFC', 'CAF', 'CONCACAF', 'CONMEBOL', 'OFC', 'UEFA')
+IDX_CONF = {c: i for i, c in enumerate(CONFEDERACIONES)}
+
+#Máximo de equipos por confederación en un grupo (UEFA permite 2)
+CUPO_CONF = np.array([2 if c == 'UEFA' else 1 for c in CONFEDERACIONES], dtype=np.int8)
+
+
+class TablaEquipos:
+    """Equipos del sorteo indexados por id entero (posición en el DataFrame de bombos)."""
+    __slots__ = ('codigos', 'idx', 'conf', 'bombo')
+
+    def __init__(self, codigos, confs, bombos):
+        self.codigos = list(codigos)
+        self.idx = {eq: i for i, eq in enumerate(self.codigos)}
+        self.conf = np.array([IDX_CONF[c] for c in confs], dtype=np.int8)
+        self.bombo = np.array(bombos, dtype=np.int8)
+
+    @classmethod
+    def desde_df(cls, df_bombos):
+        return cls(df_bombos['codigo'], df_bombos['confederacion'], df_bombos['bombo'])
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def conf_de(self, eq):
+        """Nombre de la confederación de un equipo (por código)."""
+        return CONFEDERACIONES[self.conf[self.idx[eq]]]
+
+    def ids_bombo(self, n_bombo):
+        """Ids de los equipos de un bombo, en el orden del DataFrame."""
+        return [int(i) for i in np.flatnonzero(self.bombo == n_bombo)]
+
+
+class EstadoSorteo:
+    """
+    Estado de un sorteo en curso sobre arrays de tamaño fijo.
+
+    `conteo_conf[g, c]` es el número de equipos de la confederación `c` en el grupo `g`;
+    `tamano[g]` el número de equipos del grupo; `grupo_de[e]` / `slot_de[e]` el grupo y
+    el número de slot (1-4) de cada equipo, o -1 si aún no fue sorteado.
+    """
+    __slots__ = ('tabla', 'conteo_conf', 'tamano', 'grupo_de', 'slot_de')
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.conteo_conf = np.zeros((len(GRUPOS), len(CONFEDERACIONES)), dtype=np.int8)
+        self.tamano = np.zeros(len(GRUPOS), dtype=np.int8)
+        self.grupo_de = np.full(len(tabla), -1, dtype=np.int8)
+        self.slot_de = np.full(len(tabla), -1, dtype=np.int8)
+
+    @classmethod
+    def desde_grupos_dict(cls, tabla, grupos_dict):
+        """Construye el estado a partir del formato `{grupo: [{codigo, slot, conf}, ...]}`."""
+        estado = cls(tabla)
+        for grupo, equipos in grupos_dict.items():
+            g = IDX_GRUPO[grupo]
+            for e in equipos:
+                slot = int(e['slot'][1:]) if e.get('slot') else -1
+                estado.colocar(tabla.idx[e['codigo']], g, slot)
+        return estado
+
+    def valido(self, g, eq):
+        """Constraint de confederación: ¿cabe el equipo `eq` en el grupo `g`?"""
+        c = self.tabla.conf[eq]
+        return self.conteo_conf[g, c] < CUPO_CONF[c]
+
+    def colocar(self, eq, g, slot=-1):
+        self.conteo_conf[g, self.tabla.conf[eq]] += 1
+        self.tamano[g] += 1
+        self.grupo_de[eq] = g
+        self.slot_de[eq] = slot
+
+    def quitar(self, eq):
+        g = self.grupo_de[eq]
+        self.conteo_conf[g, self.tabla.conf[eq]] -= 1
+        self.tamano[g] -= 1
+        self.grupo_de[eq] = -1
+        self.slot_de[eq] = -1
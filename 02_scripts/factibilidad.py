@@ -0,0 +1,368 @@
+"""
+Oráculo de factibilidad para el lookahead del sorteo.
+
+Pregunta: dados los equipos que aún quedan en el bombo, ¿existe alguna forma legal de
+colocarlos en los grupos abiertos? Se modela como un problema de flujo máximo:
+
+    fuente --(equipos restantes de c)--> confederación c
+    confederación c --(cupos libres de c en g)--> grupo g
+    grupo g --(plazas libres de g en este bombo)--> sumidero
+
+Existe una asignación válida si y sólo si el flujo máximo iguala el número de equipos
+restantes. El grafo tiene a lo sumo 6 + 12 nodos internos y el flujo total es <= 12,
+así que la respuesta se obtiene en tiempo polinomial acotado, sin backtracking.
+En el camino crítico se usa `factible_corte`, que evalúa directamente los cortes del
+mismo grafo (<= 63 subconjuntos de confederaciones) y da exactamente la misma respuesta.
+
+`factible_backtracking` conserva la búsqueda recursiva original como referencia y
+`verificar_oraculo` compara los tres oráculos sobre estados reales del sorteo:
+
+    python 02_scripts/factibilidad.py --verificar 200 --semilla 0
+
+(sale con código 1 ante la primera discrepancia; con 20 sorteos tarda ~1 s y forma parte de
+las verificaciones del README).
+
+La respuesta sólo depende del multiconjunto de grupos abiertos (conteos de confederación
+y plazas libres) y del multiconjunto de confederaciones que quedan en el bombo, no de la
+identidad de los equipos ni del orden de los grupos. `factible_estado` reduce el estado a
+esa firma canónica y consulta primero una caché LRU acotada y una tabla precalculada que
+se carga desde disco al importar el módulo (si existe):
+
+    python 02_scripts/factibilidad.py --precalcular 2000
+"""
+import argparse
+import os
+import pickle
+import random
+from collections import OrderedDict
+
+import numpy as np
+
+from estado_sorteo import CONFEDERACIONES, CUPO_CONF, EstadoSorteo
+
+RUTA_TABLA = '03_resultados/tabla_factibilidad.pkl'
+
+
+class CacheFactibilidad:
+    """
+    Caché de respuestas de factibilidad indexada por firma canónica.
+
+    `tabla` guarda las respuestas precalculadas (cargadas de disco, nunca se desalojan);
+    `lru` las calculadas en esta ejecución, acotadas a `maxsize` entradas.
+    """
+    __slots__ = ('maxsize', 'tabla', 'lru', 'aciertos', 'fallos')
+
+    def __init__(self, maxsize=1 << 16):
+        self.maxsize = maxsize
+        self.tabla = {}
+        self.lru = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def consultar(self, firma):
+        """Devuelve la respuesta guardada para `firma`, o None si no está."""
+        valor = self.tabla.get(firma)
+        if valor is None:
+            valor = self.lru.get(firma)
+            if valor is not None:
+                #Otro hilo (pool de la app) puede haberla desalojado entre get y move_to_end
+                try:
+                    self.lru.move_to_end(firma)
+                except KeyError:
+                    pass
+        if valor is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return valor
+
+    def guardar(self, firma, valor):
+        self.lru[firma] = valor
+        if len(self.lru) > self.maxsize:
+            try:
+                self.lru.popitem(last=False)
+            except KeyError:
+                pass
+
+    def limpiar(self):
+        self.tabla.clear()
+        self.lru.clear()
+        self.aciertos = self.fallos = 0
+
+    def guardar_tabla(self, ruta=RUTA_TABLA):
+        """Persiste la tabla precalculada junto con lo aprendido en esta ejecución."""
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        with open(ruta, 'wb') as f:
+            pickle.dump({**self.tabla, **self.lru}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def cargar_tabla(self, ruta=RUTA_TABLA):
+        with open(ruta, 'rb') as f:
+            self.tabla.update(pickle.load(f))
+
+
+CACHE = CacheFactibilidad()
+if os.path.exists(RUTA_TABLA):
+    CACHE.cargar_tabla(RUTA_TABLA)
+
+
+def factible_flujo(restantes_conf, holgura, capacidad):
+    """
+    Devuelve True si los equipos restantes caben en los grupos abiertos.
+
+    - `restantes_conf[c]`: equipos de la confederación `c` que faltan por colocar.
+    - `holgura[g][c]`: cuántos equipos más de `c` admite el grupo `g`.
+    - `capacidad[g]`: plazas libres del grupo `g` en el bombo actual.
+    """
+    demanda = int(sum(restantes_conf))
+    if demanda == 0:
+        return True
+
+    confs = [c for c in range(len(restantes_conf)) if restantes_conf[c] > 0]
+    grupos = [g for g in range(len(capacidad)) if capacidad[g] > 0]
+    if demanda > sum(int(capacidad[g]) for g in grupos):
+        return False
+
+    #Nodos: 0 fuente, 1..k confederaciones, k+1..k+m grupos, último sumidero
+    k, m = len(confs), len(grupos)
+    sumidero = k + m + 1
+    cap = [[0] * (sumidero + 1) for _ in range(sumidero + 1)]
+    for i, c in enumerate(confs, start=1):
+        cap[0][i] = int(restantes_conf[c])
+        for j, g in enumerate(grupos, start=k + 1):
+            cap[i][j] = int(holgura[g][c])
+    for j, g in enumerate(grupos, start=k + 1):
+        cap[j][sumidero] = int(capacidad[g])
+
+    #Caminos aumentantes (BFS); cada uno aporta al menos una unidad de flujo
+    flujo = 0
+    while flujo < demanda:
+        padre = [-1] * (sumidero + 1)
+        padre[0] = 0
+        cola = [0]
+        for u in cola:
+            for v in range(sumidero + 1):
+                if padre[v] == -1 and cap[u][v] > 0:
+                    padre[v] = u
+                    cola.append(v)
+            if padre[sumidero] != -1:
+                break
+        if padre[sumidero] == -1:
+            return False
+
+        #Cuello de botella del camino y actualización del residual
+        delta = demanda - flujo
+        v = sumidero
+        while v != 0:
+            delta = min(delta, cap[padre[v]][v])
+            v = padre[v]
+        v = sumidero
+        while v != 0:
+            u = padre[v]
+            cap[u][v] -= delta
+            cap[v][u] += delta
+            v = u
+        flujo += delta
+
+    return True
+
+
+def firma_canonica(restantes_conf, holgura, capacidad):
+    """
+    Firma hashable del problema de factibilidad: multiconjunto de grupos abiertos
+    (plazas libres + holgura por confederación) y conteo de confederaciones restantes.
+    """
+    grupos = sorted((capacidad[g], *holgura[g]) for g in range(len(capacidad)) if capacidad[g] > 0)
+    return tuple(restantes_conf), tuple(grupos)
+
+
+def factible_corte(restantes_conf, holgura, capacidad):
+    """
+    Misma respuesta que `factible_flujo`, por el teorema flujo máximo / corte mínimo:
+    hay asignación si y sólo si, para todo subconjunto S de confederaciones restantes,
+    sum(restantes de S) <= sum_g min(capacidad[g], sum(holgura[g][c] para c en S)).
+
+    Con a lo sumo 6 confederaciones son <= 63 cortes sobre 12 grupos, más rápido que
+    buscar caminos aumentantes en Python.
+    """
+    confs = [c for c in range(len(restantes_conf)) if restantes_conf[c] > 0]
+    grupos = [g for g in range(len(capacidad)) if capacidad[g] > 0]
+
+    if all(capacidad[g] == 1 for g in grupos):
+        #Caso del sorteo (una plaza por grupo y bombo): la oferta de S es el número de
+        #grupos abiertos que admiten alguna confederación de S. Agrupamos grupos por máscara.
+        mascaras = {}
+        for g in grupos:
+            m = 0
+            for i, c in enumerate(confs):
+                if holgura[g][c] > 0:
+                    m |= 1 << i
+            mascaras[m] = mascaras.get(m, 0) + 1
+
+        demanda = [0] * (1 << len(confs))
+        for s in range(1, 1 << len(confs)):
+            bajo = s & -s
+            demanda[s] = demanda[s ^ bajo] + restantes_conf[confs[bajo.bit_length() - 1]]
+            oferta = 0
+            for m, n in mascaras.items():
+                if m & s:
+                    oferta += n
+            if oferta < demanda[s]:
+                return False
+        return True
+
+    for s in range(1, 1 << len(confs)):
+        en_s = [c for i, c in enumerate(confs) if s >> i & 1]
+        demanda = 0
+        for c in en_s:
+            demanda += restantes_conf[c]
+        oferta = 0
+        for g in grupos:
+            fila = holgura[g]
+            cupo = 0
+            for c in en_s:
+                cupo += fila[c]
+            oferta += min(capacidad[g], cupo)
+            if oferta >= demanda:
+                break
+        if oferta < demanda:
+            return False
+
+    return True
+
+
+def factible_estado(estado, equipos_restantes, numero_de_bombo, cache=CACHE):
+    """Aplica `factible_flujo` sobre un `EstadoSorteo` y la lista de ids restantes."""
+    restantes_conf = np.bincount(
+        estado.tabla.conf[equipos_restantes], minlength=len(CONFEDERACIONES)
+    ).tolist() if len(equipos_restantes) else [0] * len(CONFEDERACIONES)
+    holgura = np.maximum(CUPO_CONF - estado.conteo_conf, 0).tolist()
+    capacidad = np.maximum(numero_de_bombo - estado.tamano, 0).tolist()
+    return factible_conteos(restantes_conf, holgura, capacidad, cache)
+
+
+def factible_conteos(restantes_conf, holgura, capacidad, cache=CACHE):
+    """Como `factible_flujo`, pero pasando por la caché de firmas canónicas."""
+    if cache is None:
+        return factible_corte(restantes_conf, holgura, capacidad)
+
+    firma = firma_canonica(restantes_conf, holgura, capacidad)
+    valor = cache.consultar(firma)
+    if valor is None:
+        valor = factible_corte(restantes_conf, holgura, capacidad)
+        cache.guardar(firma, valor)
+    return valor
+
+
+def factible_backtracking(estado, equipos_restantes, numero_de_bombo):
+    """Búsqueda recursiva original (exponencial en el peor caso). Sólo como referencia."""
+    def asignar_restantes(k):
+        if k == len(equipos_restantes):
+            return True  # todos asignados
+
+        eq = equipos_restantes[k]
+
+        for g in range(len(estado.tamano)):
+            if estado.tamano[g] >= numero_de_bombo:
+                continue
+            if not estado.valido(g, eq):
+                continue
+
+            # Asignación temporal
+            estado.colocar(eq, g)
+            exito = asignar_restantes(k + 1)
+            estado.quitar(eq)  # deshacer asignación
+            if exito:
+                return True
+
+        return False  # ningún grupo válido para este equipo
+
+    return asignar_restantes(0)
+
+
+def verificar_oraculo(n_sorteos=200, semilla=0):
+    """
+    Test diferencial: recorre sorteos reales y, antes de cada bola de los bombos 2-4,
+    compara flujo vs backtracking para cada grupo candidato. Devuelve el número de
+    consultas comparadas; lanza AssertionError ante la primera discrepancia.
+    """
+    from simular_sorteo_func import TABLA, df_bombos, sortear_bombo_1, sortear_bombo_n
+
+    random.seed(semilla)
+    consultas = 0
+
+    for _ in range(n_sorteos):
+        grupos_dict, asignaciones, slots = sortear_bombo_1(df_bombos, verbose=False)
+        for n_bombo in range(2, 5):
+            estado = EstadoSorteo.desde_grupos_dict(TABLA, grupos_dict)
+            pendientes = TABLA.ids_bombo(n_bombo)
+            random.shuffle(pendientes)
+
+            #Consultamos el oráculo con prefijos crecientes del bombo ya colocados al azar
+            while pendientes:
+                eq = pendientes.pop()
+                for g in range(len(estado.tamano)):
+                    if estado.tamano[g] >= n_bombo or not estado.valido(g, eq):
+                        continue
+                    estado.colocar(eq, g)
+                    a = factible_estado(estado, pendientes, n_bombo, cache=None)
+                    b = factible_backtracking(estado, pendientes, n_bombo)
+                    restantes_conf = np.bincount(estado.tabla.conf[pendientes], minlength=len(CONFEDERACIONES)).tolist()
+                    holgura = np.maximum(CUPO_CONF - estado.conteo_conf, 0).tolist()
+                    capacidad = np.maximum(n_bombo - estado.tamano, 0).tolist()
+                    f = factible_flujo(restantes_conf, holgura, capacidad)
+                    estado.quitar(eq)
+                    assert a == b == f, f"Discrepancia en bombo {n_bombo}: corte={a}, flujo={f}, backtracking={b}"
+                    consultas += 1
+                #Colocamos el equipo en un grupo válido cualquiera (puede llevar a dead-ends)
+                candidatos = [g for g in range(len(estado.tamano))
+                              if estado.tamano[g] < n_bombo and estado.valido(g, eq)]
+                if not candidatos:
+                    break
+                estado.colocar(eq, random.choice(candidatos))
+
+            grupos_dict, asignaciones, slots = sortear_bombo_n(
+                n_bombo, df_bombos, slots, grupos_dict, asignaciones, verbose=False
+            )
+
+    return consultas
+
+
+def precalcular_tabla(n_sorteos, ruta=RUTA_TABLA):
+    """Ejecuta `n_sorteos` sorteos completos para poblar la caché y la guarda en `ruta`."""
+    #Importamos el módulo por nombre: al ejecutarse como script, el motor usa la caché de
+    #`factibilidad`, no la de `__main__`
+    import factibilidad
+    from simular_sorteo_func import df_bombos, sortear_completo
+
+    cache = factibilidad.CACHE
+    cache.maxsize = max(cache.maxsize, 1 << 20)
+    for _ in range(n_sorteos):
+        sortear_completo(df_bombos, verbose=False)
+    cache.guardar_tabla(ruta)
+    return len(cache.tabla) + len(cache.lru)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Oráculo de factibilidad del lookahead")
+    parser.add_argument('--verificar', type=int, default=0, metavar='N',
+                        help="Compara flujo vs backtracking sobre N sorteos")
+    parser.add_argument('--semilla', type=int, default=0, help="Semilla de los sorteos de --verificar")
+    parser.add_argument('--precalcular', type=int, default=0, metavar='N',
+                        help="Pobla la tabla de firmas con N sorteos y la guarda en disco")
+    parser.add_argument('--ruta', default=RUTA_TABLA, help="Ruta de la tabla precalculada")
+    args = parser.parse_args()
+
+    if args.verificar:
+        try:
+            consultas = verificar_oraculo(args.verificar, args.semilla)
+        except AssertionError as error:
+            print(error)
+            raise SystemExit(1)
+        print(f"{consultas} consultas: flujo y backtracking coinciden")
+    if args.precalcular:
+        n_firmas = precalcular_tabla(args.precalcular, args.ruta)
+        print(f"{n_firmas} firmas guardadas en {args.ruta}")
+
+
+if __name__ == "__main__":
+    main()
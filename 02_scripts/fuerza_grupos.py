@@ -0,0 +1,186 @@
+"""
+Fuerza de los grupos ("índice del grupo de la muerte") acumulada sobre un Monte Carlo.
+
+Con `puntos_totales` del ranking FIFA (el merge de `asignar_bombos`), cada sorteo de un bloque
+K x 48 se reduce a arrays: los 12 cuartetos de puntos (K x 12 x 4) dan media, mínimo y
+dispersión (máximo - mínimo) de cada grupo, y para cada equipo la media de sus 3 rivales y el
+rival más fuerte. El grupo más duro de un sorteo es el de mayor media.
+
+`AgregadorFuerza` sólo guarda sumas por equipo e histogramas de puntos (memoria constante,
+fusionable entre workers como `coocurrencia.AgregadorCoocurrencia`):
+
+- `resumen()`: por equipo, valor esperado de cada métrica y probabilidad de caer en el grupo
+  más duro.
+- `dist_rivales()`: distribución por equipo de la media de puntos de sus rivales.
+- `dist_grupo_mas_duro()`: distribución de la media del grupo más duro de cada sorteo.
+
+Uso:
+    python 02_scripts/fuerza_grupos.py -n 1000000 --semilla 2026 --salida 03_resultados
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from estado_sorteo import GRUPOS, IDX_GRUPO
+from simular_sorteo_func import TABLA
+from simulacion_torneo import FUERZA
+
+#Bordes de los histogramas de puntos (los valores fuera de rango van al primer o último bin)
+BINS_PUNTOS = np.arange(1000, 1901, 10)
+
+METRICAS = ('media_grupo', 'min_grupo', 'dispersion', 'media_rivales', 'rival_mas_fuerte')
+
+
+def metricas_bloque(grupo_de, fuerza=FUERZA):
+    """
+    Métricas de un bloque de sorteos `grupo_de` (K x 48): diccionario de arrays K x 48 (el
+    valor de cada métrica en el grupo de cada equipo, ver `METRICAS`), más 'grupo_mas_duro' (K)
+    y 'media_mas_duro' (K).
+    """
+    grupo_de = np.asarray(grupo_de, dtype=np.int64)
+    k, n_equipos = grupo_de.shape
+    filas = np.arange(k)[:, None]
+
+    #Cuartetos de equipos por grupo (ordenar la fila por grupo) y sus puntos, de menor a mayor
+    cuartetos = np.argsort(grupo_de, axis=1, kind='stable').reshape(k, len(GRUPOS), 4)
+    puntos = np.sort(fuerza[cuartetos], axis=2)
+    media = puntos.mean(axis=2)
+    grupo_mas_duro = media.argmax(axis=1)
+
+    #Estadísticas del grupo de cada equipo, en un único gather K x 48 x 4
+    del_grupo = np.stack([media, puntos[:, :, 0], puntos[:, :, -1], puntos[:, :, -2]], axis=2)[filas, grupo_de]
+    media_grupo, minimo, maximo, segundo = np.moveaxis(del_grupo, 2, 0)
+
+    return {
+        'media_grupo': media_grupo,
+        'min_grupo': minimo,
+        'dispersion': maximo - minimo,
+        'media_rivales': (4 * media_grupo - fuerza) / 3,
+        #Rival más fuerte: el máximo del grupo, o el segundo para el propio máximo
+        'rival_mas_fuerte': np.where(fuerza == maximo, segundo, maximo),
+        'grupo_mas_duro': grupo_mas_duro,
+        'media_mas_duro': media[np.arange(k), grupo_mas_duro],
+    }
+
+
+def _bin(valores):
+    ancho = BINS_PUNTOS[1] - BINS_PUNTOS[0]
+    return np.clip(((valores - BINS_PUNTOS[0]) // ancho).astype(np.int64), 0, len(BINS_PUNTOS) - 2)
+
+
+class AgregadorFuerza:
+    """
+    Sumas por equipo de `METRICAS` (y de cuadrados de `media_rivales`) e histogramas de puntos
+    sobre los equipos de `tabla`.
+    """
+
+    def __init__(self, tabla=TABLA, fuerza=FUERZA):
+        self.codigos = list(tabla.codigos)
+        self.fuerza = np.asarray(fuerza, dtype=np.float64)
+        n_equipos = len(self.codigos)
+        self.n_sorteos = 0
+        self.suma = np.zeros((len(METRICAS), n_equipos))
+        self.suma_cuadrados_rivales = np.zeros(n_equipos)
+        self.en_mas_duro = np.zeros(n_equipos, dtype=np.int64)
+        self.hist_rivales = np.zeros((n_equipos, len(BINS_PUNTOS) - 1), dtype=np.int64)
+        self.hist_mas_duro = np.zeros(len(BINS_PUNTOS) - 1, dtype=np.int64)
+
+    def agregar(self, grupo_de):
+        """Acumula un bloque de sorteos: `grupo_de` (K x 48, grupo 0-11 de cada equipo)."""
+        grupo_de = np.asarray(grupo_de, dtype=np.int64).reshape(-1, len(self.codigos))
+        k, n_equipos = grupo_de.shape
+        if not k:
+            return
+        metricas = metricas_bloque(grupo_de, self.fuerza)
+        for m, nombre in enumerate(METRICAS):
+            self.suma[m] += metricas[nombre].sum(axis=0)
+        self.suma_cuadrados_rivales += (metricas['media_rivales'] ** 2).sum(axis=0)
+        self.en_mas_duro += (grupo_de == metricas['grupo_mas_duro'][:, None]).sum(axis=0)
+        n_bins = len(BINS_PUNTOS) - 1
+        self.hist_rivales += np.bincount((np.arange(n_equipos) * n_bins + _bin(metricas['media_rivales'])).ravel(),
+                                         minlength=self.hist_rivales.size).reshape(self.hist_rivales.shape)
+        self.hist_mas_duro += np.bincount(_bin(metricas['media_mas_duro']), minlength=n_bins)
+        self.n_sorteos += k
+
+    def agregar_asignaciones(self, asignaciones):
+        """Acumula un sorteo del motor secuencial (`asignaciones_sorteo` o `{codigo: {'grupo': ...}}`)."""
+        self.agregar([IDX_GRUPO[asignaciones[eq]['grupo']] for eq in self.codigos])
+
+    def fusionar(self, otro):
+        """Suma los acumuladores de `otro` (p. ej. el agregador de otro worker)."""
+        if otro.codigos != self.codigos:
+            raise ValueError("Los agregadores tienen tablas de equipos distintas")
+        self.n_sorteos += otro.n_sorteos
+        self.suma += otro.suma
+        self.suma_cuadrados_rivales += otro.suma_cuadrados_rivales
+        self.en_mas_duro += otro.en_mas_duro
+        self.hist_rivales += otro.hist_rivales
+        self.hist_mas_duro += otro.hist_mas_duro
+        return self
+
+    __iadd__ = fusionar
+
+    def resumen(self):
+        """
+        DataFrame por equipo con el valor esperado de cada métrica, el desvío de `media_rivales`
+        y la probabilidad de caer en el grupo más duro, ordenado por dificultad (`media_rivales`).
+        """
+        n = max(self.n_sorteos, 1)
+        media = self.suma / n
+        tabla = pd.DataFrame(media.T, index=self.codigos, columns=METRICAS)
+        tabla.insert(0, 'puntos', self.fuerza)
+        i = METRICAS.index('media_rivales')
+        tabla['desvio_rivales'] = np.sqrt(np.maximum(self.suma_cuadrados_rivales / n - media[i] ** 2, 0))
+        tabla['prob_grupo_mas_duro'] = self.en_mas_duro / n
+        return tabla.sort_values('media_rivales', ascending=False)
+
+    def dist_rivales(self):
+        """DataFrame equipo x bin (borde inferior) con la distribución de la media de los rivales."""
+        return pd.DataFrame(self.hist_rivales / max(self.n_sorteos, 1), index=self.codigos,
+                            columns=BINS_PUNTOS[:-1])
+
+    def dist_grupo_mas_duro(self):
+        """Serie bin (borde inferior) -> probabilidad de la media del grupo más duro del sorteo."""
+        return pd.Series(self.hist_mas_duro / max(self.n_sorteos, 1), index=BINS_PUNTOS[:-1],
+                         name='media_grupo_mas_duro')
+
+
+def main():
+    from simulacion_montecarlo import MOTORES, simular_lote
+
+    parser = argparse.ArgumentParser(description="Fuerza de los grupos sobre un Monte Carlo del sorteo")
+    parser.add_argument('-n', '--sorteos', type=int, default=100_000, help="Número de sorteos completos")
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--motor', choices=MOTORES, default='vectorizado')
+    parser.add_argument('--salida', default=None,
+                        help="Directorio donde guardar fuerza_grupos.csv, dist_rivales.csv y dist_grupo_mas_duro.csv")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultado = simular_lote(args.sorteos, n_procesos=args.procesos, semilla=args.semilla, motor=args.motor,
+                             fuerza_grupos=True)
+    duracion = time.perf_counter() - inicio
+    agregador = resultado['fuerza_grupos']
+    print(f"{agregador.n_sorteos} sorteos en {duracion:.1f} s, semilla {resultado['semilla']}")
+
+    print("\n--- Dificultad esperada del grupo por equipo (puntos de ranking) ---")
+    print(agregador.resumen().round({m: 1 for m in METRICAS + ('puntos', 'desvio_rivales')})
+          .round({'prob_grupo_mas_duro': 4}).to_string())
+
+    dist = agregador.dist_grupo_mas_duro()
+    media = (dist.index + (BINS_PUNTOS[1] - BINS_PUNTOS[0]) / 2) @ dist.values
+    print(f"\nMedia esperada del grupo más duro: {media:.0f} puntos")
+
+    if args.salida:
+        os.makedirs(args.salida, exist_ok=True)
+        agregador.resumen().to_csv(os.path.join(args.salida, 'fuerza_grupos.csv'))
+        agregador.dist_rivales().to_csv(os.path.join(args.salida, 'dist_rivales.csv'))
+        dist.to_csv(os.path.join(args.salida, 'dist_grupo_mas_duro.csv'))
+
+
+if __name__ == "__main__":
+    main()
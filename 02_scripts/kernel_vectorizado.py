@@ -0,0 +1,144 @@
+"""
+Kernel vectorizado: simula miles de sorteos completos en paralelo (lockstep) con NumPy.
+
+Los K sorteos de un bloque se guardan como arrays apilados:
+- `conteo` (K x 12 x 6): confederaciones por grupo de cada sorteo.
+- `orden` (K x 12): permutación de las bolas del bombo en curso.
+- `mascara` (K x 12): confederaciones que admite cada grupo aún abierto en el bombo en curso.
+
+Cada paso saca la siguiente bola de todos los sorteos a la vez y la coloca en el primer
+grupo (A→L) abierto que admite su confederación (UEFA máximo 2, resto máximo 1) y deja
+factible el resto del bombo, igual que `sortear_bombo_n`. La factibilidad se resuelve por
+lotes con la condición de corte de `factibilidad.factible_corte`: para cada subconjunto S
+de confederaciones del bombo, los equipos restantes de S no pueden superar los grupos
+abiertos que admiten alguna confederación de S. Se mantiene el margen (oferta - demanda)
+de cada corte; colocar una bola en g es factible si ningún corte que g abastece tiene
+margen 0, lo que se comprueba para los 12 grupos a la vez con un AND de bits.
+
+El slot de cada bombo 2-4 es una permutación uniforme de los slots 2-4 de cada grupo,
+equivalente en distribución a los `random.choice` sucesivos del motor secuencial.
+"""
+import numpy as np
+
+from estado_sorteo import CONFEDERACIONES, CUPO_CONF, GRUPOS, IDX_GRUPO
+from simular_sorteo_func import ANFITRIONES, TABLA
+
+_N_CONF = len(CONFEDERACIONES)
+_N_GRUPOS = len(GRUPOS)
+
+
+def _tablas_corte(n_bits):
+    """
+    Tablas de la condición de corte sobre `n_bits` confederaciones presentes en el bombo:
+    `corta[m, s]` = 1 si un grupo con máscara de admisión `m` cuenta como oferta para el
+    subconjunto `s`; `pertenece[i, s]` = 1 si la confederación i-ésima está en `s`.
+    """
+    mascaras = np.arange(1 << n_bits)[:, None]
+    subconjuntos = np.arange(1, 1 << n_bits)[None, :]
+    corta = ((mascaras & subconjuntos) != 0).astype(np.int8)
+    pertenece = ((subconjuntos >> np.arange(n_bits)[:, None]) & 1).astype(np.int8)
+    return corta, pertenece
+
+
+def _empaquetar(bits, buffer):
+    """Empaqueta una matriz booleana (filas x <=32 columnas) en un uint32 por fila."""
+    buffer[:, :bits.shape[1]] = bits
+    return np.packbits(buffer, axis=1, bitorder='little').view(np.uint32)[:, 0]
+
+
+def _sortear_bombo(conteo, grupo_de, ids_bombo, confs_bombo, rng):
+    """Sortea un bombo 2-4 en todos los sorteos del bloque (modifica `conteo` y `grupo_de`)."""
+    k = conteo.shape[0]
+    filas = np.arange(k)
+    n = len(ids_bombo)
+
+    #Sólo las confederaciones presentes en el bombo cuentan para la factibilidad
+    presentes = np.unique(confs_bombo)
+    bit_de = np.zeros(_N_CONF, dtype=np.uint8)
+    bit_de[presentes] = np.arange(len(presentes))
+    pesos = 1 << np.arange(len(presentes))
+    corta, pertenece = _tablas_corte(len(presentes))
+    buffer = np.zeros((k, 32), dtype=bool)
+    corta_bits = _empaquetar(corta.astype(bool), np.zeros((len(corta), 32), dtype=bool))
+
+    orden = np.argsort(rng.random((k, n), dtype=np.float32), axis=1)
+    restantes = np.bincount(bit_de[confs_bombo], minlength=len(presentes))
+
+    #Máscara de confederaciones que admite cada grupo (0 cuando el grupo ya se cerró en este
+    #bombo). Los perfiles de los grupos abiertos no cambian durante el bombo, así que basta
+    #calcularla una vez y poner a 0 cada grupo que recibe equipo.
+    holgura = CUPO_CONF[None, None, :] - conteo
+    mascara = ((holgura[:, :, presentes] > 0).astype(np.int64) @ pesos).astype(np.uint8)
+    histograma = np.bincount(
+        (filas[:, None] * len(corta) + mascara).ravel(), minlength=k * len(corta)
+    ).reshape(k, len(corta))
+
+    #Margen de cada corte: oferta - demanda (>= 0 en todo estado factible, <= 12)
+    margen = (histograma @ corta - restantes @ pertenece).astype(np.int8)
+    cortes_grupo = corta_bits[mascara]
+
+    destinos = np.empty((k, n), dtype=np.int8)
+    for paso in range(n):
+        bola = orden[:, paso]
+        c = confs_bombo[bola]
+        bit = bit_de[c]
+        margen += pertenece[bit]
+
+        #Colocar la bola en g cierra g y resta una unidad de oferta a los cortes que corta;
+        #es factible si ninguno de esos cortes tiene margen 0
+        sin_margen = _empaquetar(margen == 0, buffer)
+        candidatos = ((mascara >> bit[:, None]) & 1).astype(bool)
+        candidatos &= (cortes_grupo & sin_margen[:, None]) == 0
+
+        destino = np.argmax(candidatos, axis=1)
+        if not candidatos[filas, destino].all():
+            raise ValueError("Sorteo sin grupo válido en el kernel vectorizado")
+
+        margen -= corta[mascara[filas, destino]]
+        mascara[filas, destino] = 0
+        cortes_grupo[filas, destino] = 0
+        destinos[:, paso] = destino
+
+    #Cada grupo recibe un solo equipo por bombo: no hay índices repetidos por fila
+    grupo_de[filas[:, None], ids_bombo[orden]] = destinos
+    conteo[filas[:, None], destinos, confs_bombo[orden]] += 1
+
+
+def sortear_bloque(n_sorteos, rng, tabla=TABLA):
+    """
+    Simula `n_sorteos` sorteos completos. Devuelve dos arrays int8 de forma (n_sorteos, n_equipos):
+    grupo (0-11) y número de slot (1-4) de cada equipo, con los ids de `tabla`.
+    """
+    k = n_sorteos
+    filas = np.arange(k)
+    n_equipos = len(tabla)
+    conteo = np.zeros((k, _N_GRUPOS, _N_CONF), dtype=np.int8)
+    grupo_de = np.full((k, n_equipos), -1, dtype=np.int8)
+    slot_de = np.full((k, n_equipos), -1, dtype=np.int8)
+
+    # --- BOMBO 1 ---
+    for eq, slot in ANFITRIONES.items():
+        e = tabla.idx[eq]
+        g = IDX_GRUPO[slot[0]]
+        conteo[:, g, tabla.conf[e]] += 1
+        grupo_de[:, e] = g
+
+    libres = np.array([g for g in range(_N_GRUPOS) if g not in {IDX_GRUPO[s[0]] for s in ANFITRIONES.values()}])
+    cabezas = np.array([e for e in tabla.ids_bombo(1) if tabla.codigos[e] not in ANFITRIONES])
+    perm = np.argsort(rng.random((k, len(cabezas))), axis=1)
+    grupo_de[filas[:, None], cabezas[perm]] = libres[None, :]
+    conteo[filas[:, None], libres[None, :], tabla.conf[cabezas[perm]]] += 1
+    slot_de[:, tabla.bombo == 1] = 1
+
+    # --- BOMBOS 2, 3, 4 ---
+    for n_bombo in range(2, 5):
+        ids = np.array(tabla.ids_bombo(n_bombo))
+        _sortear_bombo(conteo, grupo_de, ids, tabla.conf[ids], rng)
+
+    # --- Slots 2-4: permutación uniforme por grupo ---
+    slots = np.argsort(rng.random((k, _N_GRUPOS, 3)), axis=2).astype(np.int8) + 2
+    for n_bombo in range(2, 5):
+        ids = np.array(tabla.ids_bombo(n_bombo))
+        slot_de[:, ids] = slots[filas[:, None], grupo_de[:, ids], n_bombo - 2]
+
+    return grupo_de, slot_de
@@ -0,0 +1,251 @@
+"""
+Muestreo uniforme sobre todos los sorteos completos válidos (modo de análisis de equidad).
+
+El procedimiento oficial (`sortear_bombo_n`) manda cada bola al primer grupo válido en orden
+A→L, así que no elige uniformemente entre los sorteos válidos. Este módulo muestrea esa
+distribución uniforme sin rechazo: cada muestra es válida al primer intento.
+
+Las reglas son las mismas de `checker_validez_grupo` (como mucho 2 UEFA y 1 de cada otra
+confederación por grupo) más los anfitriones fijos del bombo 1. Como todas las restricciones son
+internas a cada grupo, si se llenan los grupos en orden A→L (un equipo de cada bombo por grupo) el
+futuro sólo depende de cuántos equipos de cada confederación quedan en cada bombo. `cuentas[k]`
+guarda, para cada uno de esos estados al empezar el grupo k, el número de formas de completar el
+sorteo; el grupo k elige su combinación de confederaciones (c1, c2, c3, c4) con probabilidad
+proporcional a (equipos disponibles de cada una) x (completaciones del estado siguiente). Los
+equipos concretos se eligen después uniformemente dentro de cada (bombo, confederación), y los
+slots 2-4 de cada grupo son una permutación uniforme, igual que en el procedimiento.
+
+Las cuentas llegan a ~1.7e27 sorteos (a nivel grupo) y se guardan en float64: la probabilidad de
+cada sorteo es uniforme salvo error relativo de redondeo (~1e-15).
+
+Uso:
+    python 02_scripts/muestreo_uniforme.py -n 100000
+"""
+import argparse
+import time
+from itertools import permutations, product
+
+import numpy as np
+import pandas as pd
+
+from estado_sorteo import CONFEDERACIONES, CUPO_CONF, GRUPOS, IDX_GRUPO
+from simular_sorteo_func import ANFITRIONES, TABLA
+
+_N_CONF = len(CONFEDERACIONES)
+_N_GRUPOS = len(GRUPOS)
+
+#Las 6 formas de repartir los slots 2-4 entre los equipos de los bombos 2-4 de un grupo
+_PERMUTACIONES_SLOTS = np.array(list(permutations((2, 3, 4))), dtype=np.int8)
+
+
+def _subvectores(composicion):
+    """
+    Todos los vectores 0 <= r <= `composicion`, agrupados por suma. Devuelve `(por_suma, pos)`:
+    `por_suma[s]` es la lista de vectores con suma s y `pos[r]` la posición de r en su lista.
+    """
+    por_suma = {}
+    for r in product(*(range(n + 1) for n in composicion)):
+        por_suma.setdefault(sum(r), []).append(r)
+    pos = {r: i for lista in por_suma.values() for i, r in enumerate(lista)}
+    return por_suma, pos
+
+
+class MuestreadorUniforme:
+    """
+    Tablas de conteo y muestreo por bloques. `tabla` es la `TablaEquipos` del sorteo (bombo y
+    confederación de cada equipo); la salida usa sus ids, como `kernel_vectorizado.sortear_bloque`.
+    """
+
+    def __init__(self, tabla=TABLA, anfitriones=ANFITRIONES):
+        self.tabla = tabla
+        self.fijos = {IDX_GRUPO[slot[0]]: tabla.idx[eq] for eq, slot in anfitriones.items()}
+
+        #Equipos por (bombo, confederación), sin los anfitriones (ya tienen grupo)
+        self.equipos = [[[] for _ in range(_N_CONF)] for _ in range(4)]
+        for p in range(4):
+            for e in tabla.ids_bombo(p + 1):
+                if e not in self.fijos.values():
+                    self.equipos[p][tabla.conf[e]].append(e)
+        self.composicion = [tuple(len(l) for l in self.equipos[p]) for p in range(4)]
+        self._ids_por_conf = [np.array([e for ids in self.equipos[p] for e in ids]) for p in range(4)]
+        self._bombo_de = tabla.bombo.astype(np.int64) - 1
+
+        #Suma restante de cada bombo al empezar el grupo k (el bombo 1 no consume en grupos con anfitrión)
+        self.sumas = []
+        libres_1 = sum(self.composicion[0])
+        for k in range(_N_GRUPOS + 1):
+            self.sumas.append((libres_1, _N_GRUPOS - k, _N_GRUPOS - k, _N_GRUPOS - k))
+            if k < _N_GRUPOS and k not in self.fijos:
+                libres_1 -= 1
+
+        self._por_suma, self._pos = zip(*(_subvectores(c) for c in self.composicion))
+        self._combinaciones = [self._combinaciones_validas(k) for k in range(_N_GRUPOS)]
+        self.cuentas = self._contar()
+
+    def _combinaciones_validas(self, k):
+        """Combinaciones (c1, c2, c3, c4) que respetan el cupo de confederación en el grupo k."""
+        #Sólo confederaciones presentes en cada bombo: las demás tienen peso 0 en todo estado
+        presentes = [[c for c in range(_N_CONF) if self.composicion[p][c]] for p in range(4)]
+        opciones_1 = [self.tabla.conf[self.fijos[k]]] if k in self.fijos else presentes[0]
+        validas = []
+        for combinacion in product(opciones_1, *presentes[1:]):
+            usados = np.bincount(combinacion, minlength=_N_CONF)
+            if np.all(usados <= CUPO_CONF):
+                validas.append(combinacion)
+        return np.array(validas, dtype=np.int64)
+
+    def _transiciones(self, p, s, consume):
+        """
+        Para el bombo p con suma s: `siguiente[i, c]` (posición del vector i menos un equipo de c
+        en la lista de suma s-1, o -1 si no quedan) y `peso[i, c]` (equipos de c disponibles).
+        Si el bombo no consume (anfitrión) el vector no cambia y el peso es 1.
+        """
+        actuales = self._por_suma[p].get(s, [])
+        siguiente = np.full((len(actuales), _N_CONF), -1, dtype=np.int64)
+        peso = np.zeros((len(actuales), _N_CONF))
+        for i, r in enumerate(actuales):
+            for c in range(_N_CONF):
+                if not consume:
+                    siguiente[i, c], peso[i, c] = i, 1.0
+                elif r[c]:
+                    siguiente[i, c] = self._pos[p][r[:c] + (r[c] - 1,) + r[c + 1:]]
+                    peso[i, c] = r[c]
+        return siguiente, peso
+
+    def _contar(self):
+        """`cuentas[k]`: completaciones de cada estado (i1, i2, i3, i4) al empezar el grupo k."""
+        #Cada array lleva una posición extra en cero al final de cada eje: el índice -1 (sin
+        #equipos de esa confederación) cae ahí y anula la combinación sin ramas especiales
+        final = np.zeros((2,) * 4)
+        final[(0,) * 4] = 1.0
+        cuentas = [None] * _N_GRUPOS + [final]
+        self._saltos = [None] * _N_GRUPOS
+
+        for k in range(_N_GRUPOS - 1, -1, -1):
+            saltos = [self._transiciones(p, self.sumas[k][p], consume=(p > 0 or k not in self.fijos))
+                      for p in range(4)]
+            self._saltos[k] = saltos
+            forma = tuple(len(s[0]) for s in saltos)
+            cuenta = np.zeros(tuple(n + 1 for n in forma))
+            siguiente = cuentas[k + 1]
+            for c1, c2, c3, c4 in self._combinaciones[k]:
+                (m1, w1), (m2, w2), (m3, w3), (m4, w4) = ((s[0][:, c], s[1][:, c]) for s, c in zip(saltos, (c1, c2, c3, c4)))
+                peso = w1[:, None, None, None] * w2[None, :, None, None] * w3[None, None, :, None] * w4[None, None, None, :]
+                cuenta[:-1, :-1, :-1, :-1] += peso * siguiente[np.ix_(m1, m2, m3, m4)]
+            cuentas[k] = cuenta
+        return cuentas
+
+    def total(self):
+        """Número de sorteos válidos distintos (equipo -> grupo, sin contar el orden de slots)."""
+        inicio = tuple(self._pos[p][self.composicion[p]] for p in range(4))
+        return float(self.cuentas[0][inicio])
+
+    def sortear_bloque(self, n_sorteos, rng):
+        """
+        `n_sorteos` sorteos uniformes e independientes. Devuelve `(grupo_de, slot_de)`, arrays
+        int8 n_sorteos x 48 con el grupo (0-11) y el slot (1-4) de cada equipo por id.
+        `rng` es un `numpy.random.Generator`.
+        """
+        filas = np.arange(n_sorteos)
+        estado = np.tile([self._pos[p][self.composicion[p]] for p in range(4)], (n_sorteos, 1))
+        elegida = np.empty((n_sorteos, _N_GRUPOS, 4), dtype=np.int64)  # confederación por grupo y bombo
+
+        for k in range(_N_GRUPOS):
+            combinaciones = self._combinaciones[k]
+            n_comb = len(combinaciones)
+            #Los pesos sólo dependen del estado: se calculan una vez por estado distinto del bloque
+            #(marcado sobre el array denso del grupo k, sin ordenar)
+            forma = self.cuentas[k].shape
+            clave = np.ravel_multi_index(tuple(estado.T), forma)
+            visto = np.zeros(np.prod(forma), dtype=bool)
+            visto[clave] = True
+            claves_unicas = np.flatnonzero(visto)
+            de_fila = (np.cumsum(visto) - 1)[clave]
+            unicos = np.stack(np.unravel_index(claves_unicas, forma), axis=1)
+            siguiente, peso = [], np.ones((len(unicos), n_comb))
+            for p, (m, w) in enumerate(self._saltos[k]):
+                siguiente.append(m[unicos[:, p][:, None], combinaciones[:, p]])
+                peso *= w[unicos[:, p][:, None], combinaciones[:, p]]
+            peso *= self.cuentas[k + 1][tuple(siguiente)]
+
+            #Inversa de la CDF de cada fila con un único searchsorted: la fila i ocupa [i, i + 1)
+            acumulado = np.cumsum(peso, axis=1)
+            acumulado /= acumulado[:, -1:]
+            acumulado += np.arange(len(unicos))[:, None]
+            plano = np.searchsorted(acumulado.ravel(), de_fila + rng.random(n_sorteos), side='right')
+            j = np.minimum(plano - de_fila * n_comb, n_comb - 1)
+            elegida[:, k] = combinaciones[j]
+            estado = np.stack([s[de_fila, j] for s in siguiente], axis=1)
+
+        grupo_de = np.empty((n_sorteos, len(self.tabla)), dtype=np.int8)
+        slot_de = np.empty((n_sorteos, len(self.tabla)), dtype=np.int8)
+        for g, e in self.fijos.items():
+            grupo_de[:, e] = g
+
+        #Equipos concretos: en cada bombo se ordenan los grupos por (confederación recibida, azar)
+        #y se emparejan con los equipos del bombo ordenados por confederación
+        for p in range(4):
+            clave = elegida[:, :, p] + rng.random((n_sorteos, _N_GRUPOS))
+            if p == 0:
+                clave[:, list(self.fijos)] = np.inf  # grupos con anfitrión: no reciben del bombo 1
+            ids = self._ids_por_conf[p]
+            grupo_de[filas[:, None], ids] = np.argsort(clave, axis=1)[:, :len(ids)]
+
+        #Slots: el bombo 1 ocupa el slot 1; los bombos 2-4 se reparten los slots 2-4 al azar
+        slots = _PERMUTACIONES_SLOTS[rng.integers(0, len(_PERMUTACIONES_SLOTS), (n_sorteos, _N_GRUPOS))]
+        slot_bombo = np.concatenate([np.ones((n_sorteos, _N_GRUPOS, 1), dtype=np.int8), slots], axis=2)
+        slot_de[:] = slot_bombo[filas[:, None], grupo_de, self._bombo_de]
+        return grupo_de, slot_de
+
+
+_MUESTREADOR = None
+
+
+def muestreador():
+    """Muestreador compartido del proceso (las tablas se calculan en el primer uso)."""
+    global _MUESTREADOR
+    if _MUESTREADOR is None:
+        _MUESTREADOR = MuestreadorUniforme()
+    return _MUESTREADOR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Muestreo uniforme de sorteos válidos vs procedimiento oficial")
+    parser.add_argument('-n', '--sorteos', type=int, default=100_000)
+    parser.add_argument('--semilla', type=int, default=None)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    m = muestreador()
+    print(f"Tablas de conteo en {time.perf_counter() - inicio:.1f} s: {m.total():.4e} sorteos válidos")
+
+    from kernel_vectorizado import sortear_bloque
+    from estado_sorteo import EstadoSorteo
+    rng = np.random.default_rng(args.semilla)
+
+    inicio = time.perf_counter()
+    grupo_de, slot_de = m.sortear_bloque(args.sorteos, rng)
+    duracion = time.perf_counter() - inicio
+    print(f"{args.sorteos} sorteos uniformes en {duracion:.2f} s ({duracion / args.sorteos * 1e6:.1f} µs por sorteo)")
+
+    #Todas las muestras deben ser válidas al primer intento
+    invalidos = 0
+    for fila_g, fila_s in zip(grupo_de[:2000], slot_de[:2000]):
+        estado = EstadoSorteo(m.tabla)
+        for e in range(len(m.tabla)):
+            invalidos += not estado.valido(int(fila_g[e]), e)
+            estado.colocar(e, int(fila_g[e]), int(fila_s[e]))
+        invalidos += not np.all(estado.tamano == 4)
+    print(f"Inválidos en las primeras {min(2000, args.sorteos)} muestras: {invalidos}")
+
+    #Comparación con el procedimiento oficial (primer grupo válido A→L)
+    oficial, _ = sortear_bloque(args.sorteos, rng)
+    def prob(g):
+        return np.stack([np.bincount(g[:, e], minlength=_N_GRUPOS) for e in range(g.shape[1])]) / len(g)
+    diferencia = pd.DataFrame(prob(grupo_de) - prob(oficial), index=m.tabla.codigos, columns=GRUPOS)
+    print("\nProbabilidad de grupo: uniforme - oficial (mayores diferencias)")
+    print(diferencia.abs().max(axis=1).sort_values(ascending=False).head(10).round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
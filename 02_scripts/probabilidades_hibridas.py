@@ -0,0 +1,263 @@
+"""
+Estimador híbrido de las probabilidades del procedimiento de sorteo: enumeración exacta de
+estados reducidos para los bombos 1 y 2, recorridos aleatorios para los bombos 3 y 4.
+
+Reproduce el procedimiento de `sortear_bombo_1` / `sortear_bombo_n`:
+- Bombo 1: anfitriones fijos; el resto se reparte uniformemente en los grupos libres.
+- Bombos 2-4: se extrae una bola uniforme del bombo, va al primer grupo (A→L) que cumple
+  capacidad, constraint de confederación y lookahead; luego se sortea uno de sus slots libres.
+
+Dentro de un bombo, el futuro sólo depende de qué grupos siguen abiertos y de qué
+confederaciones quedan en el bombo (los perfiles de los grupos abiertos no cambian hasta que
+se cierran). `ocupacion_bombo` enumera esa ramificación con memoización sobre la firma
+reducida (máscara de grupos abiertos, confederaciones restantes): unos cientos de estados
+por bombo. Equipos de la misma confederación y bombo son intercambiables, así que la
+probabilidad de cada equipo es la ocupación esperada de su confederación dividida por el
+número de equipos de esa confederación en su bombo. El lookahead usa la firma canónica de
+`factibilidad`, simétrica entre grupos intercambiables.
+
+Los bombos 1 y 2 son exactos (36 estados de inicio del bombo 2). Los bombos 3 y 4 no: el
+primer grupo válido se busca en orden A→L, así que los grupos no son intercambiables entre
+bombos y el estado al empezar el bombo 3 es el perfil ordenado de los 12 grupos. Al terminar
+el bombo 2 hay ~3,3 millones de perfiles distintos (ya fusionados los caminos que llegan al
+mismo perfil, y sin cambios al proyectarlos sobre las confederaciones de los bombos 3-4), así
+que la enumeración no es practicable. Los bombos 3 y 4 se estiman con recorridos a nivel de
+confederación que reutilizan las mismas transiciones memoizadas (~1 ms por recorrido, sin
+pandas ni equipos), y para ellos se devuelve el error estándar de cada probabilidad.
+
+Uso:
+    python 02_scripts/probabilidades_hibridas.py --muestras 20000 --comparar 20000
+"""
+import argparse
+import os
+import time
+from collections import defaultdict
+from functools import lru_cache
+from itertools import permutations
+
+import numpy as np
+import pandas as pd
+
+from estado_sorteo import CONFEDERACIONES, CUPO_CONF, GRUPOS, IDX_GRUPO, TablaEquipos
+from factibilidad import factible_conteos
+from simular_sorteo_func import ANFITRIONES, df_bombos
+
+SLOTS = [f"{g}{i}" for g in GRUPOS for i in range(1, 5)]  # A1..L4
+
+_CUPO = CUPO_CONF.tolist()
+_N_CONF = len(CONFEDERACIONES)
+_N_GRUPOS = len(GRUPOS)
+_TODOS = (1 << _N_GRUPOS) - 1
+
+#Cuantil normal de los intervalos de confianza del 95%
+Z_95 = 1.96
+
+
+def _holgura(conteo):
+    return tuple(tuple(max(_CUPO[k] - fila[k], 0) for k in range(_N_CONF)) for fila in conteo)
+
+
+@lru_cache(maxsize=1 << 18)
+def _destino(holgura, abiertos, restantes, c):
+    """
+    Grupo al que va una bola de la confederación `c`: primer grupo abierto (A→L) que
+    admite la confederación y deja factible el resto del bombo.
+    """
+    restantes_tras = list(restantes)
+    restantes_tras[c] -= 1
+
+    for g in range(_N_GRUPOS):
+        if not abiertos >> g & 1 or holgura[g][c] == 0:
+            continue
+
+        #Con el equipo en g, el grupo g queda cerrado para el resto del bombo
+        capacidad = [int(abiertos >> h & 1 and h != g) for h in range(_N_GRUPOS)]
+        if factible_conteos(restantes_tras, holgura, capacidad):
+            return g
+
+    raise ValueError("Estado sin grupo válido: el procedimiento no puede llegar aquí")
+
+
+def ocupacion_bombo(conteo, restantes):
+    """
+    Ocupación esperada (confederación x grupo) de un bombo completo a partir del perfil
+    `conteo` de los grupos al empezar el bombo y de las confederaciones `restantes` del bombo.
+    """
+    holgura = _holgura(conteo)
+    memo = {}
+
+    def esperanza(abiertos, restantes):
+        clave = (abiertos, restantes)
+        if clave in memo:
+            return memo[clave]
+
+        total = sum(restantes)
+        ocupacion = np.zeros((_N_CONF, _N_GRUPOS))
+        for c in range(_N_CONF):
+            if restantes[c] == 0:
+                continue
+            p = restantes[c] / total
+            g = _destino(holgura, abiertos, restantes, c)
+            siguientes = restantes[:c] + (restantes[c] - 1,) + restantes[c + 1:]
+            if sum(siguientes):
+                ocupacion += p * esperanza(abiertos & ~(1 << g), siguientes)
+            ocupacion[c, g] += p
+
+        memo[clave] = ocupacion
+        return ocupacion
+
+    return esperanza(_TODOS, tuple(restantes))
+
+
+def _muestrear_bombo(holgura, confs_bombo, rng, ocupacion):
+    """
+    Recorre una rama del bombo a nivel confederación (orden de bolas uniforme), acumula la
+    ocupación en `ocupacion` y devuelve la holgura final de los grupos.
+    """
+    holgura = list(holgura)
+    restantes = [0] * _N_CONF
+    for c in confs_bombo:
+        restantes[c] += 1
+    abiertos = _TODOS
+    for c in rng.permutation(confs_bombo).tolist():
+        g = _destino(tuple(holgura), abiertos, tuple(restantes), c)
+        fila = list(holgura[g])
+        fila[c] -= 1
+        holgura[g] = tuple(fila)
+        restantes[c] -= 1
+        abiertos &= ~(1 << g)
+        ocupacion[c, g] += 1
+    return tuple(holgura)
+
+
+def estimar_probabilidades_hibridas(df_bombos=df_bombos, n_muestras=20_000, semilla=None):
+    """
+    Devuelve un diccionario con 'prob_grupo' (equipo x grupo) y 'prob_slot' (equipo x slot),
+    en el mismo formato que `simulacion_montecarlo.simular_lote`, más 'error_grupo' y
+    'error_slot': error estándar de cada probabilidad (0 en los bombos exactos).
+
+    Los bombos 1 y 2 son exactos; los bombos 3 y 4 se estiman con `n_muestras` recorridos
+    a nivel confederación (con `n_muestras=0` sólo se calculan los bombos 1 y 2).
+    """
+    rng = np.random.default_rng(semilla)
+    tabla = TablaEquipos.desde_df(df_bombos)
+    n_equipos = len(tabla)
+    prob_grupo = np.zeros((n_equipos, _N_GRUPOS))
+    error_grupo = np.zeros((n_equipos, _N_GRUPOS))
+
+    en_bombo = {n: np.bincount(tabla.conf[tabla.ids_bombo(n)], minlength=_N_CONF) for n in range(1, 5)}
+
+    # --- BOMBO 1 ---
+    conteo0 = [[0] * _N_CONF for _ in GRUPOS]
+    for eq, slot in ANFITRIONES.items():
+        g = IDX_GRUPO[slot[0]]
+        conteo0[g][tabla.conf[tabla.idx[eq]]] += 1
+        prob_grupo[tabla.idx[eq], g] = 1.0
+
+    libres = [g for g in range(_N_GRUPOS) if not any(conteo0[g])]
+    cabezas = [e for e in tabla.ids_bombo(1) if tabla.codigos[e] not in ANFITRIONES]
+    for e in cabezas:
+        prob_grupo[e, libres] = 1.0 / len(libres)
+
+    #Distribuciones distintas de las confederaciones de los cabezas de serie (equiprobables)
+    arreglos = sorted(set(permutations(int(tabla.conf[e]) for e in cabezas)))
+    inicios_bombo_2 = []
+    for arreglo in arreglos:
+        conteo = [fila[:] for fila in conteo0]
+        for g, c in zip(libres, arreglo):
+            conteo[g][c] += 1
+        inicios_bombo_2.append(tuple(map(tuple, conteo)))
+
+    # --- BOMBO 2 (exacto) ---
+    ocupacion = {n: np.zeros((_N_CONF, _N_GRUPOS)) for n in range(2, 5)}
+    restantes_2 = tuple(en_bombo[2].tolist())
+    for conteo in inicios_bombo_2:
+        ocupacion[2] += ocupacion_bombo(conteo, restantes_2) / len(inicios_bombo_2)
+
+    # --- BOMBOS 3 y 4 (recorridos a nivel confederación) ---
+    #En cada recorrido la ocupación de (c, g) es 0 o 1, así que su varianza es p (1 - p)
+    confs = {n: [int(c) for c in tabla.conf[tabla.ids_bombo(n)]] for n in range(2, 5)}
+    varianza = {n: np.zeros((_N_CONF, _N_GRUPOS)) for n in range(2, 5)}
+    if n_muestras:
+        holguras_2 = [_holgura(conteo) for conteo in inicios_bombo_2]
+        descarte = np.zeros((_N_CONF, _N_GRUPOS))
+        for _ in range(n_muestras):
+            holgura = holguras_2[rng.integers(len(holguras_2))]
+            holgura = _muestrear_bombo(holgura, confs[2], rng, descarte)
+            holgura = _muestrear_bombo(holgura, confs[3], rng, ocupacion[3])
+            _muestrear_bombo(holgura, confs[4], rng, ocupacion[4])
+        for n_bombo in (3, 4):
+            ocupacion[n_bombo] /= n_muestras
+            varianza[n_bombo] = ocupacion[n_bombo] * (1 - ocupacion[n_bombo]) / max(n_muestras - 1, 1)
+
+    #Equipos de la misma confederación en el bombo son intercambiables
+    for n_bombo in range(2, 5 if n_muestras else 3):
+        for e in tabla.ids_bombo(n_bombo):
+            c = tabla.conf[e]
+            prob_grupo[e] = ocupacion[n_bombo][c] / en_bombo[n_bombo][c]
+            error_grupo[e] = np.sqrt(varianza[n_bombo][c]) / en_bombo[n_bombo][c]
+
+    # --- Slots ---
+    #Bombo 1 ocupa el slot 1; los bombos 2-4 sortean uniformemente entre los slots 2-4 libres
+    prob_slot = np.zeros((n_equipos, len(SLOTS)))
+    error_slot = np.zeros((n_equipos, len(SLOTS)))
+    for e in range(n_equipos):
+        if tabla.bombo[e] == 1:
+            prob_slot[e, 0::4] = prob_grupo[e]
+        else:
+            for i in range(1, 4):
+                prob_slot[e, i::4] = prob_grupo[e] / 3
+                error_slot[e, i::4] = error_grupo[e] / 3
+
+    return {
+        'prob_grupo': pd.DataFrame(prob_grupo, index=tabla.codigos, columns=GRUPOS),
+        'prob_slot': pd.DataFrame(prob_slot, index=tabla.codigos, columns=SLOTS),
+        'error_grupo': pd.DataFrame(error_grupo, index=tabla.codigos, columns=GRUPOS),
+        'error_slot': pd.DataFrame(error_slot, index=tabla.codigos, columns=SLOTS),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Probabilidades del sorteo FIFA World Cup 2026: bombos 1-2 exactos, bombos 3-4 estimados")
+    parser.add_argument('--muestras', type=int, default=20_000,
+                        help="Recorridos a nivel confederación para los bombos 3 y 4")
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--comparar', type=int, default=0, metavar='N',
+                        help="Compara contra un Monte Carlo de N sorteos")
+    parser.add_argument('--salida', default=None,
+                        help="Ruta CSV para la tabla equipo x grupo (el error estándar va a <ruta>_error.csv)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultado = estimar_probabilidades_hibridas(n_muestras=args.muestras, semilla=args.semilla)
+    print(f"Cálculo en {time.perf_counter() - inicio:.2f} s")
+    print(resultado['prob_grupo'].round(4).to_string())
+
+    bombo = df_bombos.set_index('codigo')['bombo']
+    print("\nSemiamplitud máxima del intervalo de confianza del 95% por bombo (0 = exacto):")
+    print((Z_95 * resultado['error_grupo']).max(axis=1).groupby(bombo).max().round(4).to_string())
+
+    if args.salida:
+        resultado['prob_grupo'].to_csv(args.salida)
+        raiz, extension = os.path.splitext(args.salida)
+        resultado['error_grupo'].to_csv(f"{raiz}_error{extension or '.csv'}")
+
+    if args.comparar:
+        from simulacion_montecarlo import simular_lote
+        mc = simular_lote(args.comparar)
+        diferencia = (mc['prob_grupo'] - resultado['prob_grupo']).abs()
+        #Error estándar de la diferencia: binomial del Monte Carlo más el de los recorridos
+        p = mc['prob_grupo']
+        error = np.sqrt(p * (1 - p) / args.comparar + resultado['error_grupo'] ** 2)
+        z = (diferencia / error.where(error > 0)).fillna(0)
+        print(f"\nMáxima diferencia vs Monte Carlo ({args.comparar} sorteos), por bombo:")
+        print(pd.DataFrame({'diferencia': diferencia.max(axis=1).groupby(bombo).max(),
+                            'z_max': z.max(axis=1).groupby(bombo).max()}).round(4).to_string())
+        fuera = int((z > Z_95).to_numpy().sum())
+        print(f"Celdas fuera del intervalo del 95%: {fuera} de {z.size} "
+              f"(se esperan ~{0.05 * int((error > 0).to_numpy().sum()):.0f} por azar)")
+
+
+if __name__ == "__main__":
+    main()
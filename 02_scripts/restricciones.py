@@ -0,0 +1,411 @@
+"""
+Restricciones declarativas del sorteo compiladas a máscaras de bits sobre los 12 grupos.
+
+Cada regla es una tupla inmutable que sólo describe la restricción:
+
+- `CupoConfederacion(conf, maximo)`: como mucho `maximo` equipos de `conf` por grupo.
+- `MinimoConfederacion(conf, minimo)`: al menos `minimo` equipos de `conf` en cada grupo al final.
+- `ExclusionPar(a, b)`: `a` y `b` no pueden compartir grupo.
+- `MitadesOpuestas(a, b, mitad)`: `a` y `b` en mitades opuestas del cuadro eliminatorio.
+
+`ReglasCompiladas` las traduce una sola vez, para una `TablaEquipos`, a:
+
+- `cupo[c]` / `minimo[c]`: vectores de conteo por confederación.
+- `vetos[e]`: ternas `(otro, veto, regla)`; si `otro` está en el grupo g, `e` pierde los grupos
+  de la máscara `veto[g]` (entero de 12 bits, bit g = grupo g; exclusión: el propio g; mitades:
+  la mitad de g).
+
+Validar una asignación es una comparación de conteo y un AND de bits, cuantas reglas haya. El
+lookahead del bombo es la condición de Hall sobre las máscaras de los equipos restantes: en cada
+bombo cada grupo abierto recibe exactamente un equipo, así que hay asignación si y sólo si todo
+conjunto de equipos cabe en la unión de sus grupos. Los equipos con la misma máscara son
+intercambiables y se agrupan en clases (<= 6 con sólo cupos, algunas más con vetos).
+
+Los mínimos obligan a mirar más allá del bombo: mientras a algún grupo le falte una
+confederación, el lookahead busca una completación por confederaciones de los bombos que quedan
+(firma canónica por grupo: bombos pendientes, holgura y faltante), primero voraz y, si no sale,
+exhaustiva con memoria. Los vetos entre dos equipos del mismo bombo aún sin sortear se resuelven
+ramificando sobre el grupo de uno de ellos; los vetos entre bombos distintos se aplican al sortear
+el segundo equipo.
+
+Con `REGLAS_FIFA` el resultado es idéntico a `checker_validez_grupo` + `factible_estado`;
+`reglas_2026(df_bombos)` añade un europeo mínimo por grupo y los cuatro primeros del ranking
+repartidos por mitades del cuadro:
+
+    python 02_scripts/restricciones.py --sorteos 500
+"""
+import argparse
+import time
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from estado_sorteo import CONFEDERACIONES, CUPO_CONF, GRUPOS, IDX_CONF, IDX_GRUPO
+from factibilidad import CacheFactibilidad
+
+TODOS = (1 << len(GRUPOS)) - 1
+
+#Peso de cada grupo como bit: PESOS @ mascara_booleana da la máscara entera
+PESOS = 1 << np.arange(len(GRUPOS), dtype=np.int64)
+
+#Grupos cuyos ganadores caen en una misma mitad del cuadro de dieciseisavos (la otra mitad es el
+#complemento): los 8 primeros cruces de `simulacion_torneo.DIECISEISAVOS`. Es un parámetro de
+#`MitadesOpuestas`: ajustar al cuadro oficial si cambia.
+MITAD_CUADRO = tuple('DEFGHI')
+
+#Bombos que le faltan a un grupo con `t` equipos
+_BOMBOS_PENDIENTES = [tuple(range(t + 1, 5)) for t in range(5)]
+
+
+class CupoConfederacion(NamedTuple):
+    conf: str
+    maximo: int
+
+
+class MinimoConfederacion(NamedTuple):
+    conf: str
+    minimo: int
+
+
+class ExclusionPar(NamedTuple):
+    equipo_a: str
+    equipo_b: str
+
+
+class MitadesOpuestas(NamedTuple):
+    equipo_a: str
+    equipo_b: str
+    mitad: tuple = MITAD_CUADRO
+
+
+#Reglas de `checker_validez_grupo`: UEFA permite máximo 2, el resto máximo 1
+REGLAS_FIFA = tuple(CupoConfederacion(c, int(CUPO_CONF[i])) for i, c in enumerate(CONFEDERACIONES))
+
+
+def reglas_2026(df_bombos, n_separados=4):
+    """
+    `REGLAS_FIFA` más las del procedimiento 2026: al menos un equipo de UEFA por grupo y los
+    `n_separados` mejores del ranking del bombo 1 (sin anfitriones) en mitades opuestas por
+    parejas (1º-2º, 3º-4º...).
+    """
+    bombo1 = df_bombos[(df_bombos['bombo'] == 1) & (df_bombos['anfitrion'] == 0)]
+    puntos = pd.to_numeric(bombo1['puntos_totales'], errors='coerce')
+    mejores = list(bombo1.loc[puntos.sort_values(ascending=False).index, 'codigo'][:n_separados])
+    parejas = [MitadesOpuestas(mejores[i], mejores[i + 1]) for i in range(0, len(mejores) - 1, 2)]
+    return REGLAS_FIFA + (MinimoConfederacion('UEFA', 1),) + tuple(parejas)
+
+
+def _mascara(grupos):
+    m = 0
+    for g in grupos:
+        m |= 1 << IDX_GRUPO[g]
+    return m
+
+
+def condicion_hall(clases):
+    """
+    `clases` son pares `(mascara, n)`: `n` equipos que sólo pueden ir a los grupos de `mascara`,
+    un equipo por grupo. True si todos caben (teorema de Hall sobre uniones de clases).
+    """
+    k = len(clases)
+    union = [0] * (1 << k)
+    demanda = [0] * (1 << k)
+    for s in range(1, 1 << k):
+        bajo = s & -s
+        i = bajo.bit_length() - 1
+        union[s] = union[s ^ bajo] | clases[i][0]
+        demanda[s] = demanda[s ^ bajo] + clases[i][1]
+        if demanda[s] > union[s].bit_count():
+            return False
+    return True
+
+
+class ReglasCompiladas:
+    """
+    Reglas compiladas para una `TablaEquipos`. Las reglas que nombran equipos ausentes de la
+    tabla (p. ej. un candidato de repechaje que no clasificó) no aplican y se ignoran.
+    """
+    __slots__ = ('reglas', 'tabla', 'cupo', 'minimo', 'minimos', 'vetos', 'pareja_bombo', 'bombo_conf',
+                 'cache')
+
+    def __init__(self, reglas, tabla):
+        self.reglas = tuple(reglas)
+        self.tabla = tabla
+        n_conf = len(CONFEDERACIONES)
+
+        #Sin cupo declarado una confederación puede llenar el grupo
+        self.cupo = np.full(n_conf, 4, dtype=np.int8)
+        self.minimo = np.zeros(n_conf, dtype=np.int8)
+        self.vetos = [[] for _ in range(len(tabla))]
+
+        for regla in self.reglas:
+            if type(regla) is CupoConfederacion:
+                c = IDX_CONF[regla.conf]
+                self.cupo[c] = min(self.cupo[c], regla.maximo)
+            elif type(regla) is MinimoConfederacion:
+                c = IDX_CONF[regla.conf]
+                self.minimo[c] = max(self.minimo[c], regla.minimo)
+            elif type(regla) in (ExclusionPar, MitadesOpuestas):
+                if regla.equipo_a not in tabla.idx or regla.equipo_b not in tabla.idx:
+                    continue
+                a, b = tabla.idx[regla.equipo_a], tabla.idx[regla.equipo_b]
+                if type(regla) is ExclusionPar:
+                    veto = [1 << g for g in range(len(GRUPOS))]
+                else:
+                    mitad = _mascara(regla.mitad)
+                    veto = [mitad if mitad >> g & 1 else TODOS & ~mitad for g in range(len(GRUPOS))]
+                self.vetos[a].append((b, veto, regla))
+                self.vetos[b].append((a, veto, regla))
+            else:
+                raise TypeError(f"Regla desconocida: {regla!r}")
+
+        if (self.minimo > self.cupo).any():
+            raise ValueError("Hay confederaciones con mínimo por grupo mayor que su cupo")
+        self.minimos = [int(c) for c in np.flatnonzero(self.minimo)]
+        #Equipos del mismo bombo con los que `e` tiene un veto (el lookahead ramifica sobre ellos)
+        self.pareja_bombo = [[otro for otro, _, _ in self.vetos[e] if tabla.bombo[otro] == tabla.bombo[e]]
+                             for e in range(len(tabla))]
+        self.bombo_conf = (tabla.bombo.astype(np.int64) - 1) * n_conf + tabla.conf
+        self.cache = CacheFactibilidad(maxsize=1 << 20)
+
+    def permitidos(self, estado, eq):
+        """Máscara de grupos a los que puede ir `eq` según las reglas por equipo."""
+        m = TODOS
+        for otro, veto, _ in self.vetos[eq]:
+            g = estado.grupo_de[otro]
+            if g >= 0:
+                m &= ~veto[g]
+        return m
+
+    def valido(self, estado, g, eq):
+        """¿Cabe el equipo `eq` en el grupo `g`? Cupo de su confederación y vetos por equipo."""
+        c = self.tabla.conf[eq]
+        return estado.conteo_conf[g, c] < self.cupo[c] and self.permitidos(estado, eq) >> g & 1
+
+    def motivo(self, estado, g, eq):
+        """`(motivo, mensaje)` del rechazo de `eq` en `g`, en el formato de `GrupoRechazado`."""
+        c = self.tabla.conf[eq]
+        conf = CONFEDERACIONES[c]
+        if estado.conteo_conf[g, c] >= self.cupo[c]:
+            if self.cupo[c] == 1:
+                return 'confederacion', f"Otro equipo de {conf}. Reasignando..."
+            if self.cupo[c] == 2:
+                return 'confederacion', f"Dos equipos de {conf} actuales. Reasignando..."
+            return 'confederacion', f"Ya hay {self.cupo[c]} equipos de {conf} en el grupo. Reasignando..."
+        codigo = self.tabla.codigos[eq]
+        for otro, veto, regla in self.vetos[eq]:
+            g_otro = estado.grupo_de[otro]
+            if g_otro >= 0 and veto[g_otro] >> g & 1:
+                otro = self.tabla.codigos[otro]
+                if type(regla) is ExclusionPar:
+                    return 'regla', f"{codigo} no puede compartir grupo con {otro}. Reasignando..."
+                return 'regla', f"{codigo} debe ir a la otra mitad del cuadro que {otro} (grupo {GRUPOS[g_otro]}). Reasignando..."
+        return 'regla', f"{codigo} no puede ir al grupo {GRUPOS[g]}. Reasignando..."
+
+    def factible(self, estado, equipos_restantes, numero_de_bombo, usar_cache=True):
+        """
+        ¿Caben los `equipos_restantes` del bombo en los grupos abiertos, y siguen siendo
+        alcanzables los mínimos por confederación? `estado` incluye la asignación a evaluar.
+        """
+        abiertos = int(PESOS @ (estado.tamano < numero_de_bombo))
+        libres_conf = PESOS @ (estado.conteo_conf < self.cupo)
+        conf = self.tabla.conf
+
+        #Vetos entre dos equipos del bombo sin sortear: las máscaras aún no los ven, así que
+        #ramificamos sobre el grupo de uno de ellos (una rama por grupo, exacto)
+        for e in equipos_restantes:
+            if self.pareja_bombo[e] and any(estado.grupo_de[otro] < 0 for otro in self.pareja_bombo[e]):
+                resto = [r for r in equipos_restantes if r != e]
+                m = abiertos & int(libres_conf[conf[e]]) & self.permitidos(estado, e)
+                for g in range(len(GRUPOS)):
+                    if not m >> g & 1:
+                        continue
+                    estado.colocar(e, g)
+                    try:
+                        if self.factible(estado, resto, numero_de_bombo, usar_cache):
+                            return True
+                    finally:
+                        estado.quitar(e)
+                return False
+
+        clases = {}
+        for e in equipos_restantes:
+            m = abiertos & int(libres_conf[conf[e]])
+            if self.vetos[e]:
+                m &= self.permitidos(estado, e)
+            clases[m] = clases.get(m, 0) + 1
+        clases = tuple(sorted(clases.items()))
+        if not self._consultar(condicion_hall, clases, usar_cache):
+            return False
+
+        if not self.minimos:
+            return True
+        #Mínimos: hace falta mirar los bombos siguientes
+        n_conf = len(CONFEDERACIONES)
+        faltan = np.maximum(self.minimo - estado.conteo_conf, 0)
+        if not faltan.any():
+            #Mínimos cubiertos: como en el motor sin reglas, basta con el bombo actual
+            return True
+        #Equipos sin sortear por bombo y confederación (matriz 4x6)
+        restantes = np.bincount(self.bombo_conf[estado.grupo_de < 0], minlength=4 * n_conf).reshape(4, n_conf)
+        pendientes = 4 - estado.tamano.astype(np.int64)
+        if (faltan.sum(axis=1) > pendientes).any() or (faltan.sum(axis=0) > restantes.sum(axis=0)).any():
+            return False
+        #Firma de cada grupo: bombos pendientes, holgura por confederación (acotada por esos
+        #bombos y sin las confederaciones que ya no quedan) y lo que le falta para los mínimos
+        holgura = np.minimum(np.maximum(self.cupo - estado.conteo_conf, 0), pendientes[:, None]) * (restantes.sum(axis=0) > 0)
+        filas = np.concatenate([estado.tamano[:, None], holgura, faltan], axis=1)[pendientes > 0].tolist()
+        grupos = tuple(sorted((_BOMBOS_PENDIENTES[f[0]], tuple(f[1:n_conf + 1]), tuple(f[n_conf + 1:])) for f in filas))
+        restantes = tuple(map(tuple, restantes.tolist()))
+        return self._consultar(self._completable_voraz, (grupos, restantes), usar_cache)
+
+    def _consultar(self, funcion, clave, usar_cache):
+        if not usar_cache:
+            return funcion(clave)
+        valor = self.cache.consultar(clave)
+        if valor is None:
+            valor = funcion(clave)
+            self.cache.guardar(clave, valor)
+        return valor
+
+    def _completable_voraz(self, problema):
+        #Casi siempre basta la completación voraz; si no sale, búsqueda exacta
+        return _voraz(*problema) or self._completable(problema)
+
+    def _completable(self, problema):
+        """
+        Búsqueda exacta de una completación por confederaciones: cada grupo elige la
+        confederación de cada bombo que le falta, respetando cupos y mínimos y sin gastar más
+        equipos de los que quedan. Cada subproblema (grupos que faltan, equipos que quedan) es
+        a su vez una firma canónica, así que se recuerda entre búsquedas en la misma caché.
+        """
+        grupos, restantes = problema
+        if not grupos:
+            return True
+        #Poda: lo que les falta a los grupos tiene que caber en lo que queda
+        for c in self.minimos:
+            if sum(max(g[2][c], 0) for g in grupos) > sum(r[c] for r in restantes):
+                return False
+        bombos, holgura, faltan = grupos[0]
+        for eleccion in _opciones(bombos, list(holgura), list(faltan), restantes):
+            nuevos = [list(r) for r in restantes]
+            for b, c in zip(bombos, eleccion):
+                nuevos[b - 1][c] -= 1
+            if self._consultar(self._completable, (grupos[1:], tuple(tuple(r) for r in nuevos)), True):
+                return True
+        return False
+
+
+def _voraz(grupos, restantes):
+    #Completación voraz (primera opción de cada grupo, sin volver atrás): si sale, es factible
+    restantes = [list(r) for r in restantes]
+    for bombos, holgura, faltan in grupos:
+        eleccion = next(_opciones(bombos, list(holgura), list(faltan), restantes), None)
+        if eleccion is None:
+            return False
+        for b, c in zip(bombos, eleccion):
+            restantes[b - 1][c] -= 1
+    return True
+
+
+def _opciones(bombos, holgura, faltan, restantes):
+    #Combinaciones de confederación (una por bombo pendiente) válidas para un grupo
+    if not bombos:
+        if not any(f > 0 for f in faltan):
+            yield ()
+        return
+    #No quedan bombos suficientes para cubrir los mínimos
+    if sum(f for f in faltan if f > 0) > len(bombos):
+        return
+    b = bombos[0] - 1
+    #Primero las confederaciones que le faltan: la primera rama suele llevar a una completación
+    orden = [c for c in range(len(holgura)) if faltan[c] > 0] + [c for c in range(len(holgura)) if faltan[c] <= 0]
+    for c in orden:
+        if restantes[b][c] and holgura[c] > 0:
+            holgura[c] -= 1
+            faltan[c] -= 1
+            for resto in _opciones(bombos[1:], holgura, faltan, restantes):
+                yield (c,) + resto
+            holgura[c] += 1
+            faltan[c] += 1
+
+
+def compilar(reglas, tabla):
+    """`ReglasCompiladas` de `reglas` para `tabla`; si ya lo están para esos equipos, tal cual."""
+    if isinstance(reglas, ReglasCompiladas):
+        if reglas.tabla is tabla or reglas.tabla.codigos == tabla.codigos:
+            return reglas
+        reglas = reglas.reglas
+    return ReglasCompiladas(reglas, tabla)
+
+
+def verificar(reglas, estado_final, tabla):
+    """Lista de reglas incumplidas por un sorteo completo (vacía si es válido)."""
+    reglas = compilar(reglas, tabla)
+    incumplidas = []
+    if (estado_final.conteo_conf > reglas.cupo).any():
+        incumplidas.append('cupo')
+    if (estado_final.conteo_conf < reglas.minimo).any():
+        incumplidas.append('minimo')
+    for eq in range(len(tabla)):
+        g = int(estado_final.grupo_de[eq])
+        if g >= 0 and not reglas.permitidos(estado_final, eq) >> g & 1:
+            incumplidas.append(tabla.codigos[eq])
+    return incumplidas
+
+
+def main():
+    #Compilamos con el módulo por nombre: al ejecutarse como script, `simular_sorteo_func`
+    #reconoce las clases de `restricciones`, no las de `__main__`
+    import restricciones
+    from estado_sorteo import EstadoSorteo
+    from semillas import random_sorteo
+    from simular_sorteo_func import TABLA, df_bombos, sortear_completo
+
+    parser = argparse.ArgumentParser(description="Restricciones compiladas del sorteo")
+    parser.add_argument('--sorteos', type=int, default=500)
+    parser.add_argument('--semilla', type=int, default=2026)
+    args = parser.parse_args()
+
+    #1) Con las reglas FIFA, mismo sorteo que el camino sin reglas
+    fifa = restricciones.compilar(restricciones.REGLAS_FIFA, TABLA)
+    distintos = 0
+    tiempos = {'sin reglas': 0.0, 'REGLAS_FIFA': 0.0}
+    for k in range(args.sorteos):
+        inicio = time.perf_counter()
+        _, a, _ = sortear_completo(df_bombos, verbose=False, rng=random_sorteo(args.semilla, k))
+        tiempos['sin reglas'] += time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        _, b, _ = sortear_completo(df_bombos, verbose=False, rng=random_sorteo(args.semilla, k), reglas=fifa)
+        tiempos['REGLAS_FIFA'] += time.perf_counter() - inicio
+        distintos += a != b
+    print(f"REGLAS_FIFA: {distintos} de {args.sorteos} sorteos distintos del camino sin reglas")
+
+    #2) Reglas 2026: ningún dead-end y todas las reglas cumplidas
+    reglas = restricciones.reglas_2026(df_bombos)
+    print("Reglas 2026:", ", ".join(repr(r) for r in reglas[len(restricciones.REGLAS_FIFA):]))
+    nuevas = restricciones.compilar(reglas, TABLA)
+    bloqueos = invalidos = 0
+    tiempos['reglas_2026'] = 0.0
+    for k in range(args.sorteos):
+        inicio = time.perf_counter()
+        try:
+            grupos_dict, _, _ = sortear_completo(df_bombos, verbose=False, rng=random_sorteo(args.semilla, k),
+                                                 reglas=nuevas)
+        except ValueError:
+            bloqueos += 1
+            continue
+        finally:
+            tiempos['reglas_2026'] += time.perf_counter() - inicio
+        invalidos += bool(restricciones.verificar(nuevas, EstadoSorteo.desde_grupos_dict(TABLA, grupos_dict), TABLA))
+    print(f"Reglas 2026: {bloqueos} dead-ends y {invalidos} sorteos inválidos de {args.sorteos}")
+
+    for nombre, segundos in tiempos.items():
+        print(f"  {nombre:<12} {segundos / args.sorteos * 1000:8.2f} ms por sorteo")
+    if distintos or bloqueos or invalidos:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
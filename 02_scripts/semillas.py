@@ -0,0 +1,45 @@
+"""
+Semillas de acceso aleatorio (counter-based) para sorteos reproducibles.
+
+Cada sorteo se identifica por (semilla maestra, índice). Su generador es un Philox cuya
+clave sale de la semilla maestra y cuyo contador arranca en [0, 0, índice, flujo]: el
+sorteo k se regenera en O(1), sin reproducir los k-1 anteriores, y los lotes pueden
+repartirse en shards que corren en cualquier orden.
+
+El `flujo` separa los usos de un mismo índice para que no compartan números:
+- FLUJO_REPECHAJES: ganadores de repechaje (`asignar_bombos`).
+- FLUJO_SORTEO: orden de bolas y slots del motor secuencial.
+- FLUJO_KERNEL: bloques del kernel vectorizado (el índice es el número de bloque).
+- FLUJO_UNIFORME: bloques del muestreo uniforme (`muestreo_uniforme`, también por bloque).
+- FLUJO_TORNEO: partidos de los torneos simulados sobre cada sorteo (`simulacion_torneo`).
+"""
+import random
+
+import numpy as np
+
+FLUJO_REPECHAJES = 0
+FLUJO_SORTEO = 1
+FLUJO_KERNEL = 2
+FLUJO_UNIFORME = 3
+FLUJO_TORNEO = 4
+
+
+def nueva_semilla():
+    """Semilla maestra de 128 bits tomada de la entropía del sistema."""
+    return int(np.random.SeedSequence().entropy)
+
+
+def generador_sorteo(semilla, indice, flujo=FLUJO_SORTEO):
+    """`numpy.random.Generator` del sorteo `indice` para la semilla maestra `semilla`."""
+    clave = np.random.SeedSequence(semilla).generate_state(2, dtype=np.uint64)
+    contador = np.array([0, 0, indice, flujo], dtype=np.uint64)
+    return np.random.Generator(np.random.Philox(key=clave, counter=contador))
+
+
+def random_sorteo(semilla, indice, flujo=FLUJO_SORTEO):
+    """
+    `random.Random` del sorteo `indice`, para las funciones que usan la interfaz de
+    `random` (`randrange`, `choice`). Se siembra con 128 bits de `generador_sorteo`.
+    """
+    bits = generador_sorteo(semilla, indice, flujo).bytes(16)
+    return random.Random(int.from_bytes(bits, 'little'))
@@ -0,0 +1,291 @@
+"""
+Simulación Monte Carlo del sorteo FIFA World Cup 2026.
+
+Ejecuta N sorteos completos (bombos 1 a 4) repartidos en un pool de procesos.
+Cada worker devuelve únicamente conteos agregados (equipo x grupo y equipo x slot),
+de modo que el costo de comunicación entre procesos no depende de N.
+
+Tres motores:
+- 'vectorizado' (por defecto): `kernel_vectorizado.sortear_bloque`, miles de sorteos a la vez.
+- 'secuencial': `sortear_completo`, un sorteo por vez (referencia del procedimiento).
+- 'uniforme': `muestreo_uniforme`, uniforme sobre todos los sorteos válidos (no es el
+  procedimiento oficial; sirve para medir cuánto se aparta de él).
+
+Con `--torneos N` cada sorteo se juega además N veces hasta la final (`simulacion_torneo`) y
+se agrega la probabilidad de que cada equipo alcance cada ronda. Con `coocurrencia=True` cada
+worker lleva además un `coocurrencia.AgregadorCoocurrencia` (pares que comparten grupo), y con
+`fuerza_grupos=True` un `fuerza_grupos.AgregadorFuerza` (puntos de ranking de cada grupo).
+
+Uso:
+    python 02_scripts/simulacion_montecarlo.py -n 1000000 --procesos 8 --salida 03_resultados
+    python 02_scripts/simulacion_montecarlo.py -n 100000 --torneos 10 --salida 03_resultados
+"""
+import argparse
+import os
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from simular_bombos import df_bombos
+from simular_sorteo_func import sortear_completo
+from kernel_vectorizado import sortear_bloque
+from semillas import FLUJO_KERNEL, FLUJO_TORNEO, FLUJO_UNIFORME, generador_sorteo, nueva_semilla, random_sorteo
+from coocurrencia import AgregadorCoocurrencia
+from fuerza_grupos import AgregadorFuerza
+from simulacion_torneo import RONDAS, contar_rondas, matrices_grupos, matriz_grupos
+
+MOTORES = ('vectorizado', 'secuencial', 'uniforme')
+
+#Sorteos por llamada al kernel (acota la memoria de los arrays K x 48)
+TAMANO_BLOQUE_KERNEL = 10_000
+
+GRUPOS = list(string.ascii_uppercase[:12])  # A-L
+SLOTS = [f"{g}{i}" for g in GRUPOS for i in range(1, 5)]  # A1..L4
+EQUIPOS = list(df_bombos['codigo'])
+
+IDX_EQUIPO = {eq: i for i, eq in enumerate(EQUIPOS)}
+IDX_GRUPO = {g: i for i, g in enumerate(GRUPOS)}
+IDX_SLOT = {s: i for i, s in enumerate(SLOTS)}
+
+
+def _contar(conteo_grupo, conteo_slot, grupo_de, slot_de):
+    """Acumula arrays (sorteos x equipos) de grupo (0-11) y slot (1-4) en los conteos."""
+    fila = np.arange(len(EQUIPOS))
+    grupo_de = grupo_de.astype(np.int64)
+    conteo_grupo += np.bincount((fila * len(GRUPOS) + grupo_de).ravel(),
+                                minlength=conteo_grupo.size).reshape(conteo_grupo.shape)
+    conteo_slot += np.bincount((fila * len(SLOTS) + grupo_de * 4 + slot_de - 1).ravel(),
+                               minlength=conteo_slot.size).reshape(conteo_slot.shape)
+
+
+def _simular_bloque(inicio, n_sorteos, semilla, motor='secuencial', torneos=0, coocurrencia=False,
+                    fuerza_grupos=False):
+    """
+    Worker: ejecuta los sorteos `inicio` .. `inicio + n_sorteos - 1` y devuelve los
+    conteos agregados. Cada sorteo usa su propio generador (`semillas.random_sorteo`),
+    así que el resultado no depende de cómo se reparte el lote entre procesos.
+    Con `torneos` > 0 juega esa cantidad de torneos por sorteo y cuenta las rondas alcanzadas;
+    con `coocurrencia` y `fuerza_grupos` devuelve también sus agregadores (si no, None).
+    """
+    conteo_grupo = np.zeros((len(EQUIPOS), len(GRUPOS)), dtype=np.int64)
+    conteo_slot = np.zeros((len(EQUIPOS), len(SLOTS)), dtype=np.int64)
+    conteo_ronda = np.zeros((len(EQUIPOS), len(RONDAS)), dtype=np.int64)
+    agregador = AgregadorCoocurrencia() if coocurrencia else None
+    fuerza = AgregadorFuerza() if fuerza_grupos else None
+
+    for indice in range(inicio, inicio + n_sorteos):
+        grupos_dict, asignaciones, _ = sortear_completo(df_bombos, verbose=False,
+                                                        rng=random_sorteo(semilla, indice))
+        for eq, info in asignaciones.items():
+            i = IDX_EQUIPO[eq]
+            conteo_grupo[i, IDX_GRUPO[info['grupo']]] += 1
+            conteo_slot[i, IDX_SLOT[info['slot']]] += 1
+        if agregador is not None:
+            agregador.agregar_asignaciones(asignaciones)
+        if fuerza is not None:
+            fuerza.agregar_asignaciones(asignaciones)
+        if torneos:
+            conteo_ronda += contar_rondas(matriz_grupos(grupos_dict), generador_sorteo(semilla, indice, FLUJO_TORNEO),
+                                          torneos)
+
+    return n_sorteos, conteo_grupo, conteo_slot, conteo_ronda, agregador, fuerza
+
+
+def _bloque_kernel(semilla, bloque, motor='vectorizado'):
+    """
+    Bloque `bloque` de un motor por bloques ('vectorizado' o 'uniforme'): sorteos
+    bloque*T .. (bloque+1)*T - 1, con T = TAMANO_BLOQUE_KERNEL.
+    """
+    if motor == 'uniforme':
+        from muestreo_uniforme import muestreador
+        return muestreador().sortear_bloque(TAMANO_BLOQUE_KERNEL, generador_sorteo(semilla, bloque, FLUJO_UNIFORME))
+    return sortear_bloque(TAMANO_BLOQUE_KERNEL, generador_sorteo(semilla, bloque, FLUJO_KERNEL))
+
+
+def _simular_bloque_vectorizado(inicio, n_sorteos, semilla, motor='vectorizado', torneos=0, coocurrencia=False,
+                                fuerza_grupos=False):
+    """
+    Worker de los motores por bloques: mismos conteos que `_simular_bloque`.
+
+    El sorteo k es la fila k % T del bloque k // T del kernel, así que el rango se recorre
+    por bloques completos (el último se recorta si el rango termina a mitad de bloque).
+    Los torneos de un bloque usan el generador del bloque en `FLUJO_TORNEO`.
+    """
+    conteo_grupo = np.zeros((len(EQUIPOS), len(GRUPOS)), dtype=np.int64)
+    conteo_slot = np.zeros((len(EQUIPOS), len(SLOTS)), dtype=np.int64)
+    conteo_ronda = np.zeros((len(EQUIPOS), len(RONDAS)), dtype=np.int64)
+    agregador = AgregadorCoocurrencia() if coocurrencia else None
+    fuerza = AgregadorFuerza() if fuerza_grupos else None
+
+    fin = inicio + n_sorteos
+    for bloque in range(inicio // TAMANO_BLOQUE_KERNEL, -(-fin // TAMANO_BLOQUE_KERNEL)):
+        base = bloque * TAMANO_BLOQUE_KERNEL
+        filas = slice(max(inicio, base) - base, min(fin, base + TAMANO_BLOQUE_KERNEL) - base)
+        grupo_de, slot_de = _bloque_kernel(semilla, bloque, motor)
+        _contar(conteo_grupo, conteo_slot, grupo_de[filas], slot_de[filas])
+        if agregador is not None:
+            agregador.agregar(grupo_de[filas])
+        if fuerza is not None:
+            fuerza.agregar(grupo_de[filas])
+        if torneos:
+            conteo_ronda += contar_rondas(matrices_grupos(grupo_de[filas], slot_de[filas]),
+                                          generador_sorteo(semilla, bloque, FLUJO_TORNEO), torneos)
+
+    return n_sorteos, conteo_grupo, conteo_slot, conteo_ronda, agregador, fuerza
+
+
+def _repartir(n_sorteos, n_bloques):
+    """Divide `n_sorteos` en `n_bloques` tamaños lo más parejos posible (sin bloques vacíos)."""
+    n_bloques = max(1, min(n_bloques, n_sorteos))
+    base, resto = divmod(n_sorteos, n_bloques)
+    return [base + (1 if i < resto else 0) for i in range(n_bloques)]
+
+
+def _rangos(n_sorteos, n_bloques, alineacion=1):
+    """
+    Rangos (inicio, n) consecutivos que cubren 0 .. n_sorteos - 1 en unos `n_bloques`
+    trozos cuyos inicios son múltiplos de `alineacion`.
+    """
+    unidades = -(-n_sorteos // alineacion)
+    rangos, inicio = [], 0
+    for u in _repartir(unidades, n_bloques):
+        n = min(u * alineacion, n_sorteos - inicio)
+        rangos.append((inicio, n))
+        inicio += n
+    return rangos
+
+
+def regenerar_sorteo(indice, semilla, motor='vectorizado'):
+    """
+    Regenera el sorteo número `indice` de un lote de `simular_lote` con la misma
+    semilla y motor. Devuelve `{codigo: {'grupo': 'A', 'slot': 'A3'}}`.
+    """
+    if motor == 'secuencial':
+        _, asignaciones, _ = sortear_completo(df_bombos, verbose=False,
+                                              rng=random_sorteo(semilla, indice))
+        return {eq: {'grupo': info['grupo'], 'slot': info['slot']} for eq, info in asignaciones.items()}
+
+    grupo_de, slot_de = _bloque_kernel(semilla, indice // TAMANO_BLOQUE_KERNEL, motor)
+    fila = indice % TAMANO_BLOQUE_KERNEL
+    return {
+        eq: {'grupo': GRUPOS[grupo_de[fila, i]], 'slot': f"{GRUPOS[grupo_de[fila, i]]}{slot_de[fila, i]}"}
+        for i, eq in enumerate(EQUIPOS)
+    }
+
+
+def simular_lote(n_sorteos, n_procesos=None, bloques_por_proceso=4, semilla=None, motor='vectorizado', torneos=0,
+                coocurrencia=False, fuerza_grupos=False):
+    """
+    Ejecuta `n_sorteos` sorteos completos en paralelo con el motor indicado (ver `MOTORES`).
+
+    Devuelve un diccionario con:
+    - 'n_sorteos': número de sorteos agregados.
+    - 'semilla': semilla maestra (el sorteo k se regenera con `regenerar_sorteo(k, semilla, motor)`).
+    - 'prob_grupo': DataFrame 48x12 (equipo x grupo) con la probabilidad de cada grupo.
+    - 'prob_slot': DataFrame 48x48 (equipo x slot A1..L4) con la probabilidad de cada slot.
+    - 'prob_ronda' (sólo con `torneos` > 0): DataFrame equipo x `RONDAS` con la probabilidad de
+      alcanzar cada ronda, sobre `torneos` torneos simulados por sorteo.
+    - 'coocurrencia' (sólo con `coocurrencia=True`): `AgregadorCoocurrencia` fusionado de todos
+      los workers.
+    - 'fuerza_grupos' (sólo con `fuerza_grupos=True`): `AgregadorFuerza` fusionado de todos los workers.
+    """
+    if n_sorteos < 1:
+        raise ValueError(f"El número de sorteos debe ser al menos 1: {n_sorteos}")
+    if motor not in MOTORES:
+        raise ValueError(f"Motor desconocido: {motor!r} (opciones: {', '.join(MOTORES)})")
+    if semilla is None:
+        semilla = nueva_semilla()
+
+    n_procesos = n_procesos or os.cpu_count() or 1
+    if motor != 'secuencial':
+        worker = _simular_bloque_vectorizado
+        rangos = _rangos(n_sorteos, n_procesos * bloques_por_proceso, TAMANO_BLOQUE_KERNEL)
+    else:
+        worker = _simular_bloque
+        rangos = _rangos(n_sorteos, n_procesos * bloques_por_proceso)
+
+    conteo_grupo = np.zeros((len(EQUIPOS), len(GRUPOS)), dtype=np.int64)
+    conteo_slot = np.zeros((len(EQUIPOS), len(SLOTS)), dtype=np.int64)
+    conteo_ronda = np.zeros((len(EQUIPOS), len(RONDAS)), dtype=np.int64)
+    agregador = AgregadorCoocurrencia() if coocurrencia else None
+    fuerza = AgregadorFuerza() if fuerza_grupos else None
+    total = 0
+
+    inicios, tamanos = zip(*rangos)
+    with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+        for n, c_grupo, c_slot, c_ronda, a, f in pool.map(worker, inicios, tamanos, [semilla] * len(rangos),
+                                                          [motor] * len(rangos), [torneos] * len(rangos),
+                                                          [coocurrencia] * len(rangos),
+                                                          [fuerza_grupos] * len(rangos)):
+            total += n
+            conteo_grupo += c_grupo
+            conteo_slot += c_slot
+            conteo_ronda += c_ronda
+            if agregador is not None:
+                agregador += a
+            if fuerza is not None:
+                fuerza += f
+
+    resultado = {
+        'n_sorteos': total,
+        'semilla': semilla,
+        'prob_grupo': pd.DataFrame(conteo_grupo / total, index=EQUIPOS, columns=GRUPOS),
+        'prob_slot': pd.DataFrame(conteo_slot / total, index=EQUIPOS, columns=SLOTS),
+    }
+    if torneos:
+        resultado['prob_ronda'] = pd.DataFrame(conteo_ronda / (total * torneos), index=EQUIPOS, columns=RONDAS)
+    if agregador is not None:
+        resultado['coocurrencia'] = agregador
+    if fuerza is not None:
+        resultado['fuerza_grupos'] = fuerza
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo del sorteo FIFA World Cup 2026")
+    parser.add_argument('-n', '--sorteos', type=int, default=1000, help="Número de sorteos completos")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos del pool (por defecto: todos los núcleos)")
+    parser.add_argument('--semilla', type=int, default=None, help="Semilla maestra del lote")
+    parser.add_argument('--motor', choices=MOTORES, default='vectorizado', help="Motor de simulación")
+    parser.add_argument('--torneos', type=int, default=0, metavar='N',
+                        help="Torneos simulados por sorteo (agrega prob_ronda.csv)")
+    parser.add_argument('--salida', default=None, help="Directorio donde guardar prob_grupo.csv y prob_slot.csv")
+    parser.add_argument('--regenerar', type=int, default=None, metavar='K',
+                        help="Muestra sólo el sorteo número K del lote (requiere --semilla)")
+    args = parser.parse_args()
+
+    if args.regenerar is not None:
+        if args.semilla is None:
+            parser.error("--regenerar requiere --semilla")
+        asignaciones = regenerar_sorteo(args.regenerar, args.semilla, args.motor)
+        for grupo in GRUPOS:
+            equipos = sorted((info['slot'], eq) for eq, info in asignaciones.items() if info['grupo'] == grupo)
+            print(f"Grupo {grupo}: " + ", ".join(f"{slot} {eq}" for slot, eq in equipos))
+        return
+
+    inicio = time.perf_counter()
+    resultado = simular_lote(args.sorteos, n_procesos=args.procesos, semilla=args.semilla, motor=args.motor,
+                             torneos=args.torneos)
+    duracion = time.perf_counter() - inicio
+
+    print(f"{resultado['n_sorteos']} sorteos en {duracion:.1f} s "
+          f"({resultado['n_sorteos'] / duracion:.0f} sorteos/s), semilla {resultado['semilla']}")
+    print("\n--- Probabilidad equipo x grupo ---")
+    print(resultado['prob_grupo'].round(3).to_string())
+    if args.torneos:
+        print("\n--- Probabilidad de alcanzar cada ronda ---")
+        print(resultado['prob_ronda'].sort_values('campeon', ascending=False).round(3).to_string())
+
+    if args.salida:
+        os.makedirs(args.salida, exist_ok=True)
+        resultado['prob_grupo'].to_csv(os.path.join(args.salida, 'prob_grupo.csv'))
+        resultado['prob_slot'].to_csv(os.path.join(args.salida, 'prob_slot.csv'))
+        if args.torneos:
+            resultado['prob_ronda'].to_csv(os.path.join(args.salida, 'prob_ronda.csv'))
+
+
+if __name__ == "__main__":
+    main()
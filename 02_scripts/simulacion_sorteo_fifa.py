@@ -1,9 +1,28 @@
+import argparse
+from contextlib import nullcontext
+
 import pandas as pd
 from simular_bombos import df_bombos  
-from simular_sorteo_func import sortear_bombo_1, sortear_bombo_n
+from simular_sorteo_func import sortear_bombo_1, sortear_bombo_n, instrumentar
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Sorteo FIFA World Cup 2026 (consola)")
+    parser.add_argument('--stats', action='store_true',
+                        help="Muestra contadores y tiempos del sorteo (lookahead, rechazos, ms por bombo)")
+    args = parser.parse_args()
+
+    with instrumentar() if args.stats else nullcontext() as estadisticas:
+        grupos_dict = sortear(df_bombos)
+
+    mostrar_grupos(grupos_dict)
+
+    if estadisticas is not None:
+        print("\n--- Estadísticas del sorteo ---")
+        print(estadisticas.resumen())
+
+
+def sortear(df_bombos):
     # --- BOMBO 1 ---
     grupos_dict, asignaciones_sorteo, bombos_slots = sortear_bombo_1(df_bombos)
 
@@ -17,6 +36,10 @@ def main():
             asignaciones_sorteo
         )
 
+    return grupos_dict
+
+
+def mostrar_grupos(grupos_dict):
     # --- Crear tabla final ---
     filas = []
     for grupo, equipos in grupos_dict.items():
@@ -0,0 +1,232 @@
+"""
+Simulación vectorizada del Mundial desde los grupos sorteados hasta la final.
+
+Cada torneo es una fila de arrays de NumPy; un lote de T torneos se juega a la vez:
+
+- Fase de grupos: los 6 partidos de cada uno de los 12 grupos (T x 12 x 6 marcadores).
+  Clasificación por puntos, diferencia de goles, goles a favor y sorteo.
+- Los 8 mejores terceros se reparten en los cruces de dieciseisavos con `TERCEROS`
+  (una asignación válida por cada combinación de grupos, precalculada una vez).
+- Eliminatorias: 32 equipos en el orden del cuadro; cada ronda enfrenta posiciones
+  consecutivas (90 minutos, prórroga y penales).
+
+Modelo de partido: goles de Poisson con media `GOLES_POR_EQUIPO * 10 ** (±dr / (2 * ESCALA_GOLES))`,
+con `dr` la diferencia de `puntos_totales` del ranking FIFA (`FIFA_PR_19_11_2025.csv`). La escala
+está calibrada para que P(gana) + P(empata) / 2 reproduzca la expectativa de la fórmula del
+ranking, 1 / (1 + 10 ** (-dr / 600)), con error menor a un punto para |dr| <= 500.
+
+El resultado es la probabilidad de que cada equipo alcance cada ronda (`RONDAS`):
+
+    python 02_scripts/simulacion_torneo.py --torneos 1000000 --semilla 2026
+"""
+import argparse
+import time
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from estado_sorteo import GRUPOS, IDX_GRUPO
+from semillas import FLUJO_TORNEO, generador_sorteo, nueva_semilla
+from simular_sorteo_func import TABLA, df_bombos, sortear_completo
+
+RONDAS = ('dieciseisavos', 'octavos', 'cuartos', 'semifinal', 'final', 'campeon')
+
+#Media de goles por equipo y partido en los últimos Mundiales
+GOLES_POR_EQUIPO = 1.35
+ESCALA_GOLES = 790
+
+#Torneos por lote (acota la memoria de los arrays T x 12 x 6)
+TAMANO_LOTE = 50_000
+
+#Partidos del grupo entre las posiciones de slot 1-4 (índices 0-3)
+PARTIDOS_GRUPO = np.array([(0, 1), (2, 3), (0, 2), (1, 3), (0, 3), (1, 2)])
+
+#Dieciseisavos en el orden del cuadro: los ganadores de los cruces 2k y 2k+1 se enfrentan en
+#octavos, y así hasta la final. ('1', 'E') es el primero del grupo E; ('3', 'ABCDF') uno de
+#los 8 mejores terceros, de alguno de esos grupos.
+DIECISEISAVOS = (
+    (('1', 'E'), ('3', 'ABCDF')), (('1', 'I'), ('3', 'CDFGH')),
+    (('2', 'A'), ('2', 'B')), (('1', 'F'), ('2', 'C')),
+    (('2', 'K'), ('2', 'L')), (('1', 'H'), ('2', 'J')),
+    (('1', 'D'), ('3', 'BEFIJ')), (('1', 'G'), ('3', 'AEHIJ')),
+    (('1', 'C'), ('2', 'F')), (('2', 'E'), ('2', 'I')),
+    (('1', 'A'), ('3', 'CEFHI')), (('1', 'L'), ('3', 'EHIJK')),
+    (('1', 'J'), ('2', 'H')), (('2', 'D'), ('2', 'G')),
+    (('1', 'B'), ('3', 'EFGIJ')), (('1', 'K'), ('3', 'DEIJL')),
+)
+_CUPOS_TERCEROS = [visitante[1] for _, visitante in DIECISEISAVOS if visitante[0] == '3']
+
+
+def _tabla_terceros():
+    """
+    `TERCEROS[mascara]`: grupo del tercero que ocupa cada cupo de tercero del cuadro, para la
+    máscara de bits de los 8 grupos cuyos terceros clasifican (-1 en máscaras imposibles).
+    """
+    tabla = np.full((1 << len(GRUPOS), len(_CUPOS_TERCEROS)), -1, dtype=np.int8)
+
+    def asignar(cupo, grupos, usados):
+        if cupo == len(_CUPOS_TERCEROS):
+            return []
+        for g in grupos:
+            if g not in usados and GRUPOS[g] in _CUPOS_TERCEROS[cupo]:
+                resto = asignar(cupo + 1, grupos, usados | {g})
+                if resto is not None:
+                    return [g] + resto
+        return None
+
+    for grupos in combinations(range(len(GRUPOS)), len(_CUPOS_TERCEROS)):
+        asignacion = asignar(0, grupos, frozenset())
+        if asignacion is None:
+            raise ValueError(f"Ningún reparto de terceros para los grupos {[GRUPOS[g] for g in grupos]}")
+        tabla[sum(1 << g for g in grupos)] = asignacion
+    return tabla
+
+
+TERCEROS = _tabla_terceros()
+
+
+def fuerza_equipos(df=df_bombos):
+    """`puntos_totales` como float, en el orden de ids de la tabla de equipos."""
+    return pd.to_numeric(df['puntos_totales'], errors='coerce').to_numpy(dtype=np.float64)
+
+
+FUERZA = fuerza_equipos()
+
+
+def goles_esperados(diferencia):
+    """Medias de Poisson (local, visitante) para una diferencia de puntos de ranking."""
+    factor = 10.0 ** (diferencia / (2 * ESCALA_GOLES))
+    return GOLES_POR_EQUIPO * factor, GOLES_POR_EQUIPO / factor
+
+
+def matriz_grupos(grupos_dict, tabla=TABLA):
+    """Array 12 x 4 de ids de equipo por grupo y slot a partir de `grupos_dict`."""
+    grupos = np.full((len(GRUPOS), 4), -1, dtype=np.int16)
+    for grupo, equipos in grupos_dict.items():
+        for e in equipos:
+            grupos[IDX_GRUPO[grupo], int(e['slot'][1:]) - 1] = tabla.idx[e['codigo']]
+    return grupos
+
+
+def matrices_grupos(grupo_de, slot_de):
+    """Arrays K x 12 x 4 de ids por grupo y slot a partir de la salida de los kernels (K x 48)."""
+    k, n_equipos = grupo_de.shape
+    grupos = np.empty((k, len(GRUPOS), 4), dtype=np.int16)
+    filas = np.repeat(np.arange(k), n_equipos)
+    grupos[filas, grupo_de.ravel(), slot_de.ravel() - 1] = np.tile(np.arange(n_equipos, dtype=np.int16), k)
+    return grupos
+
+
+def _eliminatoria(a, b, fuerza, rng):
+    """Ganadores de los cruces `a` contra `b`: 90 minutos, prórroga (un tercio) y penales."""
+    local, visitante = goles_esperados(fuerza[a] - fuerza[b])
+    goles_a = rng.poisson(local)
+    goles_b = rng.poisson(visitante)
+    empate = goles_a == goles_b
+    goles_a += rng.poisson(local / 3) * empate
+    goles_b += rng.poisson(visitante / 3) * empate
+    gana_a = (goles_a > goles_b) | ((goles_a == goles_b) & (rng.random(a.shape) < 0.5))
+    return np.where(gana_a, a, b)
+
+
+def _jugar_lote(grupos, fuerza, rng, conteo):
+    """Juega un torneo por fila de `grupos` (T x 12 x 4) y suma a `conteo` (equipos x rondas)."""
+    n_equipos = conteo.shape[0]
+
+    # --- Fase de grupos ---
+    local = grupos[:, :, PARTIDOS_GRUPO[:, 0]]
+    visitante = grupos[:, :, PARTIDOS_GRUPO[:, 1]]
+    media_local, media_visitante = goles_esperados(fuerza[local] - fuerza[visitante])
+    goles_local = rng.poisson(media_local)
+    goles_visitante = rng.poisson(media_visitante)
+
+    #Incidencia partido -> posición: suma por posición de lo que hizo como local y visitante
+    es_local = np.eye(4, dtype=np.int64)[PARTIDOS_GRUPO[:, 0]]
+    es_visitante = np.eye(4, dtype=np.int64)[PARTIDOS_GRUPO[:, 1]]
+    puntos_local = 3 * (goles_local > goles_visitante) + (goles_local == goles_visitante)
+    puntos_visitante = 3 * (goles_visitante > goles_local) + (goles_local == goles_visitante)
+    puntos = puntos_local @ es_local + puntos_visitante @ es_visitante
+    favor = goles_local @ es_local + goles_visitante @ es_visitante
+    contra = goles_visitante @ es_local + goles_local @ es_visitante
+
+    #Criterios de desempate en una sola clave; el sorteo final es la parte fraccionaria
+    clave = puntos * 1e6 + (favor - contra + 500) * 1e3 + favor + rng.random(puntos.shape)
+    orden = np.argsort(-clave, axis=2)
+    posicion = np.take_along_axis(grupos, orden, axis=2)
+    clave_tercero = np.take_along_axis(clave, orden[:, :, 2:3], axis=2)[:, :, 0]
+
+    # --- Mejores terceros ---
+    mejores = np.argsort(-clave_tercero, axis=1)[:, :len(_CUPOS_TERCEROS)]
+    mascara = (1 << mejores).sum(axis=1)
+    filas = np.arange(len(grupos))[:, None]
+    terceros = posicion[filas, TERCEROS[mascara], 2]
+
+    # --- Cuadro ---
+    columnas = []
+    cupo = 0
+    for cruce in DIECISEISAVOS:
+        for lugar, grupos_cruce in cruce:
+            if lugar == '3':
+                columnas.append(terceros[:, cupo])
+                cupo += 1
+            else:
+                columnas.append(posicion[:, IDX_GRUPO[grupos_cruce], int(lugar) - 1])
+    equipos = np.stack(columnas, axis=1)
+
+    for ronda in range(len(RONDAS)):
+        conteo[:, ronda] += np.bincount(equipos.ravel(), minlength=n_equipos)
+        if ronda < len(RONDAS) - 1:
+            equipos = _eliminatoria(equipos[:, 0::2], equipos[:, 1::2], fuerza, rng)
+
+
+def contar_rondas(grupos, rng, torneos_por_sorteo=1, fuerza=FUERZA):
+    """
+    Juega `torneos_por_sorteo` torneos por cada sorteo de `grupos` (K x 12 x 4, o 12 x 4 para uno
+    solo) y devuelve los conteos (equipos x rondas) de equipos que alcanzan cada ronda.
+    """
+    grupos = np.asarray(grupos).reshape(-1, len(GRUPOS), 4)
+    conteo = np.zeros((len(fuerza), len(RONDAS)), dtype=np.int64)
+    total = len(grupos) * torneos_por_sorteo
+    for inicio in range(0, total, TAMANO_LOTE):
+        indices = np.arange(inicio, min(total, inicio + TAMANO_LOTE)) // torneos_por_sorteo
+        _jugar_lote(grupos[indices], fuerza, rng, conteo)
+    return conteo
+
+
+def probabilidades_torneo(grupos_dict, n_torneos=100_000, semilla=None, tabla=TABLA, fuerza=FUERZA):
+    """
+    Probabilidad de que cada equipo alcance cada ronda dado el sorteo `grupos_dict`
+    (DataFrame equipos x `RONDAS`, ordenado por probabilidad de ser campeón).
+    """
+    if semilla is None:
+        semilla = nueva_semilla()
+    rng = generador_sorteo(semilla, 0, FLUJO_TORNEO)
+    conteo = contar_rondas(matriz_grupos(grupos_dict, tabla), rng, n_torneos, fuerza)
+    tabla_rondas = pd.DataFrame(conteo / n_torneos, index=tabla.codigos, columns=RONDAS)
+    return tabla_rondas.sort_values(list(RONDAS[::-1]), ascending=False)
+
+
+def main():
+    from semillas import random_sorteo
+
+    parser = argparse.ArgumentParser(description="Simulación del torneo desde los grupos sorteados")
+    parser.add_argument('--torneos', type=int, default=100_000, help="Torneos simulados sobre el sorteo")
+    parser.add_argument('--semilla', type=int, default=None, help="Semilla maestra")
+    parser.add_argument('--sorteo', type=int, default=0, metavar='K', help="Índice del sorteo (motor secuencial)")
+    args = parser.parse_args()
+    semilla = nueva_semilla() if args.semilla is None else args.semilla
+
+    grupos_dict, _, _ = sortear_completo(df_bombos, verbose=False, rng=random_sorteo(semilla, args.sorteo))
+    for grupo, equipos in grupos_dict.items():
+        print(f"Grupo {grupo}: " + ", ".join(e['codigo'] for e in sorted(equipos, key=lambda e: e['slot'])))
+
+    inicio = time.perf_counter()
+    tabla_rondas = probabilidades_torneo(grupos_dict, args.torneos, semilla)
+    duracion = time.perf_counter() - inicio
+    print(f"\n{args.torneos} torneos en {duracion:.1f} s ({args.torneos / duracion:.0f} torneos/s), semilla {semilla}")
+    print(tabla_rondas.round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
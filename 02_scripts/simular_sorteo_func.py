@@ -1,189 +1,402 @@
-import pandas as pd
-import numpy as np
 import random
 import string
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import NamedTuple
+
+
+from simular_bombos import df_bombos, df_clasificados, asignar_bombos
+from estado_sorteo import TablaEquipos, EstadoSorteo, CONFEDERACIONES, IDX_GRUPO
+from factibilidad import CACHE, factible_estado
+from restricciones import compilar
+from semillas import FLUJO_REPECHAJES, generador_sorteo, random_sorteo
+
+#Tabla compacta de equipos (ids enteros + confederación como array), construida una sola vez
+TABLA = TablaEquipos.desde_df(df_bombos)
+
+#Anfitriones y su slot fijo en el bombo 1
+ANFITRIONES = {
+    "MEX": "A1",
+    "CAN": "B1",
+    "USA": "D1"
+}
+
+
+#Eventos del sorteo (ver `eventos_bombo_1` / `eventos_bombo_n`)
+class BomboIniciado(NamedTuple):
+    bombo: int
+
+
+class BolaSorteada(NamedTuple):
+    bombo: int
+    codigo: str
+    conf: str
+
+
+class GrupoRechazado(NamedTuple):
+    bombo: int
+    codigo: str
+    grupo: str
+    motivo: str   # 'confederacion', 'regla' (ver `restricciones`) o 'lookahead'
+    mensaje: str
+
+
+class GrupoAsignado(NamedTuple):
+    bombo: int
+    codigo: str
+    grupo: str
+
+
+class SlotSorteado(NamedTuple):
+    bombo: int
+    codigo: str
+    grupo: str
+    slot: str
+    conf: str
+
+
+class EstadisticasSorteo:
+    """
+    Contadores y tiempos del camino crítico, acumulados mientras está activa (`instrumentar`).
+
+    - `validaciones`: constraints de confederación evaluados (checker_validez_grupo y bombos 2-4).
+    - `lookaheads` / `lookaheads_rechazados`: llamadas al lookahead y cuántas dijeron que no.
+    - `evaluaciones_oraculo` / `aciertos_cache`: consultas de factibilidad que evaluaron el
+      oráculo de cortes (los "nodos" que antes recorría el backtracking) y las que resolvió la caché.
+    - `rechazos`: grupos rechazados por equipo (confederación o lookahead).
+    - `tiempo_bombo`: segundos por bombo.
+    """
+    __slots__ = ('validaciones', 'lookaheads', 'lookaheads_rechazados', 'evaluaciones_oraculo',
+                 'aciertos_cache', 'rechazos', 'tiempo_bombo')
+
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.validaciones = 0
+        self.lookaheads = 0
+        self.lookaheads_rechazados = 0
+        self.evaluaciones_oraculo = 0
+        self.aciertos_cache = 0
+        self.rechazos = Counter()
+        self.tiempo_bombo = {}
+
+    def como_dict(self):
+        return {
+            'validaciones': self.validaciones,
+            'lookaheads': self.lookaheads,
+            'lookaheads_rechazados': self.lookaheads_rechazados,
+            'evaluaciones_oraculo': self.evaluaciones_oraculo,
+            'aciertos_cache': self.aciertos_cache,
+            'rechazos': dict(self.rechazos),
+            'tiempo_bombo': dict(self.tiempo_bombo),
+        }
 
+    def resumen(self):
+        """Texto de varias líneas para consola o UI."""
+        lineas = [
+            f"Validaciones de confederación: {self.validaciones}",
+            f"Lookaheads: {self.lookaheads} ({self.lookaheads_rechazados} rechazados)",
+            f"Oráculo de factibilidad: {self.evaluaciones_oraculo} evaluaciones, "
+            f"{self.aciertos_cache} aciertos de caché",
+        ]
+        for n_bombo, segundos in sorted(self.tiempo_bombo.items()):
+            lineas.append(f"Bombo {n_bombo}: {segundos * 1000:.2f} ms")
+        if self.rechazos:
+            peores = ", ".join(f"{eq} ({n})" for eq, n in self.rechazos.most_common(5))
+            lineas.append(f"Más rechazos: {peores}")
+        return "\n".join(lineas)
+
+
+#Estadísticas activas; None = instrumentación apagada (sólo cuesta un `get()` por punto).
+#Es una ContextVar para que cada hilo del pool de la app instrumente su propio sorteo.
+ESTADISTICAS = ContextVar('estadisticas_sorteo', default=None)
+
+
+@contextmanager
+def instrumentar(estadisticas=None):
+    """
+    Activa la instrumentación dentro del bloque y devuelve las estadísticas. Pasando un
+    objeto existente se acumula sobre él (p. ej. bombo a bombo desde la UI).
+    """
+    if estadisticas is None:
+        estadisticas = EstadisticasSorteo()
+    token = ESTADISTICAS.set(estadisticas)
+    try:
+        yield estadisticas
+    finally:
+        ESTADISTICAS.reset(token)
+
+
+@contextmanager
+def _medir_bombo(n_bombo):
+    #Tiempo del bombo y consultas a la caché de factibilidad hechas durante él (la caché es
+    #compartida: con varios sorteos simultáneos en hilos los aciertos son aproximados)
+    est = ESTADISTICAS.get()
+    if est is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    aciertos, fallos = CACHE.aciertos, CACHE.fallos
+    try:
+        yield
+    finally:
+        est.tiempo_bombo[n_bombo] = est.tiempo_bombo.get(n_bombo, 0.0) + time.perf_counter() - inicio
+        est.aciertos_cache += CACHE.aciertos - aciertos
+        est.evaluaciones_oraculo += CACHE.fallos - fallos
+
+
+def _tabla_de(df):
+    #Evitamos reconstruir la tabla cuando se sortea sobre los bombos del módulo
+    return TABLA if df is df_bombos else TablaEquipos.desde_df(df)
+
+
+def _motivo_rechazo(conf):
+    if conf != 'UEFA':
+        return f"Otro equipo de {conf}. Reasignando..."
+    return "Dos equipos de UEFA actuales. Reasignando..."
 
-from simular_bombos import df_bombos
 
 #Definimos funciones
-def checker_validez_grupo(grupo, eq_sorteado, grupos_dict, verbose=True):
+def checker_validez_grupo(grupo, eq_sorteado, grupos_dict, verbose=True, reglas=None):
     #Confederacion del sorteado
-    conf_sorteado = df_bombos.loc[df_bombos['codigo'] == eq_sorteado, 'confederacion'].iloc[0]
-
-    #Equipos en grupo
-    equipos_en_grupo = grupos_dict[grupo]
-
-    #Extraer confederaciones ya asignadas
-    confs = [e['conf'] for e in equipos_en_grupo]
-
-    #Contamos apariciones de confederacion
-    conf_counts = pd.Series(confs).value_counts()
+    conf_sorteado = TABLA.conf_de(eq_sorteado)
+
+    est = ESTADISTICAS.get()
+    if est is not None:
+        est.validaciones += 1
+
+    #Reglas declarativas (ver `restricciones`) en vez de los cupos fijos
+    if reglas is not None:
+        reglas = compilar(reglas, TABLA)
+        estado = EstadoSorteo.desde_grupos_dict(TABLA, grupos_dict)
+        g, eq = IDX_GRUPO[grupo], TABLA.idx[eq_sorteado]
+        if reglas.valido(estado, g, eq):
+            return True
+        if est is not None:
+            est.rechazos[eq_sorteado] += 1
+        if verbose:
+            print(reglas.motivo(estado, g, eq)[1])
+        return False
+
+    #Contamos apariciones de la confederacion en el grupo
+    n_misma_conf = sum(1 for e in grupos_dict[grupo] if e['conf'] == conf_sorteado)
 
     #-----Constraints FIFA------
+    #UEFA permite máximo 2, el resto máximo 1
+    cupo = 2 if conf_sorteado == 'UEFA' else 1
 
-    if conf_sorteado != 'UEFA':
-        if conf_sorteado in conf_counts.index:
-            if verbose:
-                print(f"Otro equipo de {conf_sorteado}. Reasignando...")
-            return False
-    else:
-        #UEFA permite máximo 2
-        if conf_counts.get('UEFA', 0) >= 2:
-            if verbose:
-                print("Dos equipos de UEFA actuales. Reasignando...")
-            return False
-        
-    return True
-
-
-def lookahead(grupo_target, equipo_actual, equipos_restantes, grupos_dict, bombos_slots, numero_de_bombo):
-    # 1. Copia de los grupos
-    grupos_sim = {g: lst.copy() for g, lst in grupos_dict.items()}
-    conf_actual = df_bombos.loc[df_bombos['codigo'] == equipo_actual, 'confederacion'].iloc[0]
-    grupos_sim[grupo_target].append({"codigo": equipo_actual, "slot": None, "conf": conf_actual})
-
-    # 2. Función recursiva para asignar equipos restantes
-    def asignar_restantes(restantes, grupos):
-        if not restantes:
-            return True  # todos asignados
-
-        eq = restantes[0]
-        conf_eq = df_bombos.loc[df_bombos['codigo'] == eq, 'confederacion'].iloc[0]
-
-        for g in grupos.keys():
-            if len(grupos[g]) >= numero_de_bombo:
-                continue
-            if not checker_validez_grupo(g, eq, grupos, verbose=False):
-                continue
-
-            # Asignación temporal
-            grupos[g].append({"codigo": eq, "slot": None, "conf": conf_eq})
-            if asignar_restantes(restantes[1:], grupos):
-                return True  # éxito
-            grupos[g].pop()  # deshacer asignación si no funciona
+    if n_misma_conf >= cupo:
+        if est is not None:
+            est.rechazos[eq_sorteado] += 1
+        if verbose:
+            print(_motivo_rechazo(conf_sorteado))
+        return False
 
-        return False  # ningún grupo válido para este equipo
+    return True
 
-    return asignar_restantes(equipos_restantes, grupos_sim)
 
-def sortear_bombo_1(df_bombos):
-    #Generamos esqueleto
+def lookahead_estado(estado, g_target, eq_actual, equipos_restantes, numero_de_bombo, cache=CACHE,
+                     reglas=None):
+    # 1. Asignación temporal sobre el mismo estado (se deshace al salir, sin copias)
+    estado.colocar(eq_actual, g_target)
+
+    # 2. ¿Caben los equipos restantes? Flujo máximo en vez de backtracking
+    #    (cache=None evalúa siempre el oráculo, sin caché de firmas); con `reglas`
+    #    compiladas, condición de Hall sobre sus máscaras
+    try:
+        if reglas is None:
+            factible = factible_estado(estado, equipos_restantes, numero_de_bombo, cache)
+        else:
+            factible = reglas.factible(estado, equipos_restantes, numero_de_bombo, cache is not None)
+    finally:
+        estado.quitar(eq_actual)
+
+    est = ESTADISTICAS.get()
+    if est is not None:
+        est.lookaheads += 1
+        est.lookaheads_rechazados += not factible
+        if cache is None:
+            est.evaluaciones_oraculo += 1
+    return factible
+
+
+def lookahead(grupo_target, equipo_actual, equipos_restantes, grupos_dict, bombos_slots, numero_de_bombo,
+              reglas=None):
+    #Versión sobre grupos_dict: convierte a EstadoSorteo y delega en lookahead_estado
+    estado = EstadoSorteo.desde_grupos_dict(TABLA, grupos_dict)
+    return lookahead_estado(
+        estado,
+        IDX_GRUPO[grupo_target],
+        TABLA.idx[equipo_actual],
+        [TABLA.idx[eq] for eq in equipos_restantes],
+        numero_de_bombo,
+        reglas=None if reglas is None else compilar(reglas, TABLA)
+    )
+
+def nuevo_sorteo():
+    """Estructuras vacías `(grupos_dict, asignaciones_sorteo, bombos_slots)` de un sorteo."""
     grupos = list(string.ascii_uppercase[:12])  # A-L
+    grupos_dict = {g: [] for g in grupos}
     asignaciones_sorteo = {}
+    bombos_slots = {g: [f"{g}{i}" for i in range(1, 5)] for g in grupos}
+    return grupos_dict, asignaciones_sorteo, bombos_slots
 
-    #Generamos los bombos de cada grupo (slots)
-    bombos_slots = {}
-    for grupo in grupos:
-        bombos_slots[grupo] = [f"{grupo}{i}" for i in range(1, 5)]
 
-    #Asignaciones de Anfitriones
-    anfitriones = {
-        "MEX": "A1",
-        "CAN": "B1",
-        "USA": "D1"
+def _asignar(grupos_dict, asignaciones_sorteo, bombos_slots, eq, grupo, slot, conf):
+    #Registra la asignación en las tres estructuras del sorteo
+    bombos_slots[grupo].remove(slot)
+    grupos_dict[grupo].append({
+        "codigo": eq,
+        "slot": slot,
+        "conf": conf
+    })
+    asignaciones_sorteo[eq] = {
+        "grupo": grupo,
+        "slot": slot,
+        "conf": conf
     }
 
-    for eq, slot in anfitriones.items():
-        conf = df_bombos.loc[df_bombos['codigo'] == eq, 'confederacion'].iloc[0]
-        grupo = slot[0]       # "A", "B", "D"
-        
-        asignaciones_sorteo[eq] = {
-            "grupo": grupo,
-            "slot": slot,
-            "conf": conf
-        }
-
-    #Retiramos las bolitas rojas de Anfitriones
-    bombos_slots['A'].remove("A1")
-    bombos_slots['B'].remove("B1")
-    bombos_slots['D'].remove("D1")
 
-    #Equipos restantes bombo 1
-    eq_restantes_bombo_1 = df_bombos[
-        (~df_bombos['codigo'].isin(['MEX', 'USA', 'CAN'])) &
-        (df_bombos['bombo'] == 1)
+def aplicar_evento(evento, grupos_dict, asignaciones_sorteo, bombos_slots):
+    """
+    Replica un `SlotSorteado` sobre otras estructuras del sorteo (p. ej. las que muestra la
+    UI mientras la lógica corre en otro hilo). El resto de eventos no cambia el estado.
+    """
+    if type(evento) is SlotSorteado:
+        _asignar(grupos_dict, asignaciones_sorteo, bombos_slots,
+                 evento.codigo, evento.grupo, evento.slot, evento.conf)
+
+
+def _instrumentado(n_bombo, eventos):
+    #Mide sólo el cómputo de cada paso (no el tiempo que el consumidor tarda en pedir el siguiente)
+    while True:
+        if ESTADISTICAS.get() is None:
+            evento = next(eventos, None)
+        else:
+            with _medir_bombo(n_bombo):
+                evento = next(eventos, None)
+        if evento is None:
+            return
+        yield evento
+
+
+def eventos_bombo_1(df_bombos, grupos_dict, asignaciones_sorteo, bombos_slots, rng=None, reglas=None):
+    """
+    Sortea el bombo 1 emitiendo un evento por paso. Modifica en el lugar las estructuras
+    recibidas (ver `nuevo_sorteo`): cuando se emite `SlotSorteado` la asignación ya está hecha.
+    Con `reglas` (ver `restricciones`) los cabezas de serie también pasan validación y lookahead.
+    """
+    return _instrumentado(1, _eventos_bombo_1(df_bombos, grupos_dict, asignaciones_sorteo,
+                                              bombos_slots, rng or random, reglas))
+
+
+def _eventos_bombo_1(df_bombos, grupos_dict, asignaciones_sorteo, bombos_slots, rng, reglas=None):
+    tabla = _tabla_de(df_bombos)
+
+    #Asignaciones de Anfitriones (retiramos sus bolitas rojas del bombo de grupos)
+    for eq, slot in ANFITRIONES.items():
+        conf = tabla.conf_de(eq)
+        grupo = slot[0]       # "A", "B", "D"
+        _asignar(grupos_dict, asignaciones_sorteo, bombos_slots, eq, grupo, slot, conf)
+        yield GrupoAsignado(1, eq, grupo)
+        yield SlotSorteado(1, eq, grupo, slot, conf)
+
+    #Con reglas, cada bola va al primer grupo abierto que las cumpla (como en los bombos 2-4);
+    #con los cupos FIFA es el mismo resultado que recorrer los grupos en orden
+    if reglas is not None:
+        yield from _eventos_bombo_n(1, df_bombos, bombos_slots, grupos_dict, asignaciones_sorteo, rng, reglas)
+        return
+
+    #Equipos restantes bombo 1 (ids enteros)
+    eq_restantes_bombo_1 = [
+        e for e in tabla.ids_bombo(1)
+        if tabla.codigos[e] not in ANFITRIONES
     ]
 
-    print("----BOMBO 1: CABEZAS DE GRUPO----")
-
     for grupo in bombos_slots.keys():
         if grupo not in ('A', 'B', 'D'):
-            # Selecciona equipo
-            eq_sorteado = eq_restantes_bombo_1['codigo'].sample(1).iloc[0]  # Bolita país
-            fila_eq = eq_restantes_bombo_1[eq_restantes_bombo_1['codigo'] == eq_sorteado].iloc[0]
-            conf = fila_eq['confederacion']  # Ajusta nombre si es distinto
-
-            # Quitamos bolita del bombo de países
-            eq_restantes_bombo_1 = eq_restantes_bombo_1[eq_restantes_bombo_1['codigo'] != eq_sorteado]
+            # Selecciona equipo y quitamos bolita del bombo de países
+            eq_id = eq_restantes_bombo_1.pop(rng.randrange(len(eq_restantes_bombo_1)))  # Bolita país
+            eq_sorteado = tabla.codigos[eq_id]
+            conf = CONFEDERACIONES[tabla.conf[eq_id]]
+            yield BolaSorteada(1, eq_sorteado, conf)
 
-            # Asignamos grupo y slot
+            # Asignamos grupo y slot (el slot 1 del grupo)
             slot = grupo + "1"
-            asignaciones_sorteo[eq_sorteado] = {
-                "grupo": grupo,
-                "slot": slot,
-                "conf": conf
-            }
-
-            # Quitamos slot del bombo de grupos
-            bombos_slots[grupo].remove(slot)
+            _asignar(grupos_dict, asignaciones_sorteo, bombos_slots, eq_sorteado, grupo, slot, conf)
+            yield GrupoAsignado(1, eq_sorteado, grupo)
+            yield SlotSorteado(1, eq_sorteado, grupo, slot, conf)
 
-            print(f"{eq_sorteado} ({conf}) cabeza de Grupo {grupo} -> slot {slot}")
-
-    grupos_dict = {g: [] for g in grupos}
-
-    for equipo, info in asignaciones_sorteo.items():
-        grupos_dict[info["grupo"]].append({
-            "codigo": equipo,
-            "slot": info["slot"],
-            "conf": info["conf"]
-        })
-
-    return grupos_dict, asignaciones_sorteo, bombos_slots
 
+def eventos_bombo_n(n_bombo, df_bombos, bombos_slots, grupos_dict, asignaciones_sorteo, rng=None,
+                    reglas=None):
+    """
+    Sortea el bombo `n_bombo` (2-4) emitiendo un evento por paso: `BolaSorteada`,
+    `GrupoRechazado` por cada grupo descartado, `GrupoAsignado` y `SlotSorteado`.
+    Modifica en el lugar las estructuras recibidas. `reglas` (ver `restricciones`)
+    reemplaza los cupos fijos de confederación.
+    """
+    return _instrumentado(n_bombo, _eventos_bombo_n(n_bombo, df_bombos, bombos_slots, grupos_dict,
+                                                    asignaciones_sorteo, rng or random, reglas))
 
-def sortear_bombo_n(n_bombo,
-                    df_bombos,
-                    bombos_slots,
-                    grupos_dict,
-                    asignaciones_sorteo): 
 
-    print(f"----BOMBO {n_bombo}----")
+def _eventos_bombo_n(n_bombo, df_bombos, bombos_slots, grupos_dict, asignaciones_sorteo, rng, reglas=None):
+    tabla = _tabla_de(df_bombos)
+    estado = EstadoSorteo.desde_grupos_dict(tabla, grupos_dict)
+    if reglas is not None:
+        reglas = compilar(reglas, tabla)
 
     grupos = list(bombos_slots.keys())  # A→L
 
-    eq_bombo = df_bombos[df_bombos['bombo'] == n_bombo].copy()
+    #Sin los ya colocados (los anfitriones en el bombo 1)
+    eq_bombo = [e for e in tabla.ids_bombo(n_bombo) if estado.grupo_de[e] < 0]
 
     for _ in grupos:
-        if eq_bombo.empty:
+        if not eq_bombo:
             break
-        
-        # Sacamos un equipo del bombo 2
-        eq_sorteado = eq_bombo['codigo'].sample(1).iloc[0]
-        eq_bombo = eq_bombo[eq_bombo['codigo'] != eq_sorteado]
+
+        # Sacamos un equipo del bombo
+        eq_id = eq_bombo.pop(rng.randrange(len(eq_bombo)))
+        eq_sorteado = tabla.codigos[eq_id]
+        conf_sorteado = CONFEDERACIONES[tabla.conf[eq_id]]
+        yield BolaSorteada(n_bombo, eq_sorteado, conf_sorteado)
 
         grupo_asignado = None
 
         for g in grupos:
+            g_idx = IDX_GRUPO[g]
 
             #1) Máximo de equipos por grupo en este bombo
-            if len(grupos_dict[g]) >= n_bombo:
+            if estado.tamano[g_idx] >= n_bombo:
                 continue
 
             #2) Constraint confederaciones
-            if not checker_validez_grupo(g, eq_sorteado, grupos_dict):
+            est = ESTADISTICAS.get()
+            if est is not None:
+                est.validaciones += 1
+            if reglas is None:
+                if not estado.valido(g_idx, eq_id):
+                    if est is not None:
+                        est.rechazos[eq_sorteado] += 1
+                    yield GrupoRechazado(n_bombo, eq_sorteado, g, 'confederacion', _motivo_rechazo(conf_sorteado))
+                    continue
+            elif not reglas.valido(estado, g_idx, eq_id):
+                if est is not None:
+                    est.rechazos[eq_sorteado] += 1
+                yield GrupoRechazado(n_bombo, eq_sorteado, g, *reglas.motivo(estado, g_idx, eq_id))
                 continue
 
             #3) Lookahead - ¿Ponerlo aquí ahorca los grupos para los restantes?
-            if not lookahead(
-                grupo_target=g,
-                equipo_actual=eq_sorteado,
-                equipos_restantes=list(eq_bombo['codigo']),
-                grupos_dict=grupos_dict,
-                bombos_slots=bombos_slots,
-                numero_de_bombo=n_bombo
-            ):
-                print(f"Lookahead: {eq_sorteado} NO puede ir en grupo {g}, causaría dead-end. Reasignando...")
+            if not lookahead_estado(estado, g_idx, eq_id, eq_bombo, n_bombo, reglas=reglas):
+                if est is not None:
+                    est.rechazos[eq_sorteado] += 1
+                yield GrupoRechazado(
+                    n_bombo, eq_sorteado, g, 'lookahead',
+                    f"Lookahead: {eq_sorteado} NO puede ir en grupo {g}, causaría dead-end. Reasignando..."
+                )
                 continue
 
             #4) Si pasa todo -> este es su grupo
@@ -192,26 +405,105 @@ def sortear_bombo_n(n_bombo,
 
         if grupo_asignado is None:
             raise ValueError(f"No hay grupo válido para {eq_sorteado}. Revisa constraints!")
-        
+        yield GrupoAsignado(n_bombo, eq_sorteado, grupo_asignado)
+
         #----Asignación Real----
-        slot_sorteado = random.choice(bombos_slots[grupo_asignado])
-        bombos_slots[grupo_asignado].remove(slot_sorteado)
+        #En el bombo 1 el slot es siempre el 1 (sin bola de slot)
+        slot_sorteado = grupo_asignado + "1" if n_bombo == 1 else rng.choice(bombos_slots[grupo_asignado])
+        estado.colocar(eq_id, IDX_GRUPO[grupo_asignado], int(slot_sorteado[1:]))
+        _asignar(grupos_dict, asignaciones_sorteo, bombos_slots,
+                 eq_sorteado, grupo_asignado, slot_sorteado, conf_sorteado)
+        yield SlotSorteado(n_bombo, eq_sorteado, grupo_asignado, slot_sorteado, conf_sorteado)
+
+
+def eventos_sorteo(df_bombos, rng=None, estructuras=None, reglas=None):
+    """
+    Sorteo completo como flujo de eventos: `BomboIniciado` y los eventos de cada bombo.
+    `estructuras` son las `(grupos_dict, asignaciones_sorteo, bombos_slots)` a rellenar
+    (por defecto unas nuevas de `nuevo_sorteo`).
+    """
+    grupos_dict, asignaciones_sorteo, bombos_slots = estructuras or nuevo_sorteo()
+    if reglas is not None:
+        reglas = compilar(reglas, _tabla_de(df_bombos))
+    yield BomboIniciado(1)
+    yield from eventos_bombo_1(df_bombos, grupos_dict, asignaciones_sorteo, bombos_slots, rng, reglas)
+    for n_bombo in range(2, 5):
+        yield BomboIniciado(n_bombo)
+        yield from eventos_bombo_n(n_bombo, df_bombos, bombos_slots, grupos_dict, asignaciones_sorteo, rng,
+                                   reglas)
+
+
+def sortear_bombo_1(df_bombos, verbose=True, rng=None, reglas=None):
+    grupos_dict, asignaciones_sorteo, bombos_slots = nuevo_sorteo()
+
+    if verbose:
+        print("----BOMBO 1: CABEZAS DE GRUPO----")
+
+    for evento in eventos_bombo_1(df_bombos, grupos_dict, asignaciones_sorteo, bombos_slots, rng, reglas):
+        if verbose and type(evento) is SlotSorteado and evento.codigo not in ANFITRIONES:
+            print(f"{evento.codigo} ({evento.conf}) cabeza de Grupo {evento.grupo} -> slot {evento.slot}")
+
+    return grupos_dict, asignaciones_sorteo, bombos_slots
 
-        conf_sorteado = df_bombos.loc[df_bombos['codigo'] == eq_sorteado, 'confederacion'].iloc[0]
 
-        grupos_dict[grupo_asignado].append({
-            "codigo": eq_sorteado,
-            "slot": slot_sorteado,
-            "conf": conf_sorteado
-        })
+def sortear_bombo_n(n_bombo,
+                    df_bombos,
+                    bombos_slots,
+                    grupos_dict,
+                    asignaciones_sorteo,
+                    verbose=True,
+                    rng=None,
+                    reglas=None):
+
+    if verbose:
+        print(f"----BOMBO {n_bombo}----")
+
+    for evento in eventos_bombo_n(n_bombo, df_bombos, bombos_slots, grupos_dict, asignaciones_sorteo, rng,
+                                  reglas):
+        if not verbose:
+            continue
+        if type(evento) is GrupoRechazado:
+            print(evento.mensaje)
+        elif type(evento) is SlotSorteado:
+            print(f"{evento.codigo} → Grupo {evento.grupo}, slot {evento.slot}")
+
+    return grupos_dict, asignaciones_sorteo, bombos_slots
 
-        asignaciones_sorteo[eq_sorteado] = {
-            "grupo": grupo_asignado,
-            "slot": slot_sorteado,
-            "conf": conf_sorteado
-        }
 
-        print(f"{eq_sorteado} → Grupo {grupo_asignado}, slot {slot_sorteado}")
+def sortear_completo(df_bombos, verbose=True, rng=None, reglas=None):
+    #Bombo 1 y después bombos 2, 3 y 4 sobre el mismo estado (reglas compiladas una sola vez)
+    if reglas is not None:
+        reglas = compilar(reglas, _tabla_de(df_bombos))
+    grupos_dict, asignaciones_sorteo, bombos_slots = sortear_bombo_1(df_bombos, verbose=verbose, rng=rng,
+                                                                     reglas=reglas)
+
+    for n_bombo in range(2, 5):
+        grupos_dict, asignaciones_sorteo, bombos_slots = sortear_bombo_n(
+            n_bombo,
+            df_bombos,
+            bombos_slots,
+            grupos_dict,
+            asignaciones_sorteo,
+            verbose=verbose,
+            rng=rng,
+            reglas=reglas
+        )
 
     return grupos_dict, asignaciones_sorteo, bombos_slots
 
+
+def sortear_reproducible(semilla, indice, sortear_repechajes=False, verbose=False):
+    """
+    Sorteo número `indice` de la semilla maestra `semilla`: siempre el mismo resultado,
+    sin depender del estado global de `random` ni de los sorteos anteriores.
+
+    Con `sortear_repechajes=True` los ganadores de repechaje también salen del índice;
+    si no, se usan los bombos del módulo (`df_bombos`).
+    """
+    if sortear_repechajes:
+        df = asignar_bombos(df_clasificados,
+                            random_state=generador_sorteo(semilla, indice, FLUJO_REPECHAJES))
+    else:
+        df = df_bombos
+
+    return sortear_completo(df, verbose=verbose, rng=random_sorteo(semilla, indice))
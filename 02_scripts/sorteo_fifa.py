@@ -8,17 +8,27 @@ para garantizar que se cumplan todas las restricciones geográficas y de bombos.
 Características principales:
 - Interfaz reactiva y visualmente atractiva.
 - Simulación asíncrona para permitir animaciones sin bloquear el servidor.
-- Visualización de banderas de países mediante FlagCDN.
+- Cálculo del sorteo en un pool de workers compartido, fuera del event loop.
+- Reserva de sorteos precalculados en segundo plano: el botón sólo reproduce la animación.
+- Modo transmisión: un sorteo del presentador (/presentador) visto en vivo por muchos espectadores (/transmision).
+- Visualización de banderas de países desde un bundle CSS local (FlagCDN si no se construyó).
 - Registro en tiempo real de los eventos del sorteo.
 """
 import asyncio
+import hmac
+import os
 import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import string
+from collections import deque
 import pandas as pd
-from nicegui import ui, app
+from nicegui import ui, app, background_tasks, Client
 from simular_bombos import df_bombos
-from simular_sorteo_func import sortear_bombo_1, sortear_bombo_n
-import copy
+from banderas import FIFA_TO_ISO, RUTA_CSS, clase_bandera, version_css
+from simular_sorteo_func import (eventos_bombo_1, eventos_bombo_n, EstadisticasSorteo, instrumentar,
+                                 GrupoRechazado, SlotSorteado, aplicar_evento, nuevo_sorteo)
 
 # --- Configuración y Estilos ---
 # Definimos estilos CSS en línea para mantener el código autocontenido y facilitar la personalización.
@@ -26,38 +36,169 @@ HEADER_STYLE = "font-size: 2em; font-weight: bold; color: #1976D2; text-align: c
 CARD_STYLE = "min-width: 220px; min-height: 260px; background-color: #f5f5f5; border-radius: 10px; padding: 10px; transition: all 0.3s ease;"
 SLOT_STYLE = "padding: 4px; margin: 2px; border-bottom: 1px solid #ddd; font-size: 0.9em; width: 100%;"
 HIGHLIGHT_STYLE = "background-color: #fff59d; transform: scale(1.05);"
+MAX_LOG_LINES = 50  # Mensajes que conserva el registro del sorteo
 
-# --- Datos y Mapeos ---
-# Diccionario para mapear códigos FIFA (3 letras) a códigos ISO (2 letras) para obtener las banderas.
-# Esto es necesario porque FlagCDN utiliza códigos ISO.
-FIFA_TO_ISO = {
-    'AFG': 'af', 'ALB': 'al', 'ALG': 'dz', 'ASA': 'as', 'AND': 'ad', 'ANG': 'ao', 'AIA': 'ai', 'ATG': 'ag',
-    'ARG': 'ar', 'ARM': 'am', 'ARU': 'aw', 'AUS': 'au', 'AUT': 'at', 'AZE': 'az', 'BAH': 'bs', 'BHR': 'bh',
-    'BAN': 'bd', 'BRB': 'bb', 'BLR': 'by', 'BEL': 'be', 'BLZ': 'bz', 'BEN': 'bj', 'BER': 'bm', 'BHU': 'bt',
-    'BOL': 'bo', 'BIH': 'ba', 'BOT': 'bw', 'BRA': 'br', 'VGB': 'vg', 'BRU': 'bn', 'BUL': 'bg', 'BFA': 'bf',
-    'BDI': 'bi', 'CAM': 'kh', 'CMR': 'cm', 'CAN': 'ca', 'CPV': 'cv', 'CAY': 'ky', 'CTA': 'cf', 'CHA': 'td',
-    'CHI': 'cl', 'CHN': 'cn', 'TPE': 'tw', 'COL': 'co', 'COM': 'km', 'CGO': 'cg', 'COK': 'ck', 'CRC': 'cr',
-    'CRO': 'hr', 'CUB': 'cu', 'CUW': 'cw', 'CYP': 'cy', 'CZE': 'cz', 'DEN': 'dk', 'DJI': 'dj', 'DMA': 'dm',
-    'DOM': 'do', 'COD': 'cd', 'ECU': 'ec', 'EGY': 'eg', 'SLV': 'sv', 'ENG': 'gb-eng', 'EQG': 'gq', 'ERI': 'er',
-    'EST': 'ee', 'ETH': 'et', 'FRO': 'fo', 'FIJ': 'fj', 'FIN': 'fi', 'FRA': 'fr', 'GAB': 'ga', 'GAM': 'gm',
-    'GEO': 'ge', 'GER': 'de', 'GHA': 'gh', 'GIB': 'gi', 'GRE': 'gr', 'GRN': 'gd', 'GUM': 'gu', 'GUA': 'gt',
-    'GUI': 'gn', 'GNB': 'gw', 'GUY': 'gy', 'HAI': 'ht', 'HON': 'hn', 'HKG': 'hk', 'HUN': 'hu', 'ISL': 'is',
-    'IND': 'in', 'IDN': 'id', 'IRN': 'ir', 'IRQ': 'iq', 'ISR': 'il', 'ITA': 'it', 'CIV': 'ci', 'JAM': 'jm',
-    'JPN': 'jp', 'JOR': 'jo', 'KAZ': 'kz', 'KEN': 'ke', 'PRK': 'kp', 'KOR': 'kr', 'KUW': 'kw', 'KGZ': 'kg',
-    'LAO': 'la', 'LVA': 'lv', 'LBN': 'lb', 'LES': 'ls', 'LBR': 'lr', 'LBY': 'ly', 'LIE': 'li', 'LTU': 'lt',
-    'LUX': 'lu', 'MAC': 'mo', 'MKD': 'mk', 'MAD': 'mg', 'MWI': 'mw', 'MAS': 'my', 'MDV': 'mv', 'MLI': 'ml',
-    'MLT': 'mt', 'MTN': 'mr', 'MRI': 'mu', 'MEX': 'mx', 'MDA': 'md', 'MNG': 'mn', 'MNE': 'me', 'MSR': 'ms',
-    'MAR': 'ma', 'MOZ': 'mz', 'MYA': 'mm', 'NAM': 'na', 'NEP': 'np', 'NED': 'nl', 'NCL': 'nc', 'NZL': 'nz',
-    'NCA': 'ni', 'NIG': 'ne', 'NGA': 'ng', 'NIR': 'gb-nir', 'NOR': 'no', 'OMA': 'om', 'PAK': 'pk', 'PLE': 'ps',
-    'PAN': 'pa', 'PNG': 'pg', 'PAR': 'py', 'PER': 'pe', 'PHI': 'ph', 'POL': 'pl', 'POR': 'pt', 'PUR': 'pr',
-    'QAT': 'qa', 'IRL': 'ie', 'ROU': 'ro', 'RUS': 'ru', 'RWA': 'rw', 'SKN': 'kn', 'LCA': 'lc', 'VIN': 'vc',
-    'SAM': 'ws', 'SMR': 'sm', 'STP': 'st', 'KSA': 'sa', 'SCO': 'gb-sct', 'SEN': 'sn', 'SRB': 'rs', 'SEY': 'sc',
-    'SLE': 'sl', 'SIN': 'sg', 'SVK': 'sk', 'SVN': 'si', 'SOL': 'sb', 'SOM': 'so', 'RSA': 'za', 'ESP': 'es',
-    'SRI': 'lk', 'SDN': 'sd', 'SUR': 'sr', 'SWE': 'se', 'SUI': 'ch', 'SYR': 'sy', 'TAH': 'pf', 'TJK': 'tj',
-    'TAN': 'tz', 'THA': 'th', 'TLS': 'tl', 'TOG': 'tg', 'TGA': 'to', 'TRI': 'tt', 'TUN': 'tn', 'TUR': 'tr',
-    'TKM': 'tm', 'TCA': 'tc', 'UGA': 'ug', 'UKR': 'ua', 'UAE': 'ae', 'USA': 'us', 'URU': 'uy', 'VIR': 'vi',
-    'UZB': 'uz', 'VAN': 'vu', 'VEN': 've', 'VIE': 'vn', 'WAL': 'gb-wls', 'YEM': 'ye', 'ZAM': 'zm', 'ZIM': 'zw'
-}
+# --- Banderas ---
+# Si existe el bundle local (`python 02_scripts/banderas.py`), las banderas son clases CSS de una
+# única hoja servida con caché larga y versionada por contenido: cero peticiones externas.
+# Sin bundle se usa FlagCDN como antes.
+BANDERAS_LOCALES = os.path.exists(RUTA_CSS)
+if BANDERAS_LOCALES:
+    URL_BANDERAS = app.add_static_file(local_file=RUTA_CSS, url_path=f"/assets/banderas-{version_css()}.css",
+                                       max_cache_age=365 * 24 * 3600)
+
+# --- Pool de Cómputo del Sorteo ---
+# La lógica del sorteo es síncrona y CPU-bound: se ejecuta en un pool compartido por todas las
+# sesiones para no bloquear el event loop. Configurable por variables de entorno:
+#   SORTEO_EXECUTOR = 'hilos' (por defecto) o 'procesos'
+#   SORTEO_WORKERS  = número de workers del pool
+#   SORTEO_TIMEOUT  = segundos máximos (cola + cálculo) por bombo antes de cancelar el sorteo
+SORTEO_EXECUTOR = os.environ.get('SORTEO_EXECUTOR', 'hilos')
+SORTEO_WORKERS = int(os.environ.get('SORTEO_WORKERS', min(4, os.cpu_count() or 1)))
+SORTEO_TIMEOUT = float(os.environ.get('SORTEO_TIMEOUT', 10))
+#   SORTEO_RESERVA  = sorteos completos precalculados en segundo plano (0 desactiva la reserva)
+SORTEO_RESERVA = int(os.environ.get('SORTEO_RESERVA', 8))
+#   SORTEO_MAX_SESIONES = sesiones de sorteo simultáneas; las páginas nuevas se rechazan al llegar al tope
+#   SORTEO_INACTIVIDAD  = segundos sin actividad tras los que se cierra una sesión
+SORTEO_MAX_SESIONES = int(os.environ.get('SORTEO_MAX_SESIONES', 200))
+SORTEO_INACTIVIDAD = float(os.environ.get('SORTEO_INACTIVIDAD', 1800))
+
+_pool = None
+
+
+def get_pool():
+    """Devuelve el pool compartido, creándolo en el primer uso."""
+    global _pool
+    if _pool is None:
+        if SORTEO_EXECUTOR == 'procesos':
+            _pool = ProcessPoolExecutor(max_workers=SORTEO_WORKERS)
+        else:
+            _pool = ThreadPoolExecutor(max_workers=SORTEO_WORKERS, thread_name_prefix='sorteo')
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def compute_pot(n, logica, estadisticas):
+    """
+    Worker: sortea el bombo `n` sobre las estructuras `logica` = (grupos_dict, asignaciones,
+    bombos_slots) y devuelve `(eventos, logica, estadisticas)`. Con hilos se modifican los
+    mismos objetos; con procesos viajan copias y se devuelven actualizadas.
+    """
+    grupos_dict, asignaciones, bombos_slots = logica
+    # Generador propio por llamada: los procesos hijos heredan el estado de `random` del padre
+    rng = random.Random()
+    with instrumentar(estadisticas):
+        if n == 1:
+            eventos = list(eventos_bombo_1(df_bombos, grupos_dict, asignaciones, bombos_slots, rng))
+        else:
+            eventos = list(eventos_bombo_n(n, df_bombos, bombos_slots, grupos_dict, asignaciones, rng))
+    return eventos, logica, estadisticas
+
+
+def compute_draw():
+    """
+    Worker: sortea los 4 bombos de un sorteo nuevo y devuelve `(eventos_por_bombo, estadisticas)`,
+    con `eventos_por_bombo[n - 1]` = eventos del bombo n.
+    """
+    logica = nuevo_sorteo()
+    estadisticas = EstadisticasSorteo()
+    eventos_por_bombo = []
+    for n in range(1, 5):
+        eventos, logica, estadisticas = compute_pot(n, logica, estadisticas)
+        eventos_por_bombo.append(eventos)
+    return eventos_por_bombo, estadisticas
+
+
+class SorteoReserva:
+    """
+    Reserva de sorteos completos ya calculados, compartida por todas las sesiones.
+
+    Una tarea en segundo plano la mantiene llena hasta `profundidad` sorteos, calculándolos de
+    a uno en el pool de cómputo. `start_simulation` toma uno listo (acierto) y sólo reproduce la
+    animación; si la reserva está vacía (fallo) se calcula bombo a bombo como antes.
+    """
+    def __init__(self, profundidad):
+        self.profundidad = profundidad
+        self.sorteos = deque()
+        self.aciertos = 0
+        self.fallos = 0
+        self.generados = 0
+        self.errores = 0
+        self._hay_hueco = None  # asyncio.Event, se crea dentro del event loop
+        self._tarea = None
+
+    def tomar(self):
+        """Devuelve un sorteo precalculado `(eventos_por_bombo, estadisticas)` o None si no hay."""
+        if self.sorteos:
+            self.aciertos += 1
+            sorteo = self.sorteos.popleft()
+        else:
+            self.fallos += 1
+            sorteo = None
+        if self._hay_hueco is not None:
+            self._hay_hueco.set()
+        return sorteo
+
+    async def _rellenar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if len(self.sorteos) >= self.profundidad:
+                self._hay_hueco.clear()
+                await self._hay_hueco.wait()
+                continue
+            try:
+                sorteo = await loop.run_in_executor(get_pool(), compute_draw)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                #Pool caído o error de lógica: se reintenta sin saturar el pool
+                self.errores += 1
+                await asyncio.sleep(1)
+                continue
+            self.sorteos.append(sorteo)
+            self.generados += 1
+
+    def iniciar(self):
+        if self.profundidad > 0 and self._tarea is None:
+            self._hay_hueco = asyncio.Event()
+            self._tarea = background_tasks.create(self._rellenar(), name='reserva_sorteos')
+
+    def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            self._tarea = None
+
+    def metricas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'profundidad': self.profundidad,
+            'disponibles': len(self.sorteos),
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else None,
+            'generados': self.generados,
+            'errores': self.errores,
+        }
+
+
+reserva = SorteoReserva(SORTEO_RESERVA)
+
+
+@app.get('/metricas/reserva')
+def metricas_reserva():
+    """Aciertos/fallos y ocupación de la reserva de sorteos precalculados."""
+    return reserva.metricas()
+
+
+app.on_startup(reserva.iniciar)
+app.on_shutdown(reserva.detener)
+app.on_shutdown(shutdown_pool)
 
 # --- Clase de Gestión de Estado ---
 class SorteoManager:
@@ -70,6 +211,7 @@ class SorteoManager:
     """
     def __init__(self):
         self.reset()
+        self.last_activity = time.monotonic()
 
     def reset(self):
         """Reinicia el estado a los valores iniciales para un nuevo sorteo."""
@@ -80,92 +222,452 @@ class SorteoManager:
         self.asignaciones = {}
         self.current_bombo = 1
         self.processing = False  # Flag para evitar múltiples ejecuciones simultáneas
-        self.logs = []
+        self.logs = deque(maxlen=MAX_LOG_LINES)  # Buffer circular: descarta los mensajes más antiguos
         self.finished = False
+        self.estadisticas = EstadisticasSorteo()  # Contadores y tiempos de la lógica del sorteo
+        # Estructuras sobre las que trabaja el worker del pool (la UI anima las suyas propias)
+        self.logica = nuevo_sorteo()
 
     def log(self, message):
         """Agrega un mensaje al registro de eventos."""
         self.logs.append(message)
-        if len(self.logs) > 50:  # Mantenemos solo los últimos 50 mensajes
-            self.logs.pop(0)
+
+    def touch(self):
+        """Marca actividad en la sesión (la protege del desalojo por inactividad)."""
+        self.last_activity = time.monotonic()
+
+
+def _tamano_profundo(obj, vistos=None):
+    """Bytes aproximados de `obj` y de todo lo que contiene (dicts, listas, tuplas, deques, atributos)."""
+    if vistos is None:
+        vistos = set()
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+    tamano = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        tamano += sum(_tamano_profundo(k, vistos) + _tamano_profundo(v, vistos) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        tamano += sum(_tamano_profundo(x, vistos) for x in obj)
+    elif hasattr(obj, '__dict__'):
+        tamano += _tamano_profundo(vars(obj), vistos)
+    elif hasattr(obj, '__slots__'):
+        tamano += sum(_tamano_profundo(getattr(obj, a), vistos) for a in obj.__slots__ if hasattr(obj, a))
+    return tamano
+
+
+class RegistroSesiones:
+    """
+    Registro de las sesiones de sorteo vivas (un `SorteoManager` por pestaña).
+
+    Limita las sesiones simultáneas a `maximo` y desaloja las que llevan más de `inactividad`
+    segundos sin actividad y sin un sorteo en curso: se liberan su estado y sus elementos de UI y,
+    si la pestaña sigue conectada, se le deja un aviso para recargar.
+    """
+    def __init__(self, maximo, inactividad):
+        self.maximo = maximo
+        self.inactividad = inactividad
+        self.sesiones = {}  # client.id -> (client, state)
+        self.rechazadas = 0
+        self.desalojadas = 0
+        self._tarea = None
+
+    def registrar(self, client, state):
+        """Registra la sesión de `client`. Devuelve False si se alcanzó el tope (aun tras desalojar)."""
+        if len(self.sesiones) >= self.maximo:
+            self.desalojar_inactivas()
+        if len(self.sesiones) >= self.maximo:
+            self.rechazadas += 1
+            return False
+        self.sesiones[client.id] = (client, state)
+        client.on_delete(lambda: self.quitar(client.id))
+        return True
+
+    def quitar(self, client_id):
+        self.sesiones.pop(client_id, None)
+
+    def desalojar_inactivas(self):
+        ahora = time.monotonic()
+        inactivas = [(client, state) for client, state in self.sesiones.values()
+                     if not state.processing and ahora - state.last_activity > self.inactividad]
+        for client, state in inactivas:
+            self.quitar(client.id)
+            self.desalojadas += 1
+            if client.has_socket_connection:
+                #Se vacía la página (grid, refs, registro) y queda sólo el aviso
+                client.content.clear()
+                with client.content:
+                    ui.label("Sesión cerrada por inactividad.").style(HEADER_STYLE)
+                    ui.button('Recargar', on_click=lambda: ui.navigate.reload()).props('color=primary icon=refresh')
+            else:
+                client.delete()
+        return len(inactivas)
+
+    async def _barrer(self):
+        while True:
+            await asyncio.sleep(min(60, max(1, self.inactividad / 4)))
+            self.desalojar_inactivas()
+
+    def iniciar(self):
+        if self._tarea is None:
+            self._tarea = background_tasks.create(self._barrer(), name='registro_sesiones')
+
+    def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            self._tarea = None
+
+    def metricas(self):
+        ahora = time.monotonic()
+        sesiones = [{
+            'id': client_id,
+            'elementos': len(client.elements),
+            'bytes_estado': _tamano_profundo(state),
+            'inactiva_s': round(ahora - state.last_activity, 1),
+            'procesando': state.processing,
+        } for client_id, (client, state) in self.sesiones.items()]
+        return {
+            'sesiones': len(sesiones),
+            'maximo': self.maximo,
+            'inactividad_s': self.inactividad,
+            'elementos_total': sum(x['elementos'] for x in sesiones),
+            'bytes_estado_total': sum(x['bytes_estado'] for x in sesiones),
+            'rechazadas': self.rechazadas,
+            'desalojadas': self.desalojadas,
+            'detalle': sesiones,
+        }
+
+
+registro = RegistroSesiones(SORTEO_MAX_SESIONES, SORTEO_INACTIVIDAD)
+
+
+@app.get('/metricas/sesiones')
+def metricas_sesiones():
+    """Sesiones vivas con sus elementos de UI y memoria de estado, más rechazos y desalojos."""
+    return registro.metricas()
+
+
+app.on_startup(registro.iniciar)
+app.on_shutdown(registro.detener)
+
+# --- Componentes de UI reutilizables ---
+def update_slot_ui(refs, team_data):
+    """
+    Actualiza los elementos de un único slot (`refs` = ui_refs[grupo][slot_idx]) con el
+    equipo `team_data` ({'codigo', 'conf'}) o lo deja vacío si es None.
+    """
+    if team_data:
+        code = team_data['codigo']
+        iso = FIFA_TO_ISO.get(code, '').lower()
+        
+        # Actualizar Bandera
+        if iso:
+            if BANDERAS_LOCALES:
+                refs['flag'].classes(replace=f"bandera {clase_bandera(code)}")
+            else:
+                refs['flag'].set_source(f"https://flagcdn.com/h24/{iso}.png")
+            refs['flag'].style("display: block;")
+            refs['placeholder'].style("display: none;")
+        else:
+            # Si no hay ISO (ej: placeholder), mostramos icono
+            refs['flag'].style("display: none;")
+            refs['placeholder'].style("display: block;")
+        
+        # Actualizar Textos
+        refs['code'].set_text(code)
+        refs['code'].style("color: #000; font-weight: bold;")
+        refs['conf'].set_text(f"({team_data['conf']})")
+    else:
+        # Slot vacío
+        refs['flag'].style("display: none;")
+        refs['placeholder'].style("display: block; color: #ccc;") # Icono gris tenue
+        
+        refs['code'].set_text("---")
+        refs['code'].style("color: #aaa; font-weight: normal;")
+        refs['conf'].set_text("")
+
+
+def update_groups_ui(state, ui_refs):
+    """
+    Actualiza la visualización de todos los grupos modificando los elementos existentes.
+    Evita el parpadeo al no destruir/recrear el DOM. Durante el sorteo se usa `update_slot_ui`
+    sobre el slot que cambia; este refresco completo sólo hace falta al reiniciar.
+    """
+    for g in state.grupos:
+        # Mapeamos los equipos a sus slots (1, 2, 3, 4)
+        slot_map = {int(t['slot'][-1]): t for t in state.grupos_dict[g]}
+        
+        # Actualizamos los 4 slots del grupo
+        for i in range(1, 5):
+            update_slot_ui(ui_refs[g][i], slot_map.get(i))
+
+
+def build_groups_grid(state):
+    """
+    Construye el grid de tarjetas de grupo con sus 4 slots vacíos en el contexto UI actual.
+
+    Devuelve `(group_cards, ui_refs)`: la tarjeta de cada grupo y los elementos de cada slot,
+    con estructura `ui_refs[grupo][slot_idx] = {'flag', 'code', 'conf', 'placeholder'}`.
+    """
+    group_cards = {}
+    ui_refs = {}
+    with ui.grid(columns=4).classes('w-full q-pa-md gap-4').style("max-width: 1400px;"):
+        for g in state.grupos:
+            ui_refs[g] = {} # Inicializar diccionario para este grupo
+            with ui.card().style(CARD_STYLE) as card:
+                group_cards[g] = card
+                ui.label(f"Grupo {g}").style("font-weight: bold; font-size: 1.2em; color: #333; margin-bottom: 5px;")
+                
+                # Crear los 4 slots vacíos inicialmente
+                for i in range(1, 5):
+                    ui_refs[g][i] = {}
+                    with ui.row().classes('items-center no-wrap').style(SLOT_STYLE):
+                        # Etiqueta del Slot (Estática)
+                        ui.label(f"{g}{i}").style("font-weight: bold; margin-right: 6px; min-width: 25px; color: #555;")
+                        
+                        # Placeholder (Bandera gris)
+                        placeholder = ui.icon('flag', size='xs').style("margin-right: 8px; color: #ccc;")
+                        ui_refs[g][i]['placeholder'] = placeholder
+                        
+                        # Bandera (Oculta inicialmente): clase del bundle local o imagen de FlagCDN
+                        if BANDERAS_LOCALES:
+                            flag_img = ui.element('span').classes('bandera').style("display: none;")
+                        else:
+                            flag_img = ui.image().style("width: 24px; height: auto; margin-right: 8px; border-radius: 2px; box-shadow: 0 1px 2px rgba(0,0,0,0.2); display: none;")
+                        ui_refs[g][i]['flag'] = flag_img
+                        
+                        # Código de País
+                        code_lbl = ui.label("---").style("color: #aaa; margin-right: 4px;")
+                        ui_refs[g][i]['code'] = code_lbl
+                        
+                        # Confederación
+                        conf_lbl = ui.label("").style("font-size: 0.8em; color: #666;")
+                        ui_refs[g][i]['conf'] = conf_lbl
+
+    return group_cards, ui_refs
+
+
+# --- Modo Transmisión ---
+# Un único sorteo en el servidor (lo inicia el presentador en /presentador) cuyos eventos se
+# reparten a todos los espectadores de /transmision. Se calcula una sola vez; cada espectador sólo
+# recibe los cambios de su slot y la línea de registro. Quien entra tarde recibe una foto del
+# estado (grupos completos + últimas líneas del registro) y después los eventos en vivo.
+#   SORTEO_CLAVE_PRESENTADOR = si se define, /presentador exige ?clave=<valor>
+SORTEO_CLAVE_PRESENTADOR = os.environ.get('SORTEO_CLAVE_PRESENTADOR')
+
+
+class Transmision:
+    """
+    Sorteo autoritativo del modo transmisión y sus espectadores suscritos.
+
+    `espectadores` guarda por cliente las referencias de su vista (`group_cards`, `ui_refs`,
+    `log_view`); todos los eventos se aplican primero a `state` y después se reparten.
+    """
+    def __init__(self):
+        self.state = SorteoManager()
+        self.espectadores = {}  # client.id -> vista
+
+    def suscribir(self, client, vista):
+        """Suscribe la vista de `client` y le envía la foto del sorteo hasta ahora."""
+        self.espectadores[client.id] = vista
+        client.on_delete(lambda: self.espectadores.pop(client.id, None))
+        update_groups_ui(self.state, vista['ui_refs'])
+        for message in self.state.logs:
+            vista['log_view'].push(message)
+
+    def _log(self, message):
+        self.state.log(message)
+        for vista in list(self.espectadores.values()):
+            vista['log_view'].push(message)
+
+    async def _resaltar(self, grupo):
+        vistas = list(self.espectadores.values())
+        for vista in vistas:
+            vista['group_cards'][grupo].style(HIGHLIGHT_STYLE)
+        await asyncio.sleep(0.2)
+        for vista in vistas:
+            vista['group_cards'][grupo].style(CARD_STYLE)
+
+    async def _animar(self, n, eventos):
+        pausa, etiqueta = (0.2, "ASIGNADO") if n == 1 else (0.5, "SORTEADO")
+        self._log(f"--- INICIANDO BOMBO {n} ---")
+        for evento in eventos:
+            if isinstance(evento, GrupoRechazado):
+                self._log(evento.mensaje)
+            elif isinstance(evento, SlotSorteado):
+                await asyncio.sleep(pausa)
+                aplicar_evento(evento, self.state.grupos_dict, self.state.asignaciones, self.state.bombos_slots)
+                self._log(f"{etiqueta}: {evento.codigo} -> Grupo {evento.grupo} ({evento.slot})")
+                slot_idx = int(evento.slot[1:])
+                for vista in list(self.espectadores.values()):
+                    update_slot_ui(vista['ui_refs'][evento.grupo][slot_idx], evento._asdict())
+                await self._resaltar(evento.grupo)
+
+    def _cancelar(self, mensaje):
+        """Vacía el tablero (también la foto que recibe quien entra tarde) y avisa a los espectadores."""
+        self.state.reset()
+        for vista in list(self.espectadores.values()):
+            update_groups_ui(self.state, vista['ui_refs'])
+            vista['log_view'].clear()
+        self._log(mensaje)
+
+    async def sortear(self):
+        """
+        Calcula un sorteo completo (de la reserva o en el pool) y lo anima para todos los
+        espectadores. Devuelve 'finalizado', 'en_curso' (ya había uno), 'ocupado' (el cálculo
+        superó el tiempo límite) o 'error'; en los dos últimos casos el tablero queda vacío.
+        """
+        state = self.state
+        if state.processing:
+            return 'en_curso'
+        state.reset()
+        state.processing = True
+        try:
+            for vista in list(self.espectadores.values()):
+                update_groups_ui(state, vista['ui_refs'])
+                vista['log_view'].clear()
+
+            precalculado = reserva.tomar()
+            if precalculado is None:
+                loop = asyncio.get_running_loop()
+                future = loop.run_in_executor(get_pool(), compute_draw)
+                precalculado = await asyncio.wait_for(future, 4 * SORTEO_TIMEOUT)
+            eventos_por_bombo, state.estadisticas = precalculado
+
+            for n, eventos in enumerate(eventos_por_bombo, start=1):
+                await self._animar(n, eventos)
+            self._log("--- SORTEO FINALIZADO ---")
+            state.finished = True
+            return 'finalizado'
+        except asyncio.TimeoutError:
+            self._cancelar(f"El servidor está ocupado (más de {4 * SORTEO_TIMEOUT:.0f} s). Sorteo cancelado.")
+            return 'ocupado'
+        except Exception as e:
+            self._cancelar(f"Error Crítico en Lógica: {e!r}")
+            return 'error'
+        finally:
+            state.processing = False
+
+    def metricas(self):
+        return {
+            'espectadores': len(self.espectadores),
+            'en_curso': self.state.processing,
+            'finalizado': self.state.finished,
+            'equipos_sorteados': len(self.state.asignaciones),
+        }
+
+
+transmision = Transmision()
+
+
+@app.get('/metricas/transmision')
+def metricas_transmision():
+    """Espectadores suscritos y avance del sorteo transmitido."""
+    return transmision.metricas()
+
+
+def build_broadcast_view(titulo):
+    """Encabezado, grid de grupos y registro de una vista del modo transmisión."""
+    ui.colors(primary='#1976D2', secondary='#26A69A', accent='#9C27B0', positive='#21BA45')
+    ui.add_head_html('<style>body { background-color: #e3f2fd; }</style>')
+    if BANDERAS_LOCALES:
+        ui.add_head_html(f'<link rel="stylesheet" href="{URL_BANDERAS}">')
+    with ui.column().classes('w-full items-center') as columna:
+        ui.label(titulo).style(HEADER_STYLE)
+        acciones = ui.row().classes('w-full justify-center q-mb-md')
+        group_cards, ui_refs = build_groups_grid(transmision.state)
+        with ui.expansion('Registro del Sorteo', icon='list', value=True).classes('w-full q-pa-md').style("max-width: 1400px; background-color: white; border-radius: 8px;"):
+            log_view = ui.log(max_lines=MAX_LOG_LINES).classes('w-full').style("height: 200px; font-size: 0.8em;")
+    return {'group_cards': group_cards, 'ui_refs': ui_refs, 'log_view': log_view, 'acciones': acciones}
+
+
+@ui.page('/transmision')
+def broadcast_page(client: Client):
+    """Vista de espectador: sólo recibe los eventos del sorteo transmitido."""
+    vista = build_broadcast_view('Sorteo FIFA World Cup 2026 - En Vivo')
+    transmision.suscribir(client, vista)
+
+
+@ui.page('/presentador')
+def presenter_page(client: Client, clave: str = ''):
+    """Vista del presentador: igual a la del espectador más el botón que inicia el sorteo transmitido."""
+    if SORTEO_CLAVE_PRESENTADOR and not hmac.compare_digest(clave.encode(), SORTEO_CLAVE_PRESENTADOR.encode()):
+        ui.label("Acceso restringido al presentador.").style(HEADER_STYLE)
+        return
+    vista = build_broadcast_view('Sorteo FIFA World Cup 2026 - Presentador')
+
+    async def start_broadcast():
+        boton.disable()
+        try:
+            resultado = await transmision.sortear()
+            if resultado == 'finalizado':
+                ui.notify("Sorteo Finalizado con Éxito", type='positive')
+            elif resultado == 'en_curso':
+                ui.notify("Ya hay un sorteo en curso", type='warning')
+            elif resultado == 'ocupado':
+                ui.notify("Servidor ocupado, inténtalo de nuevo en unos segundos", type='warning')
+            else:
+                ui.notify("Error durante el sorteo (ver el registro)", type='negative')
+        finally:
+            boton.enable()
+
+    with vista['acciones']:
+        boton = ui.button('Iniciar Transmisión', on_click=start_broadcast).props('push color=primary icon=live_tv')
+        espectadores = ui.label("").style("align-self: center; color: #555;")
+    ui.timer(2.0, lambda: espectadores.set_text(f"{len(transmision.espectadores)} espectadores"))
+    transmision.suscribir(client, vista)
+
 
 # --- Página Principal ---
 @ui.page('/')
-def index():
+def index(client: Client):
     """
     Define la estructura y lógica de la página principal de la aplicación.
     
     En NiceGUI, las funciones decoradas con @ui.page se ejecutan para cada nuevo cliente
     que se conecta. Esto significa que cada usuario tiene su propia instancia de `SorteoManager`
-    y su propio estado visual.
+    y su propio estado visual, registrada en `registro` (que puede rechazarla si está lleno).
     """
     ui.colors(primary='#1976D2', secondary='#26A69A', accent='#9C27B0', positive='#21BA45')
     ui.add_head_html('<style>body { background-color: #e3f2fd; }</style>')
+    if BANDERAS_LOCALES:
+        ui.add_head_html(f'<link rel="stylesheet" href="{URL_BANDERAS}">')
 
     # Estado local para esta sesión
     state = SorteoManager()
-    group_cards = {} # Mapa para acceder rápidamente a las tarjetas UI de cada grupo
-    ui_refs = {}     # Mapa para acceder a los elementos UI específicos (labels, imagenes) de cada slot
-                     # Estructura: ui_refs[grupo][slot_idx] = { 'flag': ..., 'code': ..., 'conf': ..., 'placeholder': ... }
+    if not registro.registrar(client, state):
+        # Tope de sesiones alcanzado: página liviana sin grid ni estado de sorteo
+        with ui.column().classes('w-full items-center'):
+            ui.label('Sorteo FIFA World Cup 2026').style(HEADER_STYLE)
+            ui.label(f"El servidor alcanzó el máximo de {registro.maximo} sesiones de sorteo. Inténtalo de nuevo en unos minutos.")
+            ui.button('Reintentar', on_click=lambda: ui.navigate.reload()).props('color=primary icon=refresh')
+        return
+    group_cards = {} # Mapa para acceder rápidamente a las tarjetas UI de cada grupo (lo llena build_groups_grid)
+    ui_refs = {}     # Elementos UI de cada slot: ui_refs[grupo][slot_idx] (lo llena build_groups_grid)
     
     # Referencias a componentes UI que necesitan ser actualizados dinámicamente
-    log_container = None
+    log_view = None
+    stats_label = None
     draw_button = None
 
     # --- Funciones Auxiliares de UI ---
     def refresh_groups_ui():
+        """Actualiza la visualización de todos los grupos (ver `update_groups_ui`)."""
+        update_groups_ui(state, ui_refs)
+
+    def log(message):
         """
-        Actualiza la visualización de todos los grupos modificando los elementos existentes.
-        Evita el parpadeo al no destruir/recrear el DOM.
+        Registra un mensaje y lo agrega al panel de registros. `ui.log` es un buffer circular:
+        sólo viaja la línea nueva y el navegador descarta las que exceden `MAX_LOG_LINES`.
         """
-        for g in state.grupos:
-            teams = state.grupos_dict[g]
-            
-            # Mapeamos los equipos a sus slots (1, 2, 3, 4)
-            slot_map = {}
-            for t in teams:
-                slot_num = int(t['slot'][-1])
-                slot_map[slot_num] = t
-            
-            # Actualizamos los 4 slots del grupo
-            for i in range(1, 5):
-                refs = ui_refs[g][i]
-                team_data = slot_map.get(i)
-                
-                if team_data:
-                    code = team_data['codigo']
-                    iso = FIFA_TO_ISO.get(code, '').lower()
-                    
-                    # Actualizar Bandera
-                    if iso:
-                        refs['flag'].set_source(f"https://flagcdn.com/h24/{iso}.png")
-                        refs['flag'].style("display: block;")
-                        refs['placeholder'].style("display: none;")
-                    else:
-                        # Si no hay ISO (ej: placeholder), mostramos icono
-                        refs['flag'].style("display: none;")
-                        refs['placeholder'].style("display: block;")
-                    
-                    # Actualizar Textos
-                    refs['code'].set_text(code)
-                    refs['code'].style("color: #000; font-weight: bold;")
-                    refs['conf'].set_text(f"({team_data['conf']})")
-                else:
-                    # Slot vacío
-                    refs['flag'].style("display: none;")
-                    refs['placeholder'].style("display: block; color: #ccc;") # Icono gris tenue
-                    
-                    refs['code'].set_text("---")
-                    refs['code'].style("color: #aaa; font-weight: normal;")
-                    refs['conf'].set_text("")
-
-    def update_log_ui():
-        """Actualiza el panel de registros con los últimos mensajes del sistema."""
-        if log_container:
-            log_container.clear()
-            with log_container:
-                for msg in reversed(state.logs):
-                    ui.label(msg).style("font-size: 0.8em; font-family: monospace;")
+        state.log(message)
+        if log_view:
+            log_view.push(message)
+
+    def update_stats_ui():
+        """Actualiza el panel de estadísticas con los contadores acumulados de la sesión."""
+        if stats_label:
+            stats_label.set_text(state.estadisticas.resumen())
 
     async def highlight_group(group_name):
         """
@@ -179,129 +681,110 @@ def index():
 
     # --- Funciones de Lógica del Sorteo (Clausuras sobre `state`) ---
     
-    async def run_bombo_1():
+    async def compute_in_pool(n):
         """
-        Ejecuta la lógica de sorteo para el Bombo 1 delegando completamente en simular_sorteo_func.
+        Calcula el bombo `n` en el pool compartido y devuelve sus eventos.
+        El event loop queda libre mientras tanto (heartbeats y demás sesiones siguen vivos).
         """
-        state.log("--- INICIANDO BOMBO 1 ---")
-        update_log_ui()
-        
-        # 1. Ejecutar lógica pura (sin UI)
-        # sortear_bombo_1 devuelve los diccionarios completos con el resultado del bombo 1
-        res_grupos, res_asignaciones, res_slots = sortear_bombo_1(df_bombos)
-        
-        # 2. Animar los resultados
-        # Iteramos sobre las asignaciones devueltas. Como Python 3.7+ preserva el orden de inserción,
-        # y sortear_bombo_1 inserta en orden de sorteo, podemos confiar en el orden de las claves.
-        for eq, data in res_asignaciones.items():
-            await asyncio.sleep(0.2) # Pequeña pausa para efecto visual
-            
-            grupo = data['grupo']
-            slot = data['slot']
-            conf = data['conf']
-            
-            # Actualizamos el log y la UI paso a paso
-            state.log(f"ASIGNADO: {eq} a Grupo {grupo} ({slot})")
-            
-            # Actualizamos el estado local para la visualización actual
-            state.asignaciones[eq] = data
-            state.grupos_dict[grupo].append({"codigo": eq, "slot": slot, "conf": conf})
-            
-            # Removemos el slot si está disponible (para mantener consistencia visual durante la animación)
-            if slot in state.bombos_slots[grupo]:
-                state.bombos_slots[grupo].remove(slot)
-            
-            refresh_groups_ui()
-            update_log_ui()
-            await highlight_group(grupo)
-            
-        # 3. Sincronización final (Aseguramos que el estado sea EXACTAMENTE el devuelto por la lógica)
-        state.grupos_dict = res_grupos
-        state.asignaciones = res_asignaciones
-        state.bombos_slots = res_slots
-
-    async def run_bombo_n(n):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(get_pool(), compute_pot, n, state.logica, state.estadisticas)
+        eventos, state.logica, state.estadisticas = await asyncio.wait_for(future, SORTEO_TIMEOUT)
+        return eventos
+
+    async def animate_events(eventos, pausa, etiqueta):
         """
-        Ejecuta la lógica de sorteo para los Bombos 2, 3 y 4 delegando en simular_sorteo_func.
+        Anima los eventos de un bombo ya calculado. Cada `SlotSorteado` se aplica sobre el
+        estado visible de la sesión (`state`), independiente del que usa el worker.
         """
-        state.log(f"--- INICIANDO BOMBO {n} ---")
-        update_log_ui()
-        
-        # 1. Preparar estado para la función pura
-        # Pasamos copias profundas para no alterar el estado actual antes de tiempo (si fallara)
-        slots_in = copy.deepcopy(state.bombos_slots)
-        grupos_in = copy.deepcopy(state.grupos_dict)
-        asignaciones_in = copy.deepcopy(state.asignaciones)
-        
+        for evento in eventos:
+            if isinstance(evento, GrupoRechazado):
+                log(evento.mensaje)
+            elif isinstance(evento, SlotSorteado):
+                await asyncio.sleep(pausa)
+                aplicar_evento(evento, state.grupos_dict, state.asignaciones, state.bombos_slots)
+                log(f"{etiqueta}: {evento.codigo} -> Grupo {evento.grupo} ({evento.slot})")
+                # Sólo se tocan los elementos del slot asignado
+                update_slot_ui(ui_refs[evento.grupo][int(evento.slot[1:])], evento._asdict())
+                await highlight_group(evento.grupo)
+        update_stats_ui()
+
+    async def run_bombo(n, pausa, etiqueta, eventos=None):
+        """
+        Anima el bombo `n`. Si no llegan sus `eventos` ya calculados (sorteo de la reserva),
+        lo calcula fuera del event loop. Devuelve False si el cálculo falló o superó `SORTEO_TIMEOUT`.
+        """
+        log(f"--- INICIANDO BOMBO {n} ---")
+
         try:
-            # 2. Ejecutar lógica pura
-            res_grupos, res_asignaciones, res_slots = sortear_bombo_n(
-                n, df_bombos, slots_in, grupos_in, asignaciones_in
-            )
+            if eventos is None:
+                eventos = await compute_in_pool(n)
+        except asyncio.TimeoutError:
+            log(f"Bombo {n}: el servidor está ocupado (más de {SORTEO_TIMEOUT:.0f} s). Sorteo cancelado.")
+            ui.notify("Servidor ocupado, inténtalo de nuevo en unos segundos", type='warning')
+            return False
         except Exception as e:
-            state.log(f"Error Crítico en Lógica: {e}")
-            ui.notify(f"Error: {e}", type='negative')
-            return
-
-        # 3. Animar diferencias (Nuevas asignaciones)
-        # Iteramos sobre el resultado final. Si el equipo no estaba en el estado previo, es nuevo.
-        for eq, data in res_asignaciones.items():
-            if eq in state.asignaciones:
-                continue # Ya estaba asignado previamente
-            
-            await asyncio.sleep(0.5) # Suspense
-            
-            grupo = data['grupo']
-            slot = data['slot']
-            conf = data['conf']
-            
-            state.log(f"SORTEADO: {eq} -> Grupo {grupo} ({slot})")
-            
-            # Actualización visual paso a paso
-            state.asignaciones[eq] = data
-            state.grupos_dict[grupo].append({"codigo": eq, "slot": slot, "conf": conf})
-            
-            if slot in state.bombos_slots[grupo]:
-                state.bombos_slots[grupo].remove(slot)
-                
-            refresh_groups_ui()
-            update_log_ui()
-            await highlight_group(grupo)
+            log(f"Error Crítico en Lógica: {e!r}")
+            ui.notify(f"Error: {e!r}", type='negative')
+            return False
 
-        # 4. Sincronización final
-        state.grupos_dict = res_grupos
-        state.asignaciones = res_asignaciones
-        state.bombos_slots = res_slots
+        await animate_events(eventos, pausa, etiqueta)
+        return True
+
+    async def run_bombo_1(eventos=None):
+        """
+        Ejecuta la lógica de sorteo para el Bombo 1 delegando completamente en simular_sorteo_func.
+        """
+        # Los eventos llegan en orden de sorteo: anfitriones y después un cabeza de serie por grupo
+        return await run_bombo(1, 0.2, "ASIGNADO", eventos)  # Pequeña pausa para efecto visual
+
+    async def run_bombo_n(n, eventos=None):
+        """
+        Ejecuta la lógica de sorteo para los Bombos 2, 3 y 4 delegando en simular_sorteo_func.
+        """
+        return await run_bombo(n, 0.5, "SORTEADO", eventos)  # Suspense
 
     async def start_simulation():
         """
         Orquesta el proceso completo de simulación.
         
         Se ejecuta al presionar el botón 'Iniciar Sorteo'.
-        Ejecuta secuencialmente el sorteo de los bombos 1, 2, 3 y 4.
+        Ejecuta secuencialmente el sorteo de los bombos 1, 2, 3 y 4: si la reserva tiene un
+        sorteo listo sólo se anima; si no, cada bombo se calcula en el pool.
         """
         if state.processing: return
-        state.processing = True
-        if draw_button: draw_button.disable()
+        state.touch()
         state.reset()
+        state.processing = True  # Después de reset(), que lo reinicia
+        if draw_button: draw_button.disable()
         refresh_groups_ui()
-        update_log_ui()
+        if log_view:
+            log_view.clear()
         
+        precalculado = reserva.tomar()
+        if precalculado is not None:
+            eventos_por_bombo, state.estadisticas = precalculado
+        else:
+            eventos_por_bombo = [None] * 4
+        update_stats_ui()
+
         try:
-            await run_bombo_1()
+            completo = await run_bombo_1(eventos_por_bombo[0])
             for n in range(2, 5):
-                await run_bombo_n(n)
-            state.log("--- SORTEO FINALIZADO ---")
-            ui.notify("Sorteo Finalizado con Éxito", type='positive')
-            state.finished = True
+                if not completo:
+                    break
+                completo = await run_bombo_n(n, eventos_por_bombo[n - 1])
+            if completo:
+                log("--- SORTEO FINALIZADO ---")
+                ui.notify("Sorteo Finalizado con Éxito", type='positive')
+                state.finished = True
         except Exception as e:
-            state.log(f"Error: {str(e)}")
+            log(f"Error: {str(e)}")
             ui.notify(f"Error durante el sorteo: {e}", type='negative')
             raise e
         finally:
             state.processing = False
+            state.touch()
             if draw_button: draw_button.enable()
-            update_log_ui()
 
     # --- Construcción del Layout ---
     with ui.column().classes('w-full items-center'):
@@ -312,39 +795,15 @@ def index():
             ui.button('Reiniciar', on_click=lambda: ui.navigate.reload()).props('outline color=secondary icon=refresh')
 
         # Grid de Grupos
-        with ui.grid(columns=4).classes('w-full q-pa-md gap-4').style("max-width: 1400px;"):
-            for g in state.grupos:
-                ui_refs[g] = {} # Inicializar diccionario para este grupo
-                with ui.card().style(CARD_STYLE) as card:
-                    group_cards[g] = card
-                    ui.label(f"Grupo {g}").style("font-weight: bold; font-size: 1.2em; color: #333; margin-bottom: 5px;")
-                    
-                    # Crear los 4 slots vacíos inicialmente
-                    for i in range(1, 5):
-                        ui_refs[g][i] = {}
-                        with ui.row().classes('items-center no-wrap').style(SLOT_STYLE):
-                            # Etiqueta del Slot (Estática)
-                            ui.label(f"{g}{i}").style("font-weight: bold; margin-right: 6px; min-width: 25px; color: #555;")
-                            
-                            # Placeholder (Bandera gris)
-                            placeholder = ui.icon('flag', size='xs').style("margin-right: 8px; color: #ccc;")
-                            ui_refs[g][i]['placeholder'] = placeholder
-                            
-                            # Imagen de Bandera (Oculta inicialmente)
-                            flag_img = ui.image().style("width: 24px; height: auto; margin-right: 8px; border-radius: 2px; box-shadow: 0 1px 2px rgba(0,0,0,0.2); display: none;")
-                            ui_refs[g][i]['flag'] = flag_img
-                            
-                            # Código de País
-                            code_lbl = ui.label("---").style("color: #aaa; margin-right: 4px;")
-                            ui_refs[g][i]['code'] = code_lbl
-                            
-                            # Confederación
-                            conf_lbl = ui.label("").style("font-size: 0.8em; color: #666;")
-                            ui_refs[g][i]['conf'] = conf_lbl
+        group_cards, ui_refs = build_groups_grid(state)
 
         # Área de Registros
         with ui.expansion('Registro del Sorteo', icon='list', value=True).classes('w-full q-pa-md').style("max-width: 1400px; background-color: white; border-radius: 8px;"):
-            log_container = ui.column().classes('w-full').style("max-height: 200px; overflow-y: auto;")
+            log_view = ui.log(max_lines=MAX_LOG_LINES).classes('w-full').style("height: 200px; font-size: 0.8em;")
+
+        # Panel de Estadísticas (contadores del lookahead y tiempos por bombo)
+        with ui.expansion('Estadísticas del Sorteo', icon='speed', value=False).classes('w-full q-pa-md').style("max-width: 1400px; background-color: white; border-radius: 8px;"):
+            stats_label = ui.label("").style("font-size: 0.8em; font-family: monospace; white-space: pre-line;")
 
     # Inicializar UI con estado vacío
     refresh_groups_ui()